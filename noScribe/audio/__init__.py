@@ -1 +1 @@
-from . import convert
+from . import cache, convert, live, pcm, scratch
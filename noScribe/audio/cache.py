@@ -0,0 +1,244 @@
+"""
+Persistent cache of converted audio.
+
+Re-running a job (e.g. with a different model or speaker count) would convert
+the same recording again. Instead, the converted float32 PCM (see `pcm`) is
+kept in a cache directory, keyed by a fingerprint of the input file and the
+converted time range. The cache has a size budget; the least recently used
+entries are evicted first.
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bump this whenever the conversion changes its output, so that old entries
+# are not used anymore.
+CACHE_VERSION = 1
+
+# The fingerprint hashes the file size, the first and last `_EDGE_BYTES` and
+# `_SAMPLE_COUNT` blocks of `_SAMPLE_BYTES` spread evenly over the file. This
+# reads only a few MB, even for very long recordings.
+_EDGE_BYTES = 1024 * 1024
+_SAMPLE_BYTES = 64 * 1024
+_SAMPLE_COUNT = 16
+
+_SUFFIX_PCM = ".f32"
+_SUFFIX_INFO = ".json"
+
+
+def fingerprint(file_input: Path) -> str:
+    """
+    Return a fast fingerprint of the content of a file.
+
+    Only parts of the file are read. The name and modification time are not
+    taken into account, so copies of a recording share the same fingerprint.
+    """
+
+    hasher = hashlib.blake2b(digest_size=16)
+    size = Path(file_input).stat().st_size
+    hasher.update(size.to_bytes(8, "little"))
+
+    with open(file_input, "rb") as f:
+        if size <= 2 * _EDGE_BYTES + _SAMPLE_COUNT * _SAMPLE_BYTES:
+            hasher.update(f.read())
+        else:
+            offsets = [0, size - _EDGE_BYTES]
+            offsets += [
+                _EDGE_BYTES + (size - 2 * _EDGE_BYTES - _SAMPLE_BYTES) * i // (_SAMPLE_COUNT - 1)
+                for i in range(_SAMPLE_COUNT)
+            ]
+            for offset in sorted(offsets):
+                f.seek(offset)
+                length = _EDGE_BYTES if offset in (0, size - _EDGE_BYTES) else _SAMPLE_BYTES
+                hasher.update(f.read(length))
+
+    return hasher.hexdigest()
+
+
+class AudioCache:
+    """
+    Directory of converted audio files with LRU eviction.
+
+    Every entry consists of the PCM file `<key>.f32` and a small JSON file
+    with information about its source. The modification time of the PCM file
+    marks the last use of the entry. Files are hard linked (or copied) in and
+    out of the cache, so evicting an entry never affects a running job.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir: Path = Path(cache_dir)
+        self.max_bytes: int = max_bytes
+
+    def key(
+        self,
+        file_input: Path,
+        start_ms: int = 0,
+        stop_ms: int = 0,
+        track: tuple = None,
+        ranges: list = None,
+    ) -> str:
+        """
+        Return the cache key for the given input file and time range. `track`
+        is the (stream index, channel) of a single track (see
+        `convert.MediaInfo.tracks()`), None for the mixed audio. `ranges`
+        ((start, stop) tuples) replaces the time range if several ranges are
+        converted one after the other.
+        """
+
+        ranges = ranges or [(start_ms, stop_ms)]
+        key = f"{fingerprint(file_input)}-{CACHE_VERSION}-" + "-".join(
+            f"{int(start)}-{int(stop)}" for start, stop in ranges
+        )
+        if track is not None:
+            stream_index, channel = track
+            key += f"-s{stream_index}" + (f"c{channel}" if channel is not None else "")
+
+        return key
+
+    def get(self, key: str, file_pcm: Path) -> bool:
+        """
+        Provide the cached PCM file of the given entry as `file_pcm` and mark
+        the entry as used.
+
+        Returns:
+            False if the entry is not cached.
+        """
+
+        file_cached = self.cache_dir / (key + _SUFFIX_PCM)
+        try:
+            _link_or_copy(file_cached, Path(file_pcm))
+        except FileNotFoundError:
+            return False
+
+        try:
+            os.utime(file_cached)
+        except OSError as exc:
+            logger.debug("Failed to update access time of %s: %s", file_cached, exc)
+
+        logger.debug("Audio cache hit: %s", key)
+
+        return True
+
+    def put(self, key: str, file_pcm: Path, info: dict = None):
+        """
+        Add a PCM file to the cache and evict old entries if the cache exceeds
+        its size budget. `info` is stored along with the entry (see
+        `entries()`).
+        """
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary name first, so that other instances never see a
+        # partially written entry.
+        file_tmp = self.cache_dir / (key + _SUFFIX_PCM + ".tmp")
+        _link_or_copy(Path(file_pcm), file_tmp)
+        os.replace(file_tmp, self.cache_dir / (key + _SUFFIX_PCM))
+
+        info = dict(info or {})
+        info["created"] = time.time()
+        with open(self.cache_dir / (key + _SUFFIX_INFO), "w", encoding="utf-8") as f:
+            json.dump(info, f)
+
+        self.evict(keep=key)
+
+    def entries(self) -> list:
+        """
+        Return all entries, most recently used first. Each entry is a dict with
+        the keys `key`, `path`, `size` and `last_used` plus the information
+        given to `put()`.
+        """
+
+        if not self.cache_dir.exists():
+            return []
+
+        entries = []
+        for file_pcm in self.cache_dir.glob("*" + _SUFFIX_PCM):
+            try:
+                stat = file_pcm.stat()
+            except OSError:
+                continue
+
+            entry = {}
+            try:
+                with open(file_pcm.with_suffix(_SUFFIX_INFO), encoding="utf-8") as f:
+                    entry.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+            entry.update(
+                key=file_pcm.stem,
+                path=file_pcm,
+                size=stat.st_size,
+                last_used=stat.st_mtime,
+            )
+            entries.append(entry)
+
+        entries.sort(key=lambda entry: entry["last_used"], reverse=True)
+
+        return entries
+
+    def size(self) -> int:
+        """
+        Return the total size of all entries in bytes.
+        """
+
+        return sum(entry["size"] for entry in self.entries())
+
+    def evict(self, keep: str = None):
+        """
+        Remove the least recently used entries until the cache fits into its
+        size budget. The entry `keep` is never removed.
+        """
+
+        total = 0
+        for entry in self.entries():
+            total += entry["size"]
+            if total > self.max_bytes and entry["key"] != keep:
+                if self.remove(entry["key"]):
+                    total -= entry["size"]
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove an entry. Returns False if it could not be removed (e.g. because
+        it is still in use on Windows).
+        """
+
+        try:
+            (self.cache_dir / (key + _SUFFIX_PCM)).unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning("Failed to remove cached audio %s: %s", key, exc)
+            return False
+
+        (self.cache_dir / (key + _SUFFIX_INFO)).unlink(missing_ok=True)
+        logger.debug("Removed cached audio: %s", key)
+
+        return True
+
+    def purge(self) -> int:
+        """
+        Remove all entries. Returns the number of removed entries.
+        """
+
+        return sum(self.remove(entry["key"]) for entry in self.entries())
+
+
+def _link_or_copy(file_src: Path, file_dst: Path):
+    """
+    Hard link `file_src` to `file_dst` or copy it if linking is not possible
+    (e.g. across file systems). Existing files are replaced.
+    """
+
+    file_dst.unlink(missing_ok=True)
+    try:
+        os.link(file_src, file_dst)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(file_src, file_dst)
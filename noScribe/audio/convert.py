@@ -3,35 +3,94 @@ All classes and functions related to audio conversion.
 """
 
 from collections import deque
+from dataclasses import dataclass
+from fractions import Fraction
 from pathlib import Path
+from typing import Optional
 import logging
+import math
+import multiprocessing as mp
+import tempfile
+import time
+import wave
 
 import av
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 16000
+
+# Seeking lands on the closest seek point before the target. Start decoding a
+# bit earlier, so that decoders and the resampler have settled when the target
+# is reached (e.g. mp3 needs the previous frames for its bit reservoir). The
+# samples before the target are discarded. The same margin is decoded after
+# the stop time.
+SEEK_PREROLL_SEC = 0.5
+
+# Numpy types of the (packed or planar) sample formats of decoded frames.
+_SAMPLE_DTYPES = {
+    "u8": np.uint8,
+    "s16": np.int16,
+    "s32": np.int32,
+    "s64": np.int64,
+    "flt": np.float32,
+    "dbl": np.float64,
+}
+
 
 class ToWav:
     """
     Convert an arbitrary file to wave format.
+
+    By default, all channels of the first audio stream are mixed down. A
+    single track can be converted instead by selecting another audio stream
+    (`stream_index`) and/or a single channel (`channel`), see
+    `MediaInfo.tracks()`.
+
+    Without `file_output`, no wave file is written; the samples are only
+    passed to the PCM writer of `convert_all()`.
+
+    `file_input` may also be a file object, e.g. a stream (see `live`). Its
+    format (`input_format`, with `input_options` for `av.open`) must be given
+    if it cannot be detected from the data, e.g. for raw PCM.
     """
 
-    def __init__(self, file_input: Path, file_output: Path, force: bool = False):
+    def __init__(
+        self,
+        file_input: Path,
+        file_output: Optional[Path],
+        force: bool = False,
+        stream_index: int = 0,
+        channel: Optional[int] = None,
+        input_format: Optional[str] = None,
+        input_options: Optional[dict] = None,
+    ):
         # Check whether output path exists. Only overwrite if `force=True`.
-        if file_output.exists() and not force:
+        if file_output is not None and file_output.exists() and not force:
             raise FileExistsError(file_output)
 
         self.file_input: Path = file_input
-        self.file_output: Path = file_output
+        self.file_output: Optional[Path] = file_output
+        self.stream_index: int = stream_index
+        self.channel: Optional[int] = channel
+        self.input_format: Optional[str] = input_format
+        self.input_options: Optional[dict] = input_options
         self.container_input: av.container.Container = None
         self.container_output: av.container.Container = None
         self.stream_input: av.stream.Stream = None
         self.stream_output: av.stream.Stream = None
         self.packet_iterator = None
         self.pending_frames = deque()
+        self.start_sec: float = None
         self.stop_after_sec: float = None
         self.decode_error_count: int = 0
+        self.samples_written: int = 0
         self._output_flushed = False
+        self._trim_start: int = 0
+        self._trim_stop: int = None
+        self._resampled_pos: int = None
+        self._pcm_writer = None
 
     def open(self):
         """
@@ -43,15 +102,23 @@ class ToWav:
             "Starting audio conversion to wav: %s -> %s", self.file_input, self.file_output
         )
 
-        self.container_input = av.open(self.file_input)
-        self.container_output = av.open(self.file_output, mode="w", format="wav")
-        self.stream_input = self.container_input.streams.audio[0]
-        self.stream_output = self.container_output.add_stream(
-            "pcm_s16le", rate=16000, layout="mono"
-        )
+        open_args = {}
+        if self.input_format is not None:
+            open_args["format"] = self.input_format
+        if self.input_options:
+            open_args["options"] = self.input_options
+        self.container_input = av.open(self.file_input, **open_args)
+        if self.file_output is not None:
+            self.container_output = av.open(self.file_output, mode="w", format="wav")
+            self.stream_output = self.container_output.add_stream(
+                "pcm_s16le", rate=SAMPLE_RATE, layout="mono"
+            )
+        self.stream_input = self.container_input.streams.audio[self.stream_index]
         self.packet_iterator = self.container_input.demux(self.stream_input)
         self.pending_frames.clear()
+        self.start_sec = None
         self.decode_error_count = 0
+        self.samples_written = 0
         self._output_flushed = False
 
         return self
@@ -93,12 +160,17 @@ class ToWav:
     def seek(self, milliseconds: int):
         """
         Seeks in the stream approximately to the given milliseconds. This way,
-        conversion starts at this point.
+        conversion starts at this point. `convert()` skips the frames before
+        this point, `convert_all()` starts exactly at the given sample.
 
-        Needs to be called after `open` was called.
+        Needs to be called after `open` was called. Can be called again after
+        a conversion to append another time range to the output.
         """
 
-        seconds = milliseconds / 1000.0
+        # Frames decoded before seeking belong to the previous position.
+        self.pending_frames.clear()
+        self.start_sec = milliseconds / 1000.0
+        seconds = max(0.0, self.start_sec - SEEK_PREROLL_SEC)
 
         # See https://github.com/PyAV-Org/PyAV/blob/main/tests/test_seek.py for
         # more examples on the approach.
@@ -135,11 +207,149 @@ class ToWav:
         Convert a frame from the input file to wave output.
         """
 
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                return False
+
+            # Skip the frames decoded before the seek target (see `seek()`).
+            if self.start_sec and frame.time is not None:
+                frame_end = self._media_time(frame) + frame.samples / frame.sample_rate
+                if frame_end <= self.start_sec:
+                    continue
+
+            break
+
+        # Check whether we are already past the stop time.
+        if self.stop_after_sec and frame.time is not None and self.stop_after_sec < self._media_time(frame):
+            return False
+
+        if self.channel is not None:
+            frame = _select_channel(frame, self.channel)
+
+        # Otherwise convert frame.
+        for packet in self.stream_output.encode(frame):
+            self.container_output.mux(packet)
+
+        return True
+
+    def convert_all(
+        self, progress_cb=None, cancel_cb=None, chunk_frames: int = 256, pcm_writer=None
+    ) -> bool:
+        """
+        Convert the whole input (respecting `seek()` and `stop_after()`) in
+        batches.
+
+        The samples of `chunk_frames` decoded frames are joined into one frame,
+        resampled with an explicit `av.AudioResampler` and encoded at once.
+        This avoids the per-frame overhead of calling `convert()` in a loop.
+
+        Unlike `convert()`, the output is trimmed sample-accurately to the
+        range given by `seek()` and `stop_after()`, based on the timestamp of
+        the first decoded frame. Thus, the outputs of adjacent ranges can be
+        joined without gaps or overlaps (see `ParallelToWav`).
+
+        Args:
+            progress_cb: Called after each batch with the converted seconds
+                and the conversion speed (as a multiple of real time).
+            cancel_cb: Called after each batch. The conversion stops if it
+                returns True.
+            chunk_frames: Number of decoded frames per batch. Smaller values
+                make cancelation more responsive.
+            pcm_writer: Receives the converted samples (s16 numpy arrays)
+                via `write()` as soon as they are available, e.g. a
+                `pcm.PcmWriter`.
+
+        Returns:
+            False if the conversion was canceled, True otherwise.
+        """
+
+        self._pcm_writer = pcm_writer
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+        time_start = time.perf_counter()
+        batch = []
+
+        # Output range in samples, relative to the start of the input.
+        self._trim_start = round(self.start_sec * SAMPLE_RATE) if self.start_sec else 0
+        self._trim_stop = round(self.stop_after_sec * SAMPLE_RATE) if self.stop_after_sec else None
+        self._resampled_pos = None
+
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                break
+
+            if self._resampled_pos is None:
+                if frame.time is None:
+                    self._resampled_pos = self._trim_start
+                else:
+                    # Start resampling at an input sample that falls exactly
+                    # on an output sample. This way, the output samples are
+                    # the same no matter where decoding started.
+                    first_sample = round(self._media_time(frame) * frame.sample_rate)
+                    step = frame.sample_rate // math.gcd(frame.sample_rate, SAMPLE_RATE)
+                    skip = -first_sample % step
+                    if skip >= frame.samples:
+                        continue
+                    if skip:
+                        frame = _skip_samples(frame, skip)
+                    self._resampled_pos = (first_sample + skip) * SAMPLE_RATE // frame.sample_rate
+
+            # Decode a little past the stop time, as the resampler needs the
+            # following samples to compute the last ones.
+            if (
+                self.stop_after_sec
+                and frame.time is not None
+                and self.stop_after_sec + SEEK_PREROLL_SEC < self._media_time(frame)
+            ):
+                break
+
+            # Frames can only be joined if they share the same format.
+            if batch and not _same_audio_format(batch[0], frame):
+                self._encode_batch(resampler, batch)
+                batch = []
+
+            batch.append(frame)
+
+            if len(batch) >= chunk_frames:
+                self._encode_batch(resampler, batch)
+                batch = []
+
+                if progress_cb is not None:
+                    progress_cb(*self._throughput(time_start))
+
+                if cancel_cb is not None and cancel_cb():
+                    return False
+
+        self._encode_batch(resampler, batch)
+        # Flush the samples buffered in the resampler.
+        self._encode_samples(resampler.resample(None))
+        self._resampled_pos = None
+
+        seconds, speed = self._throughput(time_start)
+        if progress_cb is not None:
+            progress_cb(seconds, speed)
+
+        logger.debug(
+            "Converted %.1f seconds of audio at %.1fx real time: %s",
+            seconds,
+            speed,
+            self.file_input,
+        )
+
+        return True
+
+    def _next_frame(self):
+        """
+        Return the next decoded frame or None at the end of the input. Invalid
+        packets are skipped.
+        """
+
         while not self.pending_frames:
             try:
                 packet = next(self.packet_iterator)
             except StopIteration:
-                return False
+                return None
 
             try:
                 self.pending_frames.extend(packet.decode())
@@ -152,14 +362,533 @@ class ToWav:
                     exc,
                 )
 
-        frame = self.pending_frames.popleft()
+        return self.pending_frames.popleft()
 
-        # Check whether we are already past the stop time.
-        if self.stop_after_sec and frame.time is not None and self.stop_after_sec < frame.time:
-            return False
+    def _encode_batch(self, resampler: av.AudioResampler, frames: list):
+        """
+        Join decoded frames (of the same format) into a single frame, resample
+        it and write it to the output container.
+        """
 
-        # Otherwise convert frame.
-        for packet in self.stream_output.encode(frame):
-            self.container_output.mux(packet)
+        if not frames:
+            return
+
+        first = frames[0]
+        if len(frames) == 1:
+            joined = first
+        else:
+            # Join the raw plane buffers. This is considerably cheaper than
+            # calling `to_ndarray()` on every frame.
+            dtype = _SAMPLE_DTYPES[first.format.name.rstrip("p")]
+            channels_per_plane = 1 if first.format.is_planar else len(first.layout.channels)
+            planes = np.stack([
+                np.frombuffer(
+                    b"".join(
+                        memoryview(frame.planes[i])[: frame.samples * channels_per_plane * first.format.bytes]
+                        for frame in frames
+                    ),
+                    dtype=dtype,
+                )
+                for i in range(len(first.planes))
+            ])
+            joined = av.AudioFrame.from_ndarray(
+                planes, format=first.format.name, layout=first.layout.name
+            )
+            joined.sample_rate = first.sample_rate
+            joined.time_base = first.time_base
+            joined.pts = first.pts
+
+        if self.channel is not None:
+            joined = _select_channel(joined, self.channel)
+
+        self._encode_samples(resampler.resample(joined))
+
+    def _encode_samples(self, frames: list):
+        """
+        Write resampled (s16, mono) frames to the output container.
+        """
+
+        if not frames:
+            return
+
+        samples = np.concatenate([frame.to_ndarray().reshape(-1) for frame in frames])
+
+        if self._resampled_pos is not None:
+            # Trim to the requested range (see `convert_all()`).
+            pos = self._resampled_pos
+            self._resampled_pos += samples.shape[0]
+            start = max(self._trim_start - pos, 0)
+            stop = samples.shape[0]
+            if self._trim_stop is not None:
+                stop = min(stop, max(self._trim_stop - pos, 0))
+            samples = samples[start:stop]
+
+        if samples.shape[0] == 0:
+            return
+
+        if self.container_output is not None:
+            frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format="s16", layout="mono")
+            frame.sample_rate = SAMPLE_RATE
+            frame.time_base = Fraction(1, SAMPLE_RATE)
+            frame.pts = self.samples_written
+
+            for packet in self.stream_output.encode(frame):
+                self.container_output.mux(packet)
+
+        if self._pcm_writer is not None:
+            self._pcm_writer.write(samples)
+
+        self.samples_written += samples.shape[0]
+
+    def _media_time(self, frame) -> float:
+        """
+        Return the time of a frame in seconds, relative to the start of the
+        input stream.
+        """
+
+        start_time = getattr(self.stream_input, "start_time", None)
+        if not start_time:
+            return frame.time
+
+        return frame.time - float(start_time * self.stream_input.time_base)
+
+    def _throughput(self, time_start: float) -> tuple:
+        """
+        Return the converted seconds and the speed relative to real time.
+        """
+
+        seconds = self.samples_written / SAMPLE_RATE
+        elapsed = time.perf_counter() - time_start
+        speed = seconds / elapsed if elapsed > 0 else 0.0
+
+        return seconds, speed
+
+
+class ParallelToWav:
+    """
+    Convert an arbitrary file to wave format using several processes.
+
+    The input is split into time ranges of equal length. Each range is
+    converted by `ToWav` in a separate process (using `seek()` and
+    `stop_after()`). As `ToWav.convert_all()` trims its output
+    sample-accurately, the parts are joined without gaps or overlaps.
+
+    Provides the same interface as `ToWav`, except for the frame-by-frame
+    `convert()`. The parts are written to `scratch_dir` (by default the
+    directory of the output file or the system's temp directory).
+    """
+
+    def __init__(
+        self,
+        file_input: Path,
+        file_output: Optional[Path],
+        processes: int,
+        force: bool = False,
+        min_range_sec: float = 60.0,
+        stream_index: int = 0,
+        channel: Optional[int] = None,
+        scratch_dir: Optional[Path] = None,
+    ):
+        # Check whether output path exists. Only overwrite if `force=True`.
+        if file_output is not None and file_output.exists() and not force:
+            raise FileExistsError(file_output)
+
+        if scratch_dir is None and file_output is not None:
+            scratch_dir = file_output.parent
+
+        self.file_input: Path = file_input
+        self.file_output: Optional[Path] = file_output
+        self.scratch_dir: Optional[Path] = scratch_dir
+        self.processes: int = processes
+        self.min_range_sec: float = min_range_sec
+        self.stream_index: int = stream_index
+        self.channel: Optional[int] = channel
+        self.duration_ms: int = None
+        self.start_ms: int = 0
+        self.stop_ms: int = 0
+        self.decode_error_count: int = 0
+        self.samples_written: int = 0
+        self.pool = None
+
+    def open(self):
+        """
+        Determines the duration of the input. The caller must make sure to
+        call the `close()` command as well.
+        """
+
+        with av.open(self.file_input) as container:
+            if container.duration is not None:
+                self.duration_ms = int(container.duration * 1000 / av.time_base)
+
+        self.start_ms = 0
+        self.stop_ms = 0
+        self.decode_error_count = 0
+        self.samples_written = 0
+
+        return self
+
+    def close(self):
+        """
+        Stop all conversion processes that are still running.
+        """
+
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+        return False
+
+    def seek(self, milliseconds: int):
+        """
+        Start the conversion at the given milliseconds.
+        """
+
+        self.start_ms = milliseconds
+
+    def stop_after(self, milliseconds: int):
+        """
+        Define after how many milliseconds conversion should stop.
+        """
+
+        self.stop_ms = milliseconds
+
+    def convert_all(
+        self, progress_cb=None, cancel_cb=None, chunk_frames: int = 256, pcm_writer=None
+    ) -> bool:
+        """
+        Convert the input in parallel and join the parts. See
+        `ToWav.convert_all()` for the arguments.
+
+        Progress is reported whenever a part is finished. The parts are
+        joined in order as soon as they are finished, so that the samples of
+        the first part reach `pcm_writer` (e.g. for a pipelined
+        transcription) while the others are still being converted. Inputs
+        that are too short to be split (or of unknown duration) are converted
+        in the calling process.
+        """
+
+        ranges = self._split()
+        if len(ranges) < 2:
+            with ToWav(
+                self.file_input,
+                self.file_output,
+                force=True,
+                stream_index=self.stream_index,
+                channel=self.channel,
+            ) as towav:
+                if self.start_ms > 0:
+                    towav.seek(self.start_ms)
+                if self.stop_ms > 0:
+                    towav.stop_after(self.stop_ms)
+                result = towav.convert_all(progress_cb, cancel_cb, chunk_frames, pcm_writer)
+            self.decode_error_count = towav.decode_error_count
+            self.samples_written = towav.samples_written
+            return result
+
+        logger.debug(
+            "Starting parallel audio conversion to wav (%s parts): %s -> %s",
+            len(ranges),
+            self.file_input,
+            self.file_output,
+        )
+
+        time_start = time.perf_counter()
+
+        with tempfile.TemporaryDirectory(
+            prefix="noScribe_parts_", dir=self.scratch_dir
+        ) as tmpdir:
+            files_part = [Path(tmpdir) / f"part{i}.wav" for i in range(len(ranges))]
+
+            output = _create_wav(self.file_output) if self.file_output is not None else None
+            self.pool = mp.get_context("spawn").Pool(len(ranges))
+            try:
+                results = [
+                    self.pool.apply_async(
+                        _convert_range,
+                        (
+                            self.file_input,
+                            file_part,
+                            start_ms,
+                            stop_ms,
+                            chunk_frames,
+                            self.stream_index,
+                            self.channel,
+                        ),
+                    )
+                    for file_part, (start_ms, stop_ms) in zip(files_part, ranges)
+                ]
+
+                for file_part, result in zip(files_part, results):
+                    while not result.ready():
+                        result.wait(0.1)
+                        if cancel_cb is not None and cancel_cb():
+                            return False
+
+                    samples_written, decode_error_count = result.get()
+                    self.samples_written += samples_written
+                    self.decode_error_count += decode_error_count
+
+                    _append_wav(file_part, output, pcm_writer)
+                    file_part.unlink()
+
+                    if progress_cb is not None:
+                        progress_cb(*self._throughput(time_start))
+            finally:
+                self.close()
+                if output is not None:
+                    output.close()
+
+        seconds, speed = self._throughput(time_start)
+        logger.debug(
+            "Converted %.1f seconds of audio at %.1fx real time: %s",
+            seconds,
+            speed,
+            self.file_input,
+        )
 
         return True
+
+    def _split(self) -> list:
+        """
+        Return the time ranges (start and stop in milliseconds) for the
+        conversion processes. A stop of 0 means "until the end of the input".
+        """
+
+        stop_ms = self.stop_ms
+        if self.duration_ms is not None and (stop_ms <= 0 or stop_ms > self.duration_ms):
+            stop_ms = self.duration_ms
+        if self.duration_ms is None and stop_ms <= 0:
+            return [(self.start_ms, self.stop_ms)]
+
+        length_ms = stop_ms - self.start_ms
+        count = min(self.processes, int(length_ms / 1000 / self.min_range_sec))
+        if count < 2:
+            return [(self.start_ms, self.stop_ms)]
+
+        bounds = [self.start_ms + length_ms * i // count for i in range(count + 1)]
+        ranges = list(zip(bounds[:-1], bounds[1:]))
+        # Convert the last range until the end of the input, in case the
+        # duration of the container is not exact.
+        ranges[-1] = (ranges[-1][0], self.stop_ms)
+
+        return ranges
+
+    def _throughput(self, time_start: float) -> tuple:
+        """
+        Return the converted seconds and the speed relative to real time.
+        """
+
+        seconds = self.samples_written / SAMPLE_RATE
+        elapsed = time.perf_counter() - time_start
+        speed = seconds / elapsed if elapsed > 0 else 0.0
+
+        return seconds, speed
+
+
+@dataclass
+class MediaInfo:
+    """
+    Information about an input file, as returned by `probe()`.
+    """
+
+    format: str
+    codec: str
+    sample_rate: int
+    channels: int
+    audio_streams: int
+    # Seconds, None if the container does not state the duration.
+    duration: Optional[float] = None
+
+    def tracks(self) -> list:
+        """
+        Return the tracks of the input as `(stream_index, channel)` tuples
+        (the arguments of `ToWav`): one per audio stream if there are
+        several streams (e.g. multi-track recordings), otherwise one per
+        channel (e.g. phone calls with one participant per channel).
+        """
+
+        if self.audio_streams > 1:
+            return [(index, None) for index in range(self.audio_streams)]
+
+        if self.channels > 1:
+            return [(0, channel) for channel in range(self.channels)]
+
+        return [(0, None)]
+
+    def converted_duration(self, start_ms: int = 0, stop_ms: int = 0) -> Optional[float]:
+        """
+        Return the duration (in seconds) of the audio converted with the
+        given `seek()` and `stop_after()` arguments.
+        """
+
+        if self.duration is None:
+            return None
+
+        duration_ms = self.duration * 1000
+        if stop_ms > 0:
+            duration_ms = min(duration_ms, stop_ms)
+
+        return max(duration_ms - start_ms, 0) / 1000
+
+
+def probe(file_input: Path, check_frames: int = 8) -> MediaInfo:
+    """
+    Read the metadata of an input file without decoding all of it.
+
+    Only the first `check_frames` frames of the first audio stream are
+    decoded, to make sure that the file is readable.
+
+    Raises:
+        ValueError: If the file has no (decodable) audio stream.
+        av.error.FFmpegError: If the file cannot be read.
+    """
+
+    with av.open(file_input) as container:
+        if not container.streams.audio:
+            raise ValueError("no audio stream", file_input)
+
+        stream = container.streams.audio[0]
+
+        duration = None
+        if container.duration is not None:
+            duration = container.duration / av.time_base
+        elif stream.duration is not None and stream.time_base is not None:
+            duration = float(stream.duration * stream.time_base)
+
+        info = MediaInfo(
+            format=container.format.name,
+            codec=stream.codec_context.name,
+            sample_rate=stream.codec_context.sample_rate,
+            channels=stream.codec_context.channels,
+            audio_streams=len(container.streams.audio),
+            duration=duration,
+        )
+
+        decoded = 0
+        for packet in container.demux(stream):
+            decoded += len(packet.decode())
+            if decoded >= check_frames:
+                break
+
+        if decoded == 0:
+            raise ValueError("no decodable audio", file_input)
+
+    return info
+
+
+def _convert_range(
+    file_input: Path,
+    file_output: Path,
+    start_ms: int,
+    stop_ms: int,
+    chunk_frames: int,
+    stream_index: int,
+    channel: Optional[int],
+) -> tuple:
+    """
+    Convert a time range of the input (runs in a `ParallelToWav` process).
+
+    Returns:
+        The number of samples written and the number of invalid packets.
+    """
+
+    with ToWav(
+        file_input, file_output, force=True, stream_index=stream_index, channel=channel
+    ) as towav:
+        if start_ms > 0:
+            towav.seek(start_ms)
+        if stop_ms > 0:
+            towav.stop_after(stop_ms)
+        towav.convert_all(chunk_frames=chunk_frames)
+
+    return towav.samples_written, towav.decode_error_count
+
+
+def _create_wav(file_output: Path):
+    """
+    Return a `wave` writer for a file in the format of `ToWav`.
+    """
+
+    output = wave.open(str(file_output), "wb")
+    output.setnchannels(1)
+    output.setsampwidth(2)
+    output.setframerate(SAMPLE_RATE)
+
+    return output
+
+
+def _append_wav(file_input: Path, output=None, pcm_writer=None, chunk_samples: int = SAMPLE_RATE * 60):
+    """
+    Append a wave file (as created by `ToWav`) to `output` (see
+    `_create_wav`) and optionally pass the samples to `pcm_writer`. Without
+    `output`, the samples are only passed to `pcm_writer`.
+    """
+
+    with wave.open(str(file_input), "rb") as part:
+        while True:
+            frames = part.readframes(chunk_samples)
+            if not frames:
+                break
+            if output is not None:
+                output.writeframes(frames)
+            if pcm_writer is not None:
+                pcm_writer.write(np.frombuffer(frames, dtype="<i2"))
+
+
+def _skip_samples(frame, count: int):
+    """
+    Return a copy of `frame` without its first `count` samples.
+    """
+
+    samples = frame.to_ndarray()
+    if frame.format.is_planar:
+        samples = samples[:, count:]
+    else:
+        samples = samples[:, count * len(frame.layout.channels) :]
+
+    skipped = av.AudioFrame.from_ndarray(
+        np.ascontiguousarray(samples), format=frame.format.name, layout=frame.layout.name
+    )
+    skipped.sample_rate = frame.sample_rate
+    if frame.pts is not None and frame.time_base is not None:
+        skipped.time_base = frame.time_base
+        skipped.pts = frame.pts + int(Fraction(count, frame.sample_rate) / frame.time_base)
+
+    return skipped
+
+
+def _select_channel(frame, channel: int):
+    """
+    Return a mono copy of `frame` with the samples of a single channel.
+    """
+
+    samples = frame.to_ndarray()
+    if frame.format.is_planar:
+        samples = samples[channel : channel + 1]
+    else:
+        samples = samples[:, channel :: len(frame.layout.channels)]
+
+    selected = av.AudioFrame.from_ndarray(
+        np.ascontiguousarray(samples), format=frame.format.name, layout="mono"
+    )
+    selected.sample_rate = frame.sample_rate
+    if frame.pts is not None and frame.time_base is not None:
+        selected.time_base = frame.time_base
+        selected.pts = frame.pts
+
+    return selected
+
+
+def _same_audio_format(frame_a, frame_b) -> bool:
+    return (
+        frame_a.format.name == frame_b.format.name
+        and frame_a.layout.name == frame_b.layout.name
+        and frame_a.sample_rate == frame_b.sample_rate
+    )
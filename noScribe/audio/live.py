@@ -0,0 +1,116 @@
+"""
+Live input: recordings that are still being written, stdin or named pipes.
+
+The conversion (`convert.ToWav`) normally reads a finished file. For a live
+transcription, it reads a stream instead (see `open_input`) and writes the
+converted samples to a growing PCM file as they arrive, which the whisper
+worker transcribes window by window (see `pcm.GrowingPcm`).
+
+Only formats that can be decoded without seeking work, e.g. wav, mp3, ogg,
+flac, mkv/webm or raw PCM (see `parse_format`), but not mp4/m4a, which
+store their index at the end of the file.
+"""
+
+from pathlib import Path
+from typing import Optional
+import io
+import logging
+import os
+import stat
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Raw PCM formats need the sample rate and number of channels (see
+# `parse_format`).
+RAW_FORMATS = ("s16le", "s16be", "s24le", "s32le", "f32le", "f64le", "u8", "alaw", "mulaw")
+
+
+class GrowingFile(io.RawIOBase):
+    """
+    A file that is still being written (e.g. by a recording app), read as a
+    stream: at its end, reading waits until more data arrives. The stream
+    ends when the file has not grown for `idle_timeout` seconds (the
+    recording has stopped) or when `stop_cb` returns True.
+    """
+
+    def __init__(self, path: Path, idle_timeout: float = 30.0, poll_interval: float = 0.2, stop_cb=None):
+        super().__init__()
+        self.path: Path = Path(path)
+        self.idle_timeout: float = idle_timeout
+        self.poll_interval: float = poll_interval
+        self.stop_cb = stop_cb
+        self._file = open(self.path, "rb")
+        self._last_growth: float = time.monotonic()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while True:
+            count = self._file.readinto(buffer)
+            if count:
+                self._last_growth = time.monotonic()
+                return count
+
+            if self.stop_cb is not None and self.stop_cb():
+                return 0
+            if time.monotonic() - self._last_growth >= self.idle_timeout:
+                logger.debug("%s has not grown for %s seconds, assuming the end", self.path, self.idle_timeout)
+                return 0
+            time.sleep(self.poll_interval)
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+def open_input(source: str, idle_timeout: float = 30.0, stop_cb=None):
+    """
+    Return the input for `convert.ToWav` (a path or a file object):
+
+    - "-": the data from stdin,
+    - a named pipe: read until the writer closes it,
+    - a regular file: follow it while it grows (see `GrowingFile`).
+    """
+
+    if source == "-":
+        return sys.stdin.buffer
+
+    if stat.S_ISFIFO(os.stat(source).st_mode):
+        return source
+
+    return GrowingFile(Path(source), idle_timeout, stop_cb=stop_cb)
+
+
+def parse_format(spec: Optional[str]) -> tuple:
+    """
+    Parse the input format given by the user: an ffmpeg format name (e.g.
+    "wav" or "mp3"), or for raw PCM "s16le[:sample rate[:channels]]" (16000
+    Hz and mono by default). None means the format is detected from the data.
+
+    Returns:
+        The format name and the options for `av.open`.
+
+    Raises:
+        ValueError: The sample rate or number of channels is not a number.
+    """
+
+    if not spec:
+        return None, None
+
+    name, *params = spec.split(":")
+    if name not in RAW_FORMATS:
+        if params:
+            raise ValueError(f"Only raw PCM formats take parameters: {spec}")
+        return name, None
+
+    try:
+        sample_rate = int(params[0]) if len(params) > 0 and params[0] else 16000
+        channels = int(params[1]) if len(params) > 1 and params[1] else 1
+    except ValueError as e:
+        raise ValueError(f"Invalid raw PCM format: {spec}") from e
+
+    return name, {"sample_rate": str(sample_rate), "ch_layout": f"{channels}c"}
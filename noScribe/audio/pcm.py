@@ -0,0 +1,200 @@
+"""
+Shared access to the converted audio as raw float32 PCM.
+
+The converted audio (16 kHz, mono) is published once as a raw float32 file.
+All pipeline stages (diarization, transcription, pause detection) map this
+file into memory instead of decoding the audio again. Mapped pages are shared
+between processes through the page cache, so no stage holds a private copy of
+the whole recording.
+
+The file can also be consumed while it is still being written (see
+`PcmWriter` and `GrowingPcm`), so that transcription starts before the
+conversion is finished.
+"""
+
+from pathlib import Path
+import json
+import logging
+import os
+import time
+import wave
+
+import numpy as np
+
+from .convert import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+DTYPE = np.float32
+
+
+def wav_to_pcm(
+    file_wav: Path, file_pcm: Path, chunk_samples: int = SAMPLE_RATE * 60
+) -> int:
+    """
+    Write the samples of a 16 kHz mono s16 wave file (as created by
+    `convert.ToWav`) as raw float32 PCM.
+
+    The wave file is read in chunks, so memory usage does not depend on the
+    length of the recording.
+
+    Returns:
+        The number of samples written.
+    """
+
+    with wave.open(str(file_wav), "rb") as wav:
+        if (
+            wav.getframerate() != SAMPLE_RATE
+            or wav.getnchannels() != 1
+            or wav.getsampwidth() != 2
+        ):
+            raise ValueError("unexpected wave format", file_wav, wav.getparams())
+
+        writer = PcmWriter(file_pcm)
+        try:
+            while True:
+                frames = wav.readframes(chunk_samples)
+                if not frames:
+                    break
+                writer.write(np.frombuffer(frames, dtype="<i2"))
+        except BaseException:
+            writer.close(complete=False)
+            raise
+        writer.close()
+
+    logger.debug("Wrote %s PCM samples: %s -> %s", writer.num_samples, file_wav, file_pcm)
+
+    return writer.num_samples
+
+
+def open_pcm(file_pcm: Path, writable: bool = False) -> np.ndarray:
+    """
+    Map a raw float32 PCM file into memory and return it as a 1-D array.
+
+    The array is read-only by default. With `writable=True`, a copy-on-write
+    mapping is returned: writes only touch private pages and never reach the
+    file. This is needed for libraries that refuse read-only buffers (e.g.
+    `torch.from_numpy`).
+    """
+
+    # `np.memmap` cannot map empty files.
+    if Path(file_pcm).stat().st_size == 0:
+        return np.zeros(0, dtype=DTYPE)
+
+    return np.memmap(file_pcm, dtype=DTYPE, mode="c" if writable else "r")
+
+
+def _marker(file_pcm: Path) -> Path:
+    return Path(str(file_pcm) + ".done")
+
+
+class PcmWriter:
+    """
+    Append s16 samples as float32 PCM to a file.
+
+    Readers may map the part written so far at any time. `close()` writes a
+    marker file next to the PCM file, which tells `GrowingPcm` that no more
+    samples will follow.
+    """
+
+    def __init__(self, file_pcm: Path):
+        self.file_pcm: Path = Path(file_pcm)
+        self.num_samples: int = 0
+        _marker(self.file_pcm).unlink(missing_ok=True)
+        self._file = open(self.file_pcm, "wb")
+
+    def write(self, samples: np.ndarray):
+        """
+        Append s16 samples (as numpy array).
+        """
+
+        if self._file is None:
+            raise ValueError("PCM writer already closed", self.file_pcm)
+
+        # Same scaling as `faster_whisper.audio.decode_audio`.
+        self._file.write((samples.astype(DTYPE) / 32768.0).tobytes())
+        self._file.flush()
+        self.num_samples += samples.shape[0]
+
+    def close(self, complete: bool = True):
+        """
+        Close the file. With `complete=False`, readers are told that writing
+        failed or was canceled.
+        """
+
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._file = None
+
+        # Written to a temporary file first, a reader must never see a
+        # marker that is only partly written.
+        marker = _marker(self.file_pcm)
+        marker_tmp = marker.with_name(marker.name + ".tmp")
+        with open(marker_tmp, "w", encoding="utf-8") as f:
+            json.dump({"samples": self.num_samples, "complete": complete}, f)
+        os.replace(marker_tmp, marker)
+
+
+class GrowingPcm:
+    """
+    Read access to a PCM file that is still being written by `PcmWriter`.
+    """
+
+    def __init__(self, file_pcm: Path, poll_interval: float = 0.1):
+        self.file_pcm: Path = Path(file_pcm)
+        self.poll_interval: float = poll_interval
+
+    def available(self) -> int:
+        """
+        Return the number of samples written so far.
+        """
+
+        return self.file_pcm.stat().st_size // np.dtype(DTYPE).itemsize
+
+    def finished(self) -> bool:
+        """
+        Return True if all samples have been written.
+
+        Raises:
+            RuntimeError: If the writer was closed before the conversion was
+                complete.
+        """
+
+        try:
+            with open(_marker(self.file_pcm), encoding="utf-8") as f:
+                marker = json.load(f)
+        except FileNotFoundError:
+            return False
+
+        if not marker.get("complete", False):
+            raise RuntimeError("Audio conversion did not complete", self.file_pcm)
+
+        return True
+
+    def wait(self, num_samples: int) -> int:
+        """
+        Block until at least `num_samples` samples are available or writing is
+        finished. Returns the number of available samples.
+        """
+
+        while True:
+            # Check the marker first: once it exists, all samples are written.
+            finished = self.finished()
+            available = self.available()
+            if finished or available >= num_samples:
+                return available
+            time.sleep(self.poll_interval)
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """
+        Return the samples from `start` to `stop` (which must be available).
+        """
+
+        return np.fromfile(
+            self.file_pcm,
+            dtype=DTYPE,
+            count=max(stop - start, 0),
+            offset=start * np.dtype(DTYPE).itemsize,
+        )
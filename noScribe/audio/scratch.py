@@ -0,0 +1,131 @@
+"""
+Scratch space for the intermediate audio files of a transcription job.
+
+By default, the files are written to the system's temp directory. This can be
+slow (e.g. on a network share), so a different directory can be configured,
+such as a RAM disk or a fast local drive. Short recordings can be kept in RAM
+entirely, using a RAM-backed file system if the system provides one (Linux:
+`/dev/shm`). Files are used instead of buffers in the process's own memory, as
+the transcription and diarization run in separate processes that map the
+converted audio.
+"""
+
+from pathlib import Path
+from typing import Optional
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# RAM-backed file systems, in order of preference.
+_MEMORY_DIRS = ["/dev/shm"]
+
+# Keep this share of the RAM-backed file system free for others.
+_MEMORY_RESERVE = 0.5
+
+
+def memory_dir(required_bytes: int = 0) -> Optional[Path]:
+    """
+    Return a RAM-backed directory with room for `required_bytes`, or None if
+    the system does not provide one.
+    """
+
+    for path in _MEMORY_DIRS:
+        if not (os.path.isdir(path) and os.access(path, os.W_OK)):
+            continue
+        try:
+            usage = shutil.disk_usage(path)
+        except OSError:
+            continue
+        if required_bytes <= usage.free - usage.total * _MEMORY_RESERVE:
+            return Path(path)
+
+    return None
+
+
+def select_dir(
+    scratch_dir: Optional[str] = None,
+    memory_max_sec: float = 0,
+    duration: Optional[float] = None,
+    required_bytes: int = 0,
+) -> tuple:
+    """
+    Choose the base directory of a job's scratch space.
+
+    Recordings up to `memory_max_sec` seconds are kept in RAM if possible.
+    Otherwise, `scratch_dir` is used, or the system's temp directory if it is
+    empty.
+
+    Returns:
+        The base directory (None for the system's temp directory) and whether
+        it is in RAM.
+    """
+
+    if memory_max_sec > 0 and duration is not None and duration <= memory_max_sec:
+        path = memory_dir(required_bytes)
+        if path is not None:
+            return path, True
+
+    if scratch_dir:
+        return Path(scratch_dir), False
+
+    return None, False
+
+
+class Scratch:
+    """
+    Directory for the intermediate files of one job.
+
+    In contrast to `tempfile.TemporaryDirectory`, the directory is not left to
+    the garbage collector but removed by `cleanup()` when the job is done.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None, in_memory: bool = False):
+        if base_dir is not None:
+            Path(base_dir).mkdir(parents=True, exist_ok=True)
+
+        self.path: Path = Path(tempfile.mkdtemp(prefix="noScribe_", dir=base_dir))
+        self.in_memory: bool = in_memory
+
+        logger.debug("Created scratch directory: %s", self.path)
+
+    def file(self, name: str) -> str:
+        """
+        Return the path of a file in the scratch directory.
+        """
+
+        return str(self.path / name)
+
+    def cleanup(self, retries: int = 5, delay: float = 0.2) -> bool:
+        """
+        Remove the directory and all files in it. Files that are still in use
+        (e.g. mapped by a process that is just exiting on Windows) are retried
+        a few times.
+
+        Returns:
+            False if the directory could not be removed.
+        """
+
+        for attempt in range(retries + 1):
+            try:
+                shutil.rmtree(self.path)
+                return True
+            except FileNotFoundError:
+                return True
+            except OSError as exc:
+                if attempt == retries:
+                    logger.warning("Failed to remove scratch directory %s: %s", self.path, exc)
+                    return False
+                time.sleep(delay)
+
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.cleanup()
+        return False
@@ -0,0 +1,200 @@
+"""
+Find the fastest CPU settings of a whisper model on this machine.
+
+The fastest compute type and number of threads depend on the CPU (e.g.
+whether it has fast int8 instructions, or how many of its cores are
+efficiency cores). Instead of guessing, `autotune` measures them: it
+transcribes a short clip with each candidate setting and keeps the fastest.
+
+To keep the number of runs (each loads the model anew) small, the settings
+are tuned one after the other: first the compute type, then the number of
+threads, then the number of parallel model workers (see
+`transcription.parallel_parts`).
+"""
+
+import gc
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+
+# Length of the clip that is transcribed for each measurement (seconds).
+CLIP_SEC = 60
+
+SAMPLING_RATE = 16000
+
+
+def thread_candidates(cpu_count: int) -> list:
+    """
+    Return the numbers of threads to try: powers of two up to `cpu_count`,
+    and `cpu_count` itself.
+    """
+
+    candidates = set()
+    threads = 1
+    while threads < cpu_count:
+        candidates.add(threads)
+        threads *= 2
+    candidates.add(max(cpu_count, 1))
+
+    return sorted(candidates)
+
+
+def worker_candidates(threads: int) -> list:
+    """
+    Return the numbers of parallel model workers to try with `threads`
+    threads. Each worker gets at least 2 threads.
+    """
+
+    candidates = [1]
+    workers = 2
+    while threads // workers >= 2:
+        candidates.append(workers)
+        workers *= 2
+
+    return candidates
+
+
+def synthetic_clip(seconds: float = CLIP_SEC, seed: int = 0) -> np.ndarray:
+    """
+    Return a clip that keeps the model busy like speech: harmonic "syllables"
+    with changing pitch, separated by short pauses, over a little noise.
+    Whisper does not understand it, of course, but the timings are close to
+    those of a real recording. A real recording gives better results, though.
+    """
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLING_RATE)) / SAMPLING_RATE
+
+    # 4 syllables per second, every 8th one silent
+    syllable = np.floor(t * 4).astype(int)
+    pitch = rng.uniform(100, 250, syllable.max() + 1)[syllable]
+    envelope = np.sin(np.pi * (t * 4 % 1)) ** 2
+    envelope[syllable % 8 == 7] = 0.0
+
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLING_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    clip = 0.3 * envelope * voice + 0.01 * rng.standard_normal(t.shape[0])
+
+    return clip.astype(np.float32)
+
+
+def measure(model_path: str, clip: np.ndarray, compute_type: str, threads: int, workers: int = 1,
+            beam_size: int = 5) -> float:
+    """
+    Return the time (in seconds) a model needs to transcribe the clip on the
+    CPU with the given settings. With several workers, each transcribes the
+    clip in its own thread at the same time and the time per clip is
+    returned.
+    """
+
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(
+        model_path,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=threads // workers,
+        num_workers=workers,
+        local_files_only=True,
+    )
+    options = dict(
+        language="en",
+        beam_size=beam_size,
+        temperature=0.0,
+        condition_on_previous_text=False,
+        vad_filter=False,
+    )
+
+    def transcribe(audio):
+        segments, _ = model.transcribe(audio, **options)
+        for _ in segments:
+            pass
+
+    try:
+        # warm up (memory allocation etc.)
+        transcribe(clip[: 5 * SAMPLING_RATE])
+
+        runs = [threading.Thread(target=transcribe, args=(clip,)) for _ in range(workers)]
+        start = time.perf_counter()
+        for thread in runs:
+            thread.start()
+        for thread in runs:
+            thread.join()
+        return (time.perf_counter() - start) / workers
+    finally:
+        del model
+        gc.collect()
+
+
+def tuned_settings(tuning: dict, model_name: str, device: str) -> dict:
+    """
+    Return the settings found by `autotune` for a model (`tuning` is the
+    `whisper_tuning` config) if the model runs on the CPU. `device` is the
+    device it runs on (see `transcription.whisper_device`); the settings
+    were measured on the CPU and are not used on the GPU.
+    """
+
+    if device == "cuda":
+        return {}
+
+    return (tuning or {}).get(model_name) or {}
+
+
+def autotune(measure_fn, cpu_count: int, default_threads: int, log=print) -> dict:
+    """
+    Find the fastest settings. `measure_fn(compute_type, threads, workers)`
+    returns the time per clip (see `measure`); settings that fail (e.g. a
+    compute type the CPU does not support) are skipped.
+
+    Returns:
+        A dict with `compute_type`, `threads` (in total) and `parallel_parts`
+        (the number of workers).
+    """
+
+    results = {}
+
+    def run(compute_type, threads, workers):
+        key = (compute_type, threads, workers)
+        if key not in results:
+            try:
+                results[key] = measure_fn(compute_type, threads, workers)
+                log(f"  {compute_type:>12}, {threads:3d} threads, {workers} worker(s): {results[key]:6.2f} s")
+            except Exception as e:
+                results[key] = None
+                log(f"  {compute_type:>12}, {threads:3d} threads, {workers} worker(s): failed ({e})")
+        return results[key]
+
+    def fastest(keys):
+        timed = [key for key in keys if results.get(key) is not None]
+        if not timed:
+            raise RuntimeError("No setting could be measured.")
+        return min(timed, key=lambda key: results[key])
+
+    default_threads = max(min(default_threads, cpu_count), 1)
+    for compute_type in COMPUTE_TYPES:
+        run(compute_type, default_threads, 1)
+    compute_type = fastest([(c, default_threads, 1) for c in COMPUTE_TYPES])[0]
+
+    for threads in thread_candidates(cpu_count):
+        run(compute_type, threads, 1)
+    threads = fastest([(compute_type, t, 1) for t in thread_candidates(cpu_count)])[1]
+
+    # More workers pay off with many threads only (see
+    # `transcription.parallel_parts`).
+    for workers in worker_candidates(cpu_count):
+        run(compute_type, cpu_count, workers)
+    best = fastest(
+        [(compute_type, threads, 1)] + [(compute_type, cpu_count, w) for w in worker_candidates(cpu_count)[1:]]
+    )
+
+    return {
+        "compute_type": best[0],
+        "threads": best[1],  # in total, shared by the workers
+        "parallel_parts": best[2],
+    }
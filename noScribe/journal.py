@@ -0,0 +1,177 @@
+"""
+Journal of a transcription job, for resuming it after a crash, a
+cancellation or the switch from CUDA to the CPU.
+
+Every segment the whisper worker sends is appended to a JSONL file (one JSON
+object per line) as soon as it arrives, as well as the result of the speaker
+identification. A job that did not finish can thus be resumed: the journal is
+replayed into the transcript, and whisper starts again where the last segment
+ended.
+
+The first line holds the settings of the job that change the segments (see
+`job_key`). The journal of a job with other settings is not used.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def job_key(job) -> dict:
+    """
+    Return the settings of a `TranscriptionJob` that the journal is only
+    valid for: the recording (and its version), the time range and the
+    settings of the models.
+    """
+
+    try:
+        stat = os.stat(job.audio_file)
+        audio_version = [stat.st_size, int(stat.st_mtime)]
+    except OSError:
+        audio_version = None
+
+    return {
+        "audio_file": str(job.audio_file),
+        "audio_version": audio_version,
+        "start": job.start,
+        "stop": job.stop,
+        "ranges": [list(r) for r in job.ranges] if job.ranges else None,
+        "language": job.language_name,
+        "speaker_detection": job.speaker_detection,
+        "disfluencies": job.disfluencies,
+        "whisper_model": getattr(job.whisper_model, "name", str(job.whisper_model)),
+        "whisper_refine_model": job.whisper_refine_model,
+        "whisper_options": job.whisper_options,
+        "vad_threshold": job.vad_threshold,
+    }
+
+
+def load(path: Path, key: dict) -> dict | None:
+    """
+    Read the journal at `path`.
+
+    Returns:
+        None if there is no journal for a job with these settings (`key`),
+        otherwise a dict with the `diarization` (None if not journaled) and
+        the `segments` in the order they arrived. An incomplete last line
+        (the journal was being written when the job crashed) is ignored.
+    """
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    try:
+        header = json.loads(lines[0])
+    except (IndexError, ValueError):
+        return None
+    if header.get("type") != "job" or header.get("key") != json.loads(json.dumps(key)):
+        return None
+
+    result = {"diarization": None, "segments": []}
+    for line in lines[1:]:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            break
+        if entry.get("type") == "diarization":
+            result["diarization"] = entry["segments"]
+        elif entry.get("type") == "segment":
+            result["segments"].append(entry["segment"])
+
+    return result
+
+
+def resume_point(segments: list) -> float:
+    """
+    Return the time (in seconds) from which a job with these journaled
+    segments (in the order they arrived) has to be transcribed again.
+
+    The segments of a single track follow each other, so the job resumes
+    where the last one ended. The segments of several tracks arrive in
+    order of their start (see `transcription.SegmentMerger`): all segments
+    that start before the last one have arrived, but a long segment of one
+    track may end after later segments of other tracks that have not
+    arrived yet. The job resumes at the start of the last segment then, and
+    the segments transcribed twice are dropped (see `is_duplicate`).
+    """
+
+    if not segments:
+        return 0.0
+    if any(segment.get("track") is not None for segment in segments):
+        return segments[-1]["start"]
+
+    return max(segment["end"] for segment in segments)
+
+
+def is_duplicate(segment: dict, segments: list, tolerance: float = 1.0) -> bool:
+    """
+    Whether `segment` was journaled before (in `segments`): a segment of the
+    same track with the same text that starts at about the same time
+    (within `tolerance` seconds).
+    """
+
+    text = (segment.get("text") or "").strip()
+    return any(
+        other.get("track") == segment.get("track")
+        and (other.get("text") or "").strip() == text
+        and abs(other["start"] - segment["start"]) <= tolerance
+        for other in segments
+    )
+
+
+class SegmentJournal:
+    """
+    Writes the journal of a job. The journal is created anew with the
+    content of `resumed` (from `load`), if any, so that an incomplete last
+    line does not remain.
+    """
+
+    def __init__(self, path: Path, key: dict, resumed: dict | None = None):
+        self.path = Path(path)
+        self.diarization: list | None = None
+        self.segments: list = []
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._write({"type": "job", "key": key})
+        if resumed:
+            if resumed["diarization"] is not None:
+                self.write_diarization(resumed["diarization"])
+            for segment in resumed["segments"]:
+                self.write_segment(segment)
+
+    def write_diarization(self, diarization: list):
+        self.diarization = diarization
+        self._write({"type": "diarization", "segments": diarization})
+
+    def write_segment(self, segment: dict):
+        self.segments.append(segment)
+        self._write({"type": "segment", "segment": segment})
+
+    def close(self):
+        try:
+            self._file.close()
+        except Exception as e:
+            logger.debug(e)
+
+    def remove(self):
+        """
+        Close and delete the journal (the job is finished).
+        """
+
+        self.close()
+        try:
+            self.path.unlink()
+        except OSError as e:
+            logger.debug(e)
+
+    def _write(self, entry: dict):
+        # one line per entry, flushed right away so that it survives a crash
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
@@ -32,12 +32,12 @@ import tkinter as tk
 import traceback
 import urllib
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import Enum
 from functools import partial
 from pathlib import Path
 from subprocess import Popen, run
-from tempfile import TemporaryDirectory
-from threading import Thread
+from threading import Event, Thread
 from typing import Optional
 
 import AdvancedHTMLParser
@@ -46,12 +46,12 @@ import customtkinter as ctk
 import i18n
 import yaml
 from customtkinter.windows.widgets.scaling import CTkScalingBaseClass
-from faster_whisper.audio import decode_audio
-from faster_whisper.vad import VadOptions, get_speech_timestamps
+from faster_whisper.vad import VadOptions
 from i18n import t
 from PIL import Image
 
-from . import audio, exception, transcription, utils
+from . import audio, autotune, exception, journal, transcription, utils, vad
+from .warm_worker import WarmWorker
 from .CTkToolTips import CTkToolTip
 from .tkHyperlinkManager import HyperlinkManager
 
@@ -281,6 +281,72 @@ elif platform.system() == "Darwin": # = MAC
 else:
     raise Exception('Platform not supported yet.')
 
+# long recordings are split at pauses into this many parts that are transcribed
+# in parallel, each with its share of the threads (0 = one part per 8 threads)
+whisper_parallel_parts = int(get_config('whisper_parallel_parts', 0))
+
+# automatic language detection: sample up to this many 30-second windows of
+# speech across the recording, stop as soon as a language reaches the threshold
+language_detection_windows = int(get_config('language_detection_windows', 5))
+language_detection_threshold = float(get_config('language_detection_threshold', 0.8))
+
+# number of processes decoding the audio in parallel (1 = off). Splitting relies
+# on exact seeking, which is not guaranteed for all formats (e.g. VBR mp3).
+audio_conversion_processes = int(get_config('audio_conversion_processes', 1))
+
+# cache of converted audio, so that re-running a job skips the conversion
+# (size in MB, 0 = off). Off by default: the cache keeps the audio of the
+# recordings, which may be sensitive, after the jobs are finished.
+audio_cache = audio.cache.AudioCache(
+    Path(config_dir) / 'audio_cache',
+    int(get_config('audio_cache_size_mb', 0)) * 1024 * 1024,
+)
+
+# transcribe while the audio is still being converted (only without speaker
+# detection), for recordings longer than this (minutes). Shorter recordings
+# are converted first, so that silence can be skipped (see below).
+audio_pipeline_min_minutes = float(get_config('audio_pipeline_min_minutes', 10))
+
+# skip silence at the start and end of the recording if it is longer than
+# this (seconds, 0 = off)
+silence_trim_sec = float(get_config('silence_trim_sec', 5))
+
+# keep the whisper model loaded between jobs for this many seconds (0 = start
+# a new worker process for every job)
+whisper_worker_idle_timeout = float(get_config('whisper_worker_idle_timeout', 300))
+# the same for the pyannote pipeline (speaker detection)
+pyannote_worker_idle_timeout = float(get_config('pyannote_worker_idle_timeout', 300))
+
+# live transcription (`--live`): the recording is transcribed in windows of
+# this length (seconds) while it is being recorded. Shorter windows make the
+# transcript follow the recording more closely. A growing file that has not
+# grown for `live_idle_timeout_sec` seconds is considered finished.
+live_window_sec = float(get_config('live_window_sec', 30))
+live_idle_timeout_sec = float(get_config('live_idle_timeout_sec', 30))
+
+# energy gate in front of the voice activity detection: audio quieter than this
+# (RMS in dBFS) is silence, the VAD model rates only the louder regions, with a
+# margin of `vad_energy_gate_margin_ms` around them (see `vad.energy_gate`,
+# 'off' = the model rates all of the audio)
+vad_energy_gate_db = str(get_config('vad_energy_gate_db', vad.ENERGY_GATE['threshold_db']))
+if vad_energy_gate_db.lower() == 'off':
+    vad_energy_gate = None
+else:
+    vad_energy_gate = {
+        'threshold_db': float(vad_energy_gate_db),
+        'margin_ms': float(get_config('vad_energy_gate_margin_ms', vad.ENERGY_GATE['margin_ms'])),
+    }
+
+# resume an unfinished job (crash, cancel) with the same settings from its
+# journal instead of starting over (see `journal`)
+resume_unfinished_jobs = get_config('resume_unfinished_jobs', 'True') != 'False'
+
+# scratch space for the converted audio of a job ('' = system temp directory).
+# Recordings up to `scratch_memory_max_minutes` are kept in RAM if the system
+# provides a RAM-backed file system (0 = off).
+scratch_dir = get_config('scratch_dir', '')
+scratch_memory_max_minutes = float(get_config('scratch_memory_max_minutes', 60))
+
 # timestamp regex
 timestamp_re = re.compile(r'\[\d\d:\d\d:\d\d.\d\d\d --> \d\d:\d\d:\d\d.\d\d\d\]')
 
@@ -321,6 +387,10 @@ class TranscriptionJob:
         # Time range
         self.start: int = 0  # milliseconds
         self.stop: int = 0   # milliseconds (0 means until end)
+        # Several time ranges [(start, stop), ...] (see `utils.str_to_ranges`),
+        # empty if only start and stop are used. The ranges are converted and
+        # transcribed as one piece of audio.
+        self.ranges: list = []
         
         # Language and model settings
         self.language_name: str = 'Auto'
@@ -333,10 +403,17 @@ class TranscriptionJob:
         self.disfluencies: bool = True
         self.pause: int = 0  # index value (0=none, 1=1sec+, etc.)
         
+        # Speed/quality profile and its decoder settings (see
+        # `transcription.get_profile`)
+        self.whisper_profile: str = transcription.DEFAULT_PROFILE
+        self.whisper_options: dict = {}
+
         # Config-based options
         self.whisper_beam_size: int = 1
-        self.whisper_temperature: float = 0.0
+        self.whisper_temperature: list = [0.0]
         self.whisper_compute_type: str = 'default'
+        self.whisper_batch_size: int = 0  # batched inference, 0 = off
+        self.whisper_refine_model: str = ''  # two-pass transcription, '' = off
         self.timestamp_interval: int = 60_000
         self.timestamp_color: str = '#78909C'
         self.pause_marker: str = '.'
@@ -346,6 +423,38 @@ class TranscriptionJob:
         
         # Derived properties
         self.file_ext: str = ''
+
+        # Media information (see `TranscriptionQueue.probe_jobs`)
+        self.media_info: Optional[audio.convert.MediaInfo] = None
+
+        # Live transcription: the audio file is still being recorded, or
+        # "-" (stdin) or a named pipe (see `audio.live`)
+        self.live: bool = False
+        self.input_format: Optional[str] = None  # see `audio.live.parse_format`
+
+    def get_ranges(self) -> list:
+        """Get the time ranges [(start, stop), ...] to transcribe"""
+        return self.ranges if self.ranges else [(self.start, self.stop)]
+
+    def to_original_time(self, milliseconds: int, end: bool = False) -> int:
+        """Map a time in the converted audio (all ranges joined) to the
+        original audio file. `end`: the time is the end of a segment."""
+        return utils.map_to_ranges(milliseconds, self.get_ranges(), end)
+
+    def needs_word_timestamps(self) -> bool:
+        """Whether the transcription needs word-level timestamps. Only the
+        speaker detection does: the speaker of a segment is found by its
+        start and end, which are more precise when aligned to the words."""
+        return self.speaker_detection not in ('none', 'tracks')
+
+    def get_audio_duration(self) -> Optional[float]:
+        """Get the duration (in seconds) of the audio to transcribe, if known"""
+        if self.media_info is None:
+            return None
+        durations = [self.media_info.converted_duration(start, stop) for start, stop in self.get_ranges()]
+        if None in durations:
+            return None
+        return sum(durations)
     
     def set_running(self):
         """Mark job as running and record start time"""
@@ -395,12 +504,25 @@ class TranscriptionJob:
 
         # Time range
         try:
-            start_ms = getattr(self, 'start', 0) or 0
-            stop_ms = getattr(self, 'stop', 0) or 0
-            start_txt = utils.ms_to_str(start_ms) if start_ms > 0 else '00:00:00'
-            stop_txt = utils.ms_to_str(stop_ms) if stop_ms > 0 else 'end'
-            lines.append(f"{t('label_start')} {start_txt}")
-            lines.append(f"{t('label_stop')} {stop_txt}")
+            if self.ranges:
+                lines.append(f"{t('label_ranges')} {utils.ranges_to_str(self.ranges)}")
+            else:
+                start_ms = getattr(self, 'start', 0) or 0
+                stop_ms = getattr(self, 'stop', 0) or 0
+                start_txt = utils.ms_to_str(start_ms) if start_ms > 0 else '00:00:00'
+                stop_txt = utils.ms_to_str(stop_ms) if stop_ms > 0 else 'end'
+                lines.append(f"{t('label_start')} {start_txt}")
+                lines.append(f"{t('label_stop')} {stop_txt}")
+        except Exception:
+            pass
+
+        # Audio (duration and stream info from probing)
+        try:
+            if self.media_info is not None:
+                info = self.media_info
+                duration = self.get_audio_duration()
+                duration_txt = utils.ms_to_str(duration * 1000) if duration is not None else '?'
+                lines.append(f"{t('job_tt_audio')} {duration_txt} ({info.codec}, {info.sample_rate} Hz, {info.channels} ch)")
         except Exception:
             pass
 
@@ -419,6 +541,12 @@ class TranscriptionJob:
         except Exception:
             pass
 
+        # Speed/quality profile
+        try:
+            lines.append(f"{t('label_profile')} {self.whisper_profile}")
+        except Exception:
+            pass
+
         # Pause threshold (map int index back to label)
         try:
             pause_opts = ['none', '1sec+', '2sec+', '3sec+']
@@ -497,6 +625,23 @@ class TranscriptionQueue:
         waiting_jobs = self.get_waiting_jobs()
         return waiting_jobs[0] if waiting_jobs else None
     
+    def probe_jobs(self, jobs: list[TranscriptionJob], max_workers: int = 8) -> dict:
+        """Probe the audio files of the given jobs in parallel and store the
+        results in job.media_info. Returns a dict with the jobs whose file
+        could not be probed and the respective exception."""
+        failed = {}
+        if not jobs:
+            return failed
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+            futures = {pool.submit(audio.convert.probe, Path(job.audio_file)): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    job.media_info = future.result()
+                except Exception as e:
+                    failed[job] = e
+        return failed
+
     def get_queue_summary(self) -> dict:
         """Get summary statistics of the queue"""
         return {
@@ -551,7 +696,8 @@ class TranscriptionQueue:
 def create_transcription_job(audio_file=None, transcript_file=None, start_time=None, stop_time=None,
                            language_name=None, whisper_model_name=None, speaker_detection=None,
                            overlapping=None, timestamps=None, disfluencies=None, pause=None,
-                           cli_mode=False) -> TranscriptionJob:
+                           cli_mode=False, ranges=None, batch_size=None, profile=None,
+                           refine_model=None, live=False, input_format=None) -> TranscriptionJob:
     """Create a TranscriptionJob with all default values
     
     This function handles both CLI and GUI job creation, ensuring all defaults
@@ -570,6 +716,11 @@ def create_transcription_job(audio_file=None, transcript_file=None, start_time=N
     # Time range
     job.start = start_time if start_time is not None else 0
     job.stop = stop_time if stop_time is not None else 0
+    if ranges:
+        # several time ranges replace start and stop
+        job.ranges = list(ranges)
+        job.start = job.ranges[0][0]
+        job.stop = job.ranges[-1][1]
     
     # Language - handle both language names and codes
     if language_name:
@@ -606,16 +757,31 @@ def create_transcription_job(audio_file=None, transcript_file=None, start_time=N
     else:
         job.pause = 1  # default to '1sec+'
     
+    # Speed/quality profile (the profiles can be adjusted in the config)
+    job.whisper_profile = profile or get_config('whisper_profile', transcription.DEFAULT_PROFILE)
+    job.whisper_options = transcription.get_profile(job.whisper_profile, get_config('whisper_profiles', {}))
+
     # Config-based options (use defaults from config)
-    job.whisper_beam_size = get_config('whisper_beam_size', 1)
-    job.whisper_temperature = get_config('whisper_temperature', 0.0)
-    job.whisper_compute_type = get_config('whisper_compute_type', 'default')
+    job.whisper_beam_size = job.whisper_options['beam_size']
+    job.whisper_temperature = job.whisper_options['temperature']
+    job.whisper_compute_type = job.whisper_options['compute_type'] or get_config('whisper_compute_type', 'default')
+    job.whisper_batch_size = int(batch_size if batch_size is not None else get_config('whisper_batch_size', 0))
+    job.whisper_refine_model = refine_model if refine_model is not None else get_config('whisper_refine_model', '')
     job.timestamp_interval = get_config('timestamp_interval', 60_000)
     job.timestamp_color = get_config('timestamp_color', '#78909C')
     job.pause_marker = get_config('pause_seconds_marker', '.')
     job.auto_save = False if get_config('auto_save', 'True') == 'False' else True
         
     job.vad_threshold = float(get_config('voice_activity_detection_threshold', '0.5'))
+
+    # Live transcription: the speaker detection needs the whole recording,
+    # and there is nothing to seek in.
+    job.live = live
+    job.input_format = input_format
+    if live:
+        job.speaker_detection = 'none'
+        job.start = job.stop = 0
+        job.ranges = None
     
     # Platform-specific XPU settings
     """    
@@ -650,6 +816,7 @@ def create_job_from_cli_args(args) -> TranscriptionJob:
     # Parse time arguments
     start_time = utils.str_to_ms(args.start) if args.start else None
     stop_time = utils.str_to_ms(args.stop) if args.stop else None
+    ranges = utils.str_to_ranges(args.range) if args.range else None
 
     return create_transcription_job(
         audio_file=args.audio_file,
@@ -663,7 +830,13 @@ def create_job_from_cli_args(args) -> TranscriptionJob:
         timestamps=args.timestamps,
         disfluencies=args.disfluencies,
         pause=args.pause,
-        cli_mode=True
+        cli_mode=True,
+        ranges=ranges,
+        batch_size=args.batch_size,
+        profile=args.profile,
+        refine_model=args.refine_model,
+        live=args.live,
+        input_format=args.input_format,
     )
 
 def parse_cli_args():
@@ -676,13 +849,26 @@ Examples:
   python -m noScribe audio.wav transcript.html
   python -m noScribe audio.mp3 transcript.txt --language en --speaker-detection 2
   python -m noScribe audio.wav transcript.vtt --start 00:01:30 --stop 00:05:00
+  python -m noScribe audio.wav transcript.html --range 00:10:00-00:20:00 --range 02:00:00-02:30:00
   python -m noScribe --help-models  # Show available models
+  python -m noScribe --audio-cache list  # Show cached converted audio
+  python -m noScribe --autotune  # Find the fastest settings for this machine
+  ffmpeg -f pulse -i default -f wav - | python -m noScribe - live.html --live --no-gui  # Live transcription
         """
     )
     
     # Special argument to show available models
     parser.add_argument('--help-models', action='store_true',
                        help='Show available Whisper models and exit')
+    parser.add_argument('--audio-cache', choices=['list', 'purge'], default=None,
+                       help='List or delete the cached converted audio and exit')
+    parser.add_argument('--autotune', action='store_true',
+                       help='Find the fastest CPU settings (compute type, threads) for the installed '
+                            'models (or --model) on this machine, save them in the config file and exit. '
+                            'Uses the first minute of audio_file, if given.')
+    parser.add_argument('--benchmark-vad', action='store_true',
+                       help='Compare the speech found in audio_file with and without the energy gate '
+                            '(vad_energy_gate_db in the config file) and the time it takes, and exit.')
     
     # Required arguments (when not using --help-models)
     parser.add_argument('audio_file', nargs='?',
@@ -697,12 +883,16 @@ Examples:
                        help='Start time (format: HH:MM:SS)')
     parser.add_argument('--stop', default=None,
                        help='Stop time (format: HH:MM:SS)')
+    parser.add_argument('--range', action='append', default=None,
+                       help='Time range to transcribe (format: HH:MM:SS-HH:MM:SS, open end: HH:MM:SS-). '
+                            'Can be given several times, the ranges are transcribed in one job. '
+                            'Replaces --start/--stop (headless mode only).')
     parser.add_argument('--language', default=None,
                        help='Language code (e.g., en, de, fr) or "auto" for auto-detection')
     parser.add_argument('--model', default=None,
                        help='Whisper model to use (use --help-models to see available models)')
-    parser.add_argument('--speaker-detection', choices=['none', 'auto', '1', '2', '3', '4', '5', '6', '7', '8', '9', '10'], default=None,
-                       help='Speaker detection/diarization setting')
+    parser.add_argument('--speaker-detection', choices=['none', 'auto', 'tracks', '1', '2', '3', '4', '5', '6', '7', '8', '9', '10'], default=None,
+                       help='Speaker detection/diarization setting ("tracks": one speaker per audio channel or stream)')
     parser.add_argument('--overlapping', action='store_true', default=None, 
                        help='Enable overlapping speech detection')
     parser.add_argument('--no-overlapping', action='store_false', dest='overlapping', default=None,
@@ -717,6 +907,22 @@ Examples:
                        help='Exclude disfluencies from transcript')
     parser.add_argument('--pause', choices=['none', '1sec+', '2sec+', '3sec+'], default=None,
                        help='Mark pauses in transcript')
+    parser.add_argument('--profile', default=None,
+                       help='Speed/quality profile: "draft", "balanced" or "precise" '
+                            '(or a profile defined in the config file)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                       help='Transcribe this many pieces of the audio at once (batched inference, '
+                            'faster but needs more memory; 0 = off)')
+    parser.add_argument('--live', action='store_true',
+                       help='Live transcription: transcribe audio_file while it is still being recorded, '
+                            'or "-" (stdin) or a named pipe. The transcript is updated as the recording '
+                            'goes on. No speaker detection.')
+    parser.add_argument('--input-format', default=None,
+                       help='Format of a live input if it cannot be detected, e.g. "wav", or for raw PCM '
+                            '"s16le[:sample rate[:channels]]" (default: 16000 Hz, mono)')
+    parser.add_argument('--refine-model', default=None,
+                       help='Two-pass transcription: transcribe segments with low confidence again with '
+                            'this model (e.g. --model fast --refine-model precise)')
     
     return parser.parse_args()
 
@@ -918,6 +1124,7 @@ def _init_app_state(app):
     app._worker_threads = []
     app._mp_proc = None
     app._mp_queue = None
+    app._warm_workers = {}  # name -> WarmWorker, see `_get_warm_worker`
     app._ffmpeg_proc = None
     app._shutting_down = False
 
@@ -1102,28 +1309,39 @@ class App(ctk.CTk):
         elif len(self.whisper_models) > 0:
             self.option_menu_whisper_model.set(next(self.whisper_models.keys()))
 
+        # Speed/quality profile
+        self.label_profile = ctk.CTkLabel(self.frame_options, text=t('label_profile'))
+        self.label_profile.grid(column=0, row=4, sticky='w', pady=5)
+
+        profiles = list(transcription.PROFILES) + [name for name in get_config('whisper_profiles', {}) or {}
+                                                   if name not in transcription.PROFILES]
+        self.option_menu_profile = ctk.CTkOptionMenu(self.frame_options, width=100, values=profiles)
+        self.option_menu_profile.grid(column=1, row=4, sticky='e', pady=5)
+        last_profile = get_config('last_profile', get_config('whisper_profile', transcription.DEFAULT_PROFILE))
+        self.option_menu_profile.set(last_profile if last_profile in profiles else transcription.DEFAULT_PROFILE)
+
         # Mark pauses
         self.label_pause = ctk.CTkLabel(self.frame_options, text=t('label_pause'))
-        self.label_pause.grid(column=0, row=4, sticky='w', pady=5)
+        self.label_pause.grid(column=0, row=5, sticky='w', pady=5)
 
         self.option_menu_pause = ctk.CTkOptionMenu(self.frame_options, width=100, values=['none', '1sec+', '2sec+', '3sec+'])
-        self.option_menu_pause.grid(column=1, row=4, sticky='e', pady=5)
+        self.option_menu_pause.grid(column=1, row=5, sticky='e', pady=5)
         self.option_menu_pause.set(get_config('last_pause', '1sec+'))
 
         # Speaker Detection (Diarization)
         self.label_speaker = ctk.CTkLabel(self.frame_options, text=t('label_speaker'))
-        self.label_speaker.grid(column=0, row=5, sticky='w', pady=5)
+        self.label_speaker.grid(column=0, row=6, sticky='w', pady=5)
 
-        self.option_menu_speaker = ctk.CTkOptionMenu(self.frame_options, width=100, values=['none', 'auto', '1', '2', '3', '4', '5', '6', '7', '8', '9', '10'])
-        self.option_menu_speaker.grid(column=1, row=5, sticky='e', pady=5)
+        self.option_menu_speaker = ctk.CTkOptionMenu(self.frame_options, width=100, values=['none', 'auto', 'tracks', '1', '2', '3', '4', '5', '6', '7', '8', '9', '10'])
+        self.option_menu_speaker.grid(column=1, row=6, sticky='e', pady=5)
         self.option_menu_speaker.set(get_config('last_speaker', 'auto'))
 
         # Overlapping Speech (Diarization)
         self.label_overlapping = ctk.CTkLabel(self.frame_options, text=t('label_overlapping'))
-        self.label_overlapping.grid(column=0, row=6, sticky='w', pady=5)
+        self.label_overlapping.grid(column=0, row=7, sticky='w', pady=5)
 
         self.check_box_overlapping = ctk.CTkCheckBox(self.frame_options, text = '')
-        self.check_box_overlapping.grid(column=1, row=6, sticky='e', pady=5)
+        self.check_box_overlapping.grid(column=1, row=7, sticky='e', pady=5)
         overlapping = config.get('last_overlapping', True)
         if overlapping:
             self.check_box_overlapping.select()
@@ -1132,10 +1350,10 @@ class App(ctk.CTk):
             
         # Disfluencies
         self.label_disfluencies = ctk.CTkLabel(self.frame_options, text=t('label_disfluencies'))
-        self.label_disfluencies.grid(column=0, row=7, sticky='w', pady=5)
+        self.label_disfluencies.grid(column=0, row=8, sticky='w', pady=5)
 
         self.check_box_disfluencies = ctk.CTkCheckBox(self.frame_options, text = '')
-        self.check_box_disfluencies.grid(column=1, row=7, sticky='e', pady=5)
+        self.check_box_disfluencies.grid(column=1, row=8, sticky='e', pady=5)
         check_box_disfluencies = config.get('last_disfluencies', True)
         if check_box_disfluencies:
             self.check_box_disfluencies.select()
@@ -1144,10 +1362,10 @@ class App(ctk.CTk):
 
         # Timestamps in text
         self.label_timestamps = ctk.CTkLabel(self.frame_options, text=t('label_timestamps'))
-        self.label_timestamps.grid(column=0, row=8, sticky='w', pady=5)
+        self.label_timestamps.grid(column=0, row=9, sticky='w', pady=5)
 
         self.check_box_timestamps = ctk.CTkCheckBox(self.frame_options, text = '')
-        self.check_box_timestamps.grid(column=1, row=8, sticky='e', pady=5)
+        self.check_box_timestamps.grid(column=1, row=9, sticky='e', pady=5)
         check_box_timestamps = config.get('last_timestamps', False)
         if check_box_timestamps:
             self.check_box_timestamps.select()
@@ -2071,7 +2289,7 @@ class App(ctk.CTk):
             progr = 0.05 # (step 1)
             progr = progr + (value * 0.45 / 100)
         elif step == 3:
-            if speaker_detection != 'none':
+            if speaker_detection not in ('none', 'tracks'):
                 progr = 0.05 + 0.45 # (step 1 + step 2)
                 progr_factor = 0.5
             else:
@@ -2154,7 +2372,8 @@ class App(ctk.CTk):
                 timestamps=self.check_box_timestamps.get(),
                 disfluencies=self.check_box_disfluencies.get(),
                 pause=self.option_menu_pause.get(),  # Pass string value
-                cli_mode=False
+                cli_mode=False,
+                profile=self.option_menu_profile.get(),
             )
             # Handle VTT format warnings in GUI mode
             if job.file_ext == 'vtt' and (job.pause > 0 or job.overlapping or job.timestamps):
@@ -2165,6 +2384,23 @@ class App(ctk.CTk):
         
         return queue
 
+    def _preflight_jobs(self):
+        """Probe all waiting jobs that have not been probed yet. Jobs whose
+        audio file cannot be read fail right away instead of after the jobs
+        before them have been processed."""
+        # (live input cannot be probed, it would be consumed)
+        jobs = [job for job in self.queue.get_waiting_jobs() if job.media_info is None and not job.live]
+        if not jobs:
+            return
+        self.logn(t('queue_probing', total=len(jobs)))
+        failed = self.queue.probe_jobs(jobs)
+        for job, e in failed.items():
+            job.set_error(t('err_probing_audio', audio_file=os.path.basename(job.audio_file), error=str(e)),
+                          ''.join(traceback.format_exception(e)))
+            self.logn(job.error_message, 'error')
+        if failed:
+            self.update_queue_table()
+
     def transcription_worker(self, start_job_index=None):
         """Process transcription jobs from the queue"""
         queue_start_time = datetime.datetime.now()
@@ -2180,8 +2416,12 @@ class App(ctk.CTk):
             pending = len(self.queue.get_waiting_jobs())
             if pending > 0:
                 self.logn(t('queue_start_jobs', total=pending))
+                self._preflight_jobs()
+                queue_audio = sum(job.get_audio_duration() or 0 for job in self.queue.get_waiting_jobs())
+                self.logn(t('queue_audio_duration', duration=utils.ms_to_str(queue_audio * 1000)))
             else:
                 self.logn(t('queue_none_waiting'))                
+            queue_audio_processed = 0.0
             # Process each job in the queue
             while self.queue.has_pending_jobs():
                 # If global cancel was requested (via Stop button), cancel all waiting jobs
@@ -2191,6 +2431,9 @@ class App(ctk.CTk):
                         self.update_queue_table()
                     break
                 
+                # Probe jobs that were added while the queue is running
+                self._preflight_jobs()
+
                 # Get next job
                 job = None
                 if start_job_index and start_job_index < len(self.queue.jobs):
@@ -2213,6 +2456,14 @@ class App(ctk.CTk):
                     queue_jobs_processed += 1
                     job.set_finished()
                     self.update_queue_table()
+
+                    # Estimate the remaining time from the processing speed so far
+                    queue_audio_processed += job.get_audio_duration() or 0
+                    remaining_audio = sum(j.get_audio_duration() or 0 for j in self.queue.get_waiting_jobs())
+                    if queue_audio_processed > 0 and remaining_audio > 0:
+                        elapsed = (datetime.datetime.now() - queue_start_time).total_seconds()
+                        remaining_time = remaining_audio * elapsed / queue_audio_processed
+                        self.logn(t('queue_remaining_time', time=utils.ms_to_str(remaining_time * 1000)))
                     
                 except Exception as e:
                     # Distinguish cancellation from real errors
@@ -2278,17 +2529,18 @@ class App(ctk.CTk):
         job.set_running()
         self.update_queue_table()
         
-        tmpdir = TemporaryDirectory('noScribe')
-        tmp_audio_file = os.path.join(tmpdir.name, 'tmp_audio.wav')
         orig_transcript_file = job.transcript_file
 
         try:
             # Create option info string for logging
             option_info = ''
-            if job.start > 0:
-                option_info += f'{t("label_start")} {utils.ms_to_str(job.start)} | '.replace(':', '꞉') # replace the normal colon here in the header with a special character so that MAXQDA does not misinterpret it as a time marker in the transcript.
-            if job.stop > 0:
-                option_info += f'{t("label_stop")} {utils.ms_to_str(job.stop)} | '.replace(':', '꞉')
+            if job.ranges:
+                option_info += f'{t("label_ranges")} {utils.ranges_to_str(job.ranges)} | '.replace(':', '꞉')
+            else:
+                if job.start > 0:
+                    option_info += f'{t("label_start")} {utils.ms_to_str(job.start)} | '.replace(':', '꞉') # replace the normal colon here in the header with a special character so that MAXQDA does not misinterpret it as a time marker in the transcript.
+                if job.stop > 0:
+                    option_info += f'{t("label_stop")} {utils.ms_to_str(job.stop)} | '.replace(':', '꞉')
             option_info += f'{t("label_language")} {job.language_name} ({languages[job.language_name]}) | '
             option_info += f'{t("label_speaker")} {job.speaker_detection} | '
             option_info += f'{t("label_overlapping")} {job.overlapping} | '
@@ -2302,9 +2554,13 @@ class App(ctk.CTk):
             self.log_file = open(f'{config_dir}/log/{Path(job.transcript_file).stem}.log', 'w', encoding="utf-8")
 
             # Log job configuration
+            self.logn(f'whisper profile: {job.whisper_profile}', where='file')
             self.logn(f'whisper beam size: {job.whisper_beam_size}', where='file')
             self.logn(f'whisper temperature: {job.whisper_temperature}', where='file')
             self.logn(f'whisper compute type: {job.whisper_compute_type}', where='file')
+            self.logn(f'whisper word timestamps: {job.whisper_options["word_timestamps"] and job.needs_word_timestamps()}', where='file')
+            self.logn(f'whisper batch size: {job.whisper_batch_size}', where='file')
+            self.logn(f'whisper refine model: {job.whisper_refine_model}', where='file')
             self.logn(f'timestamp_interval: {job.timestamp_interval}', where='file')
             self.logn(f'timestamp_color: {job.timestamp_color}', where='file')
 
@@ -2327,7 +2583,21 @@ class App(ctk.CTk):
                 else:
                     self.logn("macOS version < 12.3:\nMPS not available: Using CPU\nPerformance might be poor\nConsider updating macOS, if possible", where="file")
                 """
+
+            scratch = self._create_scratch(job)
+            tmp_pcm_file = scratch.file('tmp_audio.f32')
+            seg_journal = None
             try:
+                # Journal of the speaker identification and the segments. An
+                # unfinished earlier run of this job is resumed from it.
+                journal_path = Path(config_dir) / 'log' / f'{Path(job.transcript_file).stem}.journal.jsonl'
+                journal_key = journal.job_key(job)
+                resumed = None
+                if resume_unfinished_jobs and not job.live:
+                    resumed = journal.load(journal_path, journal_key)
+                if resumed is not None and not resumed['segments'] and resumed['diarization'] is None:
+                    resumed = None
+                seg_journal = journal.SegmentJournal(journal_path, journal_key, resumed)
 
                 #-------------------------------------------------------
                 # 1) Convert Audio
@@ -2335,57 +2605,178 @@ class App(ctk.CTk):
                 self.logn()
                 self.logn(t('start_audio_conversion'), 'highlight')
 
-                try:
-                    # Add audio conversion job.
-                    self._ffmpeg_proc = audio.convert.ToWav(
-                        Path(job.audio_file),
-                        Path(tmp_audio_file),
-                        force=True
-                    )
-                    self._ffmpeg_proc.open()
+                # Speaker detection by track: every channel (or stream) of the
+                # recording is converted and transcribed separately, one
+                # speaker per track. No diarization needed.
+                track_files = []  # (track, pcm file)
+                if job.speaker_detection == 'tracks':
+                    tracks = job.media_info.tracks() if job.media_info is not None else []
+                    if len(tracks) > 1:
+                        self.logn(t('tracks_found', count=len(tracks)))
+                        track_files = [
+                            (track, scratch.file(f'tmp_audio_{i}.f32'))
+                            for i, track in enumerate(tracks)
+                        ]
+                    else:
+                        self.logn(t('tracks_single'))
+                conversions = track_files or [(None, tmp_pcm_file)]
 
-                    if job.start > 0:
-                        self._ffmpeg_proc.seek(job.start)
+                # Re-use the audio converted by an earlier run of the same
+                # recording and time range.
+                cache_keys = {}
+                if audio_cache.max_bytes > 0 and not job.live:
+                    try:
+                        cached = False
+                        for track, pcm_file in conversions:
+                            cache_keys[pcm_file] = audio_cache.key(
+                                Path(job.audio_file), job.start, job.stop, track, ranges=job.ranges
+                            )
+                            cached = audio_cache.get(cache_keys[pcm_file], Path(pcm_file)) or cached
+                        if cached:
+                            self.logn(t('audio_conversion_cached'))
+                    except Exception as e:
+                        cache_keys = {}
+                        self.logn(f'Audio cache error: {e}', where='file')
 
-                    if job.stop > 0:
-                        self._ffmpeg_proc.stop_after(job.stop)
+                def convert_audio(track=None, pcm_file=tmp_pcm_file, abort=None):
+                    result = self._convert_audio(job, pcm_file, scratch, track, abort)
 
-                    # Poll loop to allow responsive cancel during conversion
-                    while self._ffmpeg_proc.convert():
-                        if self.cancel:
-                            # TODO: replace this with an UserCancelException or
-                            # similar.
-                            raise Exception(t('err_user_cancelation'))
+                    if pcm_file in cache_keys:
+                        try:
+                            audio_cache.put(
+                                cache_keys[pcm_file],
+                                Path(pcm_file),
+                                {'source': job.audio_file, 'start': job.start, 'stop': job.stop,
+                                 'ranges': job.ranges, 'track': track},
+                            )
+                        except Exception as e:
+                            self.logn(f'Audio cache error: {e}', where='file')
 
-                except Exception as e:
-                    traceback_str = traceback.format_exc()
+                    return result
 
-                    # Distinguish cancel vs. real error during audio conversion
-                    if str(e) == t('err_user_cancelation') or self.cancel:
-                        job.set_canceled(t('err_user_cancelation'))
-                        self.update_queue_table()
-                        raise e
+                # Speaker identification needs the whole recording, the
+                # transcription does not: it reads the audio while it is still
+                # being converted in the background (pipelined ingest).
+                conversion_thread = None
+                conversion_results = []
+                conversion_errors = []
+                conversion_abort = Event()
+                expected_duration = job.get_audio_duration()
+
+                def convert_audio_in_background():
+                    try:
+                        conversion_results.append(convert_audio(abort=conversion_abort))
+                    except Exception as e:
+                        conversion_errors.append(e)
+
+                def finish_audio_conversion(abort=False):
+                    """Wait for the conversion in the background (if any) and
+                    report its outcome. With abort=True, the conversion is
+                    stopped instead (the transcription failed), only an
+                    error that happened before is reported."""
+                    nonlocal conversion_thread
+                    if conversion_thread is None:
+                        return
+                    errors = list(conversion_errors)
+                    if abort:
+                        conversion_abort.set()
+                    conversion_thread.join()
+                    conversion_thread = None
+                    if not abort:
+                        errors = conversion_errors
+                    if errors:
+                        raise errors[0]
+                    if not abort:
+                        self._log_audio_conversion(*conversion_results[0])
+
+                for track, pcm_file in conversions:
+                    if os.path.exists(pcm_file):  # cached
+                        continue
+                    # (resuming needs the whole audio from the start, live
+                    # input is always transcribed while it arrives)
+                    if job.live or (job.speaker_detection == 'none' and resumed is None and (
+                        expected_duration is None or expected_duration > audio_pipeline_min_minutes * 60
+                    )):
+                        conversion_thread = Thread(target=convert_audio_in_background, daemon=True)
+                        conversion_thread.start()
                     else:
-                        job.set_error(f"{t('err_converting_audio')}: {e}", traceback_str)
-                        self.update_queue_table()
-                        raise Exception(t('err_ffmpeg'), job.error_message) from e
+                        self._log_audio_conversion(*convert_audio(track, pcm_file))
 
-                finally:
-                    decode_error_count = getattr(self._ffmpeg_proc, "decode_error_count", 0)
-                    if self._ffmpeg_proc is not None:
-                        self._ffmpeg_proc.close()
-                        self._ffmpeg_proc = None
-
-                self.logn(t('audio_conversion_finished'))
-                if decode_error_count > 0:
-                    self.logn(
-                        t(
-                            'audio_conversion_skipped_invalid_packets',
-                            count=decode_error_count,
-                        )
-                    )
                 self.set_progress(1, 100, job.speaker_detection)
 
+                #-------------------------------------------------------
+                # Voice activity detection: skip long silence at the start and
+                # end, and the models entirely if there is no speech. The
+                # speech chunks are also used for the pause adjustment in 3).
+
+                # (audio is 16kHz mono after the conversion)
+                try:
+                    job.vad_threshold = float(config['voice_activity_detection_threshold'])
+                except Exception:
+                    config['voice_activity_detection_threshold'] = '0.5'
+                    job.vad_threshold = 0.5
+                sampling_rate = audio.pcm.SAMPLE_RATE
+
+                def detect_speech(pcm_file):
+                    """Returns the speech chunks and the duration of the audio"""
+                    audio_array = audio.pcm.open_pcm(pcm_file)
+                    try:
+                        vad_parameters = VadOptions(min_silence_duration_ms=500,
+                                                    threshold=job.vad_threshold,
+                                                    speech_pad_ms=0)
+                    except TypeError:
+                        vad_parameters = VadOptions(min_silence_duration_ms=500,
+                                                    onset=job.vad_threshold,
+                                                    speech_pad_ms=0)
+                    # The speech probabilities are saved for the whisper
+                    # worker, which derives its own (padded) speech chunks
+                    # from them (see `vad`).
+                    probs = vad.speech_probabilities(audio_array, vad_energy_gate)
+                    vad.save_probabilities(pcm_file, probs)
+                    result = (vad.speech_chunks(probs, audio_array.shape[0], vad_parameters),
+                              audio_array.shape[0] / sampling_rate)
+                    # Release the mapping, otherwise the temp dir cannot be
+                    # removed on Windows.
+                    del audio_array
+                    return result
+
+                pipelined = conversion_thread is not None
+                speech_chunks = []
+                track_speech_chunks = []  # every track has its own pauses
+                duration = 0.0
+                pcm_range = None  # range of the audio (in samples) to transcribe, None = all
+                no_speech = False
+                if not pipelined:
+                    if track_files:
+                        for _, pcm_file in track_files:
+                            chunks, track_duration = detect_speech(pcm_file)
+                            track_speech_chunks.append(chunks)
+                            duration = max(duration, track_duration)
+                    else:
+                        speech_chunks, duration = detect_speech(tmp_pcm_file)
+
+                    num_samples = round(duration * sampling_rate)
+                    if silence_trim_sec > 0:
+                        min_silence = round(silence_trim_sec * sampling_rate)
+                    else:
+                        min_silence = num_samples + 1  # never trim
+                    speech = transcription.speech_range(
+                        speech_chunks + [chunk for chunks in track_speech_chunks for chunk in chunks],
+                        num_samples,
+                        min_silence,
+                        padding=sampling_rate,  # keep 1 second around the speech
+                    )
+                    if speech is None:
+                        no_speech = True
+                        self.logn(t('no_speech_found'), 'highlight')
+                    elif speech != (0, num_samples):
+                        pcm_range = speech
+                        self.logn(t(
+                            'silence_trimmed',
+                            start=utils.ms_to_str(job.to_original_time(speech[0] * 1000 // sampling_rate)),
+                            stop=utils.ms_to_str(job.to_original_time(speech[1] * 1000 // sampling_rate, end=True)),
+                        ))
+
                 #-------------------------------------------------------
                 # 2) Speaker identification (diarization) with pyannote
 
@@ -2450,7 +2841,7 @@ class App(ctk.CTk):
 
                 # Start Diarization:
 
-                if job.speaker_detection != 'none':
+                if job.speaker_detection not in ('none', 'tracks') and not no_speech:
                     try:
                         job.status = JobStatus.SPEAKER_IDENTIFICATION
                         self.update_queue_table()
@@ -2460,19 +2851,24 @@ class App(ctk.CTk):
                         self.logn(t('loading_pyannote'))
                         # self.set_progress(1, 100, job.speaker_detection)
 
-                        while True:
-                            try:
-                                diarization = self._run_diarize_subprocess(tmp_audio_file, job)
-                                break
-                            except Exception as err:
-                                if self._handle_cuda_fallback('pyannote', err):
-                                    self.logn(t('pyannote_cuda_retry'), 'highlight')
-                                    continue
-                                raise
+                        if seg_journal.diarization is not None:
+                            diarization = seg_journal.diarization
+                            self.logn(t('resume_diarization'))
+                        else:
+                            while True:
+                                try:
+                                    diarization = self._run_diarize_subprocess(tmp_pcm_file, job, pcm_range)
+                                    break
+                                except Exception as err:
+                                    if self._handle_cuda_fallback('pyannote', err):
+                                        self.logn(t('pyannote_cuda_retry'), 'highlight')
+                                        continue
+                                    raise
+                            seg_journal.write_diarization(diarization)
 
                         # write segments to log file
                         for segment in diarization:
-                            line = f'{utils.ms_to_str(job.start + segment["start"], include_ms=True)} - {utils.ms_to_str(job.start + segment["end"], include_ms=True)} {segment["label"]}'
+                            line = f'{utils.ms_to_str(job.to_original_time(segment["start"]), include_ms=True)} - {utils.ms_to_str(job.to_original_time(segment["end"], end=True), include_ms=True)} {segment["label"]}'
                             self.logn(line, where='file')
 
                         self.logn()
@@ -2496,7 +2892,8 @@ class App(ctk.CTk):
 
                 self.logn()
                 self.logn(t('start_transcription'), 'highlight')
-                self.logn(t('loading_whisper'))
+                if not no_speech:
+                    self.logn(t('loading_whisper'))
 
                 info = None
                 transcription_success = False
@@ -2592,26 +2989,28 @@ class App(ctk.CTk):
                             self.logn(t('rescue_saving', file=job.transcript_file), 'error', link=f'file://{job.transcript_file}')
                             last_auto_save = datetime.datetime.now()
 
-                    # Prepare VAD data locally for pause adjustment (audio is 16kHz mono after ffmpeg conversion)
-                    try:
-                        job.vad_threshold = float(config['voice_activity_detection_threshold'])
-                    except Exception:
-                        config['voice_activity_detection_threshold'] = '0.5'
-                        job.vad_threshold = 0.5
-                    sampling_rate = 16000
-                    audio_array = decode_audio(tmp_audio_file, sampling_rate=sampling_rate)
-                    duration = audio_array.shape[0] / sampling_rate
-                    try:
-                        vad_parameters = VadOptions(min_silence_duration_ms=500,
-                                                    threshold=job.vad_threshold,
-                                                    speech_pad_ms=0)
-                    except TypeError:
-                        vad_parameters = VadOptions(min_silence_duration_ms=500,
-                                                    onset=job.vad_threshold,
-                                                    speech_pad_ms=0)
-                    speech_chunks = get_speech_timestamps(audio_array, vad_parameters)
+                    if conversion_thread is not None:
+                        # The audio is still being converted. The whisper
+                        # worker reports the speech chunks window by window
+                        # (see `on_vad`), `duration` is the end of the audio
+                        # covered so far.
+                        duration = 0.0
+                        speech_chunks = []
+                    elif pipelined:
+                        # retry after a pipelined run, the audio is complete now
+                        speech_chunks, duration = detect_speech(tmp_pcm_file)
+
+                    def on_vad(msg):
+                        nonlocal duration
+                        for chunk in msg.get('chunks', []):
+                            if speech_chunks and chunk['start'] <= speech_chunks[-1]['end']:
+                                # speech continues across the window boundary
+                                speech_chunks[-1]['end'] = max(speech_chunks[-1]['end'], chunk['end'])
+                            else:
+                                speech_chunks.append(chunk)
+                        duration = msg.get('end', duration)
 
-                    def adjust_for_pause(segment):
+                    def adjust_for_pause(segment, speech_chunks):
                         """Adjusts start and end of segment if it falls into a pause
                         identified by the VAD"""
                         pause_extend = 0.2  # extend the pauses by 200ms to make the detection more robust
@@ -2647,27 +3046,36 @@ class App(ctk.CTk):
                     last_segment_end = 0
                     last_timestamp_ms = 0
                     first_segment = True
+                    track_ends = {}  # speaker -> end of the last segment (tracks only)
 
                     def on_segment(seg):
                         nonlocal first_segment, last_segment_end, last_timestamp_ms, p, speaker, prev_speaker
                         # Map dict to simple object-like for existing code
                         class _Seg:
-                            __slots__ = ("start", "end", "text", "words")
+                            __slots__ = ("start", "end", "text")
                             def __init__(self, d):
                                 self.start = d.get('start')
                                 self.end = d.get('end')
                                 self.text = d.get('text')
-                                self.words = d.get('words')
                         segment = _Seg(seg)
 
-                        segment = adjust_for_pause(segment)
+                        if track_files:
+                            segment = adjust_for_pause(segment, track_speech_chunks[seg.get('track', 0)])
+                        else:
+                            segment = adjust_for_pause(segment, speech_chunks)
 
                         # get time of the segment in milliseconds
                         start = round(segment.start * 1000.0)
                         end = round(segment.end * 1000.0)
                         # if we skipped a part at the beginning of the audio we have to add this here again, otherwise the timestamps will not match the original audio:
-                        orig_audio_start = job.start + start
-                        orig_audio_end = job.start + end
+                        orig_audio_start = job.to_original_time(start)
+                        orig_audio_end = job.to_original_time(end, end=True)
+
+                        # Show where the transcript continues after a skipped
+                        # part of the audio (several time ranges).
+                        if (not first_segment and
+                                orig_audio_start - job.to_original_time(last_segment_end, end=True) != start - last_segment_end):
+                            last_timestamp_ms = start - job.timestamp_interval - 1
 
                         if job.timestamps:
                             ts = utils.ms_to_str(orig_audio_start)
@@ -2686,8 +3094,8 @@ class App(ctk.CTk):
                             if first_segment:
                                 pause_str = pause_str.lstrip() + ' '
 
-                            orig_audio_start_pause = job.start + last_segment_end
-                            orig_audio_end_pause = job.start + start
+                            orig_audio_start_pause = job.to_original_time(last_segment_end, end=True)
+                            orig_audio_end_pause = orig_audio_start
                             a = d.createElement('a')
                             a.name = f'ts_{orig_audio_start_pause}_{orig_audio_end_pause}_{speaker}'
                             a.appendText(pause_str)
@@ -2696,15 +3104,26 @@ class App(ctk.CTk):
                             if first_segment:
                                 self.logn()
                                 self.logn()
-                        last_segment_end = end
+                        # segments of different tracks may overlap
+                        last_segment_end = max(last_segment_end, end)
 
                         # write text to the doc
                         # diarization (speaker detection)?
                         seg_text = segment.text
                         seg_html = html.escape(seg_text, quote=False)
 
-                        if job.speaker_detection != 'none':
-                            new_speaker = find_speaker(diarization, start, end)
+                        if track_files or job.speaker_detection not in ('none', 'tracks'):
+                            if track_files:
+                                # one speaker per track, overlapping if the
+                                # current speaker is still talking
+                                new_speaker = f'S{seg.get("track", 0):02d}'
+                                current_speaker = speaker.lstrip('/')
+                                if (job.overlapping and current_speaker not in ('', new_speaker)
+                                        and track_ends.get(current_speaker, 0) > start):
+                                    new_speaker = f'//{new_speaker}'
+                                track_ends[new_speaker.lstrip('/')] = end
+                            else:
+                                new_speaker = find_speaker(diarization, start, end)
                             if (speaker != new_speaker) and (new_speaker != ''): # speaker change
                                 if new_speaker[:2] == '//': # is overlapping speech, create no new paragraph
                                     prev_speaker = speaker
@@ -2772,22 +3191,56 @@ class App(ctk.CTk):
                         
                         first_segment = False
 
-                        # auto save periodically
+                        # auto save periodically (a live transcript is read
+                        # while it grows)
                         nonlocal last_auto_save
-                        if job.auto_save:
+                        if job.auto_save or job.live:
                             if (datetime.datetime.now() - last_auto_save).total_seconds() > 5:
                                 save_doc()
                                 job.has_partial_transcript = True
 
                         # per-segment progress based on total duration
                         try:
-                            progr = round((segment.end/duration) * 100)
+                            progr = round((segment.end/max(duration, expected_duration or 0)) * 100)
                             self.set_progress(3, progr, job.speaker_detection)
                         except Exception:
                             pass
                     
+                    # Resume: replay the journal (of an earlier run, or of this
+                    # run before the switch to the CPU) and transcribe only
+                    # the rest of the audio.
+                    whisper_range = pcm_range
+                    replay = list(seg_journal.segments)
+                    replay_tail = []  # segments that may be transcribed again
+                    if replay:
+                        resume_sec = journal.resume_point(replay)
+                        resume_sample = round(resume_sec * sampling_rate)
+                        replay_tail = [seg for seg in replay if seg['end'] > resume_sec]
+                        self.logn(t(
+                            'resume_journal',
+                            count=len(replay),
+                            time=utils.ms_to_str(job.to_original_time(resume_sample * 1000 // sampling_rate, end=True)),
+                        ))
+                        for seg in replay:
+                            on_segment(seg)
+                        range_start, range_stop = pcm_range or (0, round(duration * sampling_rate))
+                        whisper_range = (max(range_start, resume_sample), range_stop)
+
+                    def on_new_segment(seg):
+                        if replay_tail and journal.is_duplicate(seg, replay_tail):
+                            return
+                        seg_journal.write_segment(seg)
+                        on_segment(seg)
+
                     try:
-                        info = self._run_whisper_subprocess_stream(tmp_audio_file, job, on_segment)
+                        if not no_speech and (whisper_range is None or whisper_range[0] < whisper_range[1]):
+                            info = self._run_whisper_subprocess_stream(
+                                tmp_pcm_file, job, on_new_segment,
+                                on_vad=on_vad, pcm_growing=conversion_thread is not None,
+                                pcm_tracks=[pcm_file for _, pcm_file in track_files],
+                                pcm_range=whisper_range,
+                            )
+                        finish_audio_conversion()
                         transcription_success = True
                         # if self.cancel:
                         #    raise Exception(t('err_user_cancelation')) 
@@ -2797,15 +3250,21 @@ class App(ctk.CTk):
                         self.logn()
                         self.logn(t('transcription_finished'), 'highlight')
                     except Exception as err:
-                        if self._handle_cuda_fallback('whisper', err):
-                            retry_cuda = True
-                        else:
+                        # A retry on the CPU needs the whole audio. Otherwise,
+                        # the conversion is stopped instead of waiting for
+                        # it. A failed conversion makes the transcription
+                        # fail as well, report the original error.
+                        retry_cuda = self._handle_cuda_fallback('whisper', err)
+                        finish_audio_conversion(abort=not retry_cuda)
+                        if not retry_cuda:
                             raise
                     finally:
                         if not first_segment:
                             save_doc()
                             job.has_partial_transcript = job.status != JobStatus.FINISHED
                         else:
+                            if transcription_success:
+                                save_doc()  # empty transcript, no speech found
                             job.has_partial_transcript = False
                         if transcription_success:
                             if job.transcript_file != orig_transcript_file: # used alternative filename because saving under the initial name failed
@@ -2824,12 +3283,20 @@ class App(ctk.CTk):
                     else:
                         break
 
+                # The job is finished, nothing to resume.
+                seg_journal.remove()
+
                 # log duration of the whole process
                 proc_time = datetime.datetime.now() - proc_start_time
                 proc_seconds = "{:02d}".format(int(proc_time.total_seconds() % 60))
                 proc_time_str = f'{int(proc_time.total_seconds() // 60)}:{proc_seconds}' 
                 self.logn(t('trancription_time', duration=proc_time_str)) 
             finally:
+                if seg_journal is not None:
+                    seg_journal.close()
+                # The worker processes have ended, nothing uses the files anymore.
+                if not scratch.cleanup():
+                    self.logn(f'Failed to remove the temporary files in {scratch.path}', where='file')
                 self.log_file.close()
                 self.log_file = None
 
@@ -2911,9 +3378,214 @@ class App(ctk.CTk):
 
         return False
 
-    def _run_whisper_subprocess_stream(self, tmp_audio_file: str, job, on_segment):
+    def _create_scratch(self, job) -> audio.scratch.Scratch:
+        """
+        Create the scratch space for the intermediate files of the job, see
+        `audio.scratch`. Falls back to the system's temp directory if the
+        configured directory is not usable.
+        """
+
+        duration = job.get_audio_duration()
+        required_bytes = 0
+        if duration is not None:
+            num_tracks = 1
+            if job.speaker_detection == 'tracks' and job.media_info is not None:
+                num_tracks = len(job.media_info.tracks())
+            required_bytes = int(duration * audio.pcm.SAMPLE_RATE * 4 * num_tracks)
+
+        base_dir, in_memory = audio.scratch.select_dir(
+            scratch_dir, scratch_memory_max_minutes * 60, duration, required_bytes
+        )
+        try:
+            scratch = audio.scratch.Scratch(base_dir, in_memory)
+        except OSError as e:
+            self.logn(f'Cannot use scratch directory "{base_dir}": {e}', 'error')
+            scratch = audio.scratch.Scratch()
+
+        self.logn(f'scratch directory: {scratch.path}{" (in memory)" if scratch.in_memory else ""}', where='file')
+
+        return scratch
+
+    def _convert_audio(self, job, tmp_pcm_file: str, scratch: audio.scratch.Scratch, track: tuple = None,
+                       abort: Event = None):
+        """
+        Convert the audio of the job and publish it as float32 PCM. The PCM
+        file grows while converting, so that the transcription can already
+        read it (see `audio.pcm.GrowingPcm`). No wave file is written, the
+        workers map the PCM file.
+        `track` is the (stream index, channel) to convert (see
+        `audio.convert.MediaInfo.tracks()`), None for the mixed audio.
+        Setting `abort` stops the conversion without canceling the job (the
+        transcription that reads the audio failed).
+        """
+
+        stream_index, channel = track if track is not None else (0, None)
+
+        pcm_writer = audio.pcm.PcmWriter(tmp_pcm_file)
+        try:
+            # Add audio conversion job.
+            if job.live:
+                # Read the recording as it arrives (see `audio.live`).
+                input_format, input_options = audio.live.parse_format(job.input_format)
+                self._ffmpeg_proc = audio.convert.ToWav(
+                    audio.live.open_input(
+                        job.audio_file, live_idle_timeout_sec,
+                        lambda: self.cancel or (abort is not None and abort.is_set()),
+                    ),
+                    None,
+                    force=True,
+                    stream_index=stream_index,
+                    channel=channel,
+                    input_format=input_format,
+                    input_options=input_options,
+                )
+            elif audio_conversion_processes > 1:
+                self._ffmpeg_proc = audio.convert.ParallelToWav(
+                    Path(job.audio_file),
+                    None,
+                    processes=audio_conversion_processes,
+                    force=True,
+                    stream_index=stream_index,
+                    channel=channel,
+                    scratch_dir=scratch.path,
+                )
+            else:
+                self._ffmpeg_proc = audio.convert.ToWav(
+                    Path(job.audio_file),
+                    None,
+                    force=True,
+                    stream_index=stream_index,
+                    channel=channel,
+                )
+            self._ffmpeg_proc.open()
+
+            conversion_speed = 0.0
+
+            def on_conversion_progress(seconds, speed):
+                nonlocal conversion_speed
+                conversion_speed = speed
+
+            # Several time ranges are converted one after the other by seeking
+            # again. The PCM file holds them joined without gaps.
+            for start, stop in job.get_ranges():
+                if start > 0:
+                    self._ffmpeg_proc.seek(start)
+
+                self._ffmpeg_proc.stop_after(stop)
+
+                # Convert in batches, the cancel flag is checked after each batch.
+                if not self._ffmpeg_proc.convert_all(
+                    progress_cb=on_conversion_progress,
+                    cancel_cb=lambda: self.cancel or (abort is not None and abort.is_set()),
+                    pcm_writer=pcm_writer,
+                ):
+                    # TODO: replace this with an UserCancelException or similar.
+                    raise Exception(t('err_user_cancelation'))
+
+            pcm_writer.close()
+
+        except Exception as e:
+            traceback_str = traceback.format_exc()
+            pcm_writer.close(complete=False)
+
+            if abort is not None and abort.is_set() and not self.cancel:
+                raise e
+
+            # Distinguish cancel vs. real error during audio conversion
+            if str(e) == t('err_user_cancelation') or self.cancel:
+                job.set_canceled(t('err_user_cancelation'))
+                self.update_queue_table()
+                raise e
+            else:
+                job.set_error(f"{t('err_converting_audio')}: {e}", traceback_str)
+                self.update_queue_table()
+                raise Exception(t('err_ffmpeg'), job.error_message) from e
+
+        finally:
+            decode_error_count = getattr(self._ffmpeg_proc, "decode_error_count", 0)
+            if self._ffmpeg_proc is not None:
+                self._ffmpeg_proc.close()
+                self._ffmpeg_proc = None
+
+        return conversion_speed, decode_error_count
+
+    def _log_audio_conversion(self, conversion_speed: float, decode_error_count: int):
+        """
+        Log the outcome of `_convert_audio`.
+        """
+
+        self.logn(t('audio_conversion_finished'))
+        self.logn(t('audio_conversion_speed', speed=f'{conversion_speed:.1f}'), where='file')
+        if decode_error_count > 0:
+            self.logn(
+                t(
+                    'audio_conversion_skipped_invalid_packets',
+                    count=decode_error_count,
+                )
+            )
+
+    def _get_warm_worker(self, name: str, target, args: dict, idle_timeout: float) -> WarmWorker:
+        """
+        Return the warm worker `name` (see `warm_worker`) if it runs with the
+        model configuration `args`. Otherwise, the old worker is stopped and a
+        new one started.
+        """
+
+        worker = self._warm_workers.get(name)
+        if worker is not None and worker.is_usable(args):
+            return worker
+
+        self._stop_warm_worker(name)
+        worker = WarmWorker(target, args, idle_timeout)
+        self._warm_workers[name] = worker
+        return worker
+
+    def _stop_warm_worker(self, name: str):
+        worker = self._warm_workers.pop(name, None)
+        if worker is not None:
+            worker.stop()
+
+    def _stop_warm_workers(self):
+        for name in list(self._warm_workers):
+            self._stop_warm_worker(name)
+
+    def _uses_cuda(self, name: str) -> bool:
+        """
+        Whether the model of the worker `name` ('whisper' or 'pyannote') runs
+        on a CUDA device. Only one of them is kept in the VRAM at a time, see
+        `_free_cuda_for`.
+        """
+
+        if name == 'whisper':
+            return transcription.whisper_device('cpu' if force_whisper_cpu else 'auto') == 'cuda'
+        if force_pyannote_cpu or platform.system() == 'Darwin':
+            return False
+        return transcription.whisper_device('auto') == 'cuda'
+
+    def _free_cuda_for(self, name: str):
+        """
+        Stop the warm workers of the other models before the model of `name`
+        is loaded on a CUDA device. Both models at once may not fit into the
+        VRAM (and a CUDA error switches to the CPU for good).
+        """
+
+        if self._uses_cuda(name):
+            for other in list(self._warm_workers):
+                if other != name and self._uses_cuda(other):
+                    self._stop_warm_worker(other)
+
+    def _run_whisper_subprocess_stream(self, tmp_pcm_file: str, job, on_segment,
+                                       on_vad=None, pcm_growing: bool = False, pcm_tracks: list = None,
+                                       pcm_range: tuple = None):
         """Spawn a subprocess to run Faster-Whisper and stream segments.
         Calls on_segment(dict) for each segment streamed by the child.
+        With pcm_tracks, the child transcribes these PCM files in parallel
+        instead of pcm_path; the segments carry the index of their track.
+        With pcm_range (start, stop in samples), only this part of the audio
+        is transcribed; the timestamps stay relative to the whole audio.
+        With pcm_growing=True, the PCM file is still being written and the
+        child transcribes it window by window, calling on_vad(dict) with the
+        speech chunks of each window.
         Returns a simple info object (duration at least).
         """
         global force_whisper_cpu
@@ -2931,34 +3603,135 @@ class App(ctk.CTk):
         except Exception:
             vad_threshold = 0.5
 
-        args = {
+        # CPU settings measured by `--autotune` (not used on the GPU). The
+        # compute type of the profile or the config takes precedence.
+        whisper_device = transcription.whisper_device('cpu' if force_whisper_cpu else 'auto')
+        tuning = autotune.tuned_settings(config.get('whisper_tuning'), job.whisper_model.name, whisper_device)
+        compute_type = job.whisper_compute_type
+        if compute_type == 'default':
+            compute_type = tuning.get('compute_type', 'default')
+        cpu_threads = int(tuning.get('threads', number_threads))
+        if tuning:
+            self.logn(f'whisper tuning: {tuning}', where='file')
+
+        # Long recordings are transcribed in several parts in parallel on
+        # the CPU (not with batched inference, which is parallel already).
+        # On the GPU, more model replicas would only use up the VRAM. The
+        # model gets as many workers as there can be parts, so that jobs of
+        # different lengths can use the same warm worker; the parts or the
+        # tracks of a job share them.
+        max_parts = 1
+        if whisper_device != 'cuda':
+            max_parts = transcription.max_parallel_parts(
+                cpu_threads, whisper_parallel_parts or tuning.get('parallel_parts', 0)
+            )
+        parallel_parts = 1
+        if not pcm_tracks and not pcm_growing and job.whisper_batch_size <= 0:
+            if pcm_range is not None:
+                num_samples = pcm_range[1] - pcm_range[0]
+            else:
+                num_samples = audio.pcm.open_pcm(tmp_pcm_file).shape[0]
+            parallel_parts = transcription.parallel_parts(
+                num_samples / audio.pcm.SAMPLE_RATE, cpu_threads, max_parts
+            )
+
+        # Two-pass transcription: segments with low confidence are
+        # transcribed again with the refine model, with the decoder settings
+        # of the default profile ("precise").
+        refine_model = None
+        refine_options = {}
+        if job.whisper_refine_model and job.whisper_refine_model != job.whisper_model.name:
+            refine_model = self.whisper_models.get(job.whisper_refine_model)
+            if refine_model is None:
+                self.logn(f"Refine model '{job.whisper_refine_model}' not found, transcribing in one pass.", 'error')
+            else:
+                self.logn(t('refine_model', model=refine_model.name))
+                refine_options = transcription.get_profile(
+                    transcription.DEFAULT_PROFILE, get_config('whisper_profiles', {})
+                )
+        refine_thresholds = {
+            **transcription.REFINE_THRESHOLDS,
+            **(get_config('whisper_refine_thresholds', {}) or {}),
+        }
+
+        # skip repetition loops of whisper ('off' = keep them)
+        repetition_limits = get_config('whisper_repetition_limits', {}) or {}
+        if repetition_limits == 'off':
+            repetition_limits = None
+        else:
+            repetition_limits = {**transcription.REPETITION_LIMITS, **repetition_limits}
+
+        # The model configuration. A warm worker with the same configuration
+        # is reused.
+        worker_args = {
             "whisper_model": job.whisper_model,
             "device": 'cpu' if force_whisper_cpu else 'auto',
-            "compute_type": job.whisper_compute_type,
-            "cpu_threads": number_threads,
+            "compute_type": compute_type,
+            "cpu_threads": cpu_threads,
+            "num_workers": max_parts,
+            "refine_model": refine_model,
+            "refine_compute_type": refine_options.get('compute_type') or get_config('whisper_compute_type', 'default'),
             "local_files_only": True,
-            "audio_path": tmp_audio_file,
+        }
+
+        args = {
+            "pcm_path": tmp_pcm_file,
+            "pcm_growing": pcm_growing,
+            "growing_window_sec": live_window_sec if job.live else None,
+            "pcm_tracks": pcm_tracks or [],
+            "pcm_range": pcm_range,
+            "parallel_parts": parallel_parts,
+            "batch_size": job.whisper_batch_size,
             "language_name": job.language_name,
             "language_code": language_code,
+            "language_detection_windows": language_detection_windows,
+            "language_detection_threshold": language_detection_threshold,
             "disfluencies": job.disfluencies,
-            "beam_size": 5,
-            "word_timestamps": True,
+            "beam_size": job.whisper_options['beam_size'],
+            "best_of": job.whisper_options['best_of'],
+            "temperature": job.whisper_options['temperature'],
+            "compression_ratio_threshold": job.whisper_options['compression_ratio_threshold'],
+            "log_prob_threshold": job.whisper_options['log_prob_threshold'],
+            "no_speech_threshold": job.whisper_options['no_speech_threshold'],
+            # The word alignment takes extra time, skip it if not needed.
+            "word_timestamps": job.whisper_options['word_timestamps'] and job.needs_word_timestamps(),
             "vad_filter": True,
+            "vad_min_silence_ms": job.whisper_options['vad_min_silence_ms'],
+            "vad_speech_pad_ms": job.whisper_options['vad_speech_pad_ms'],
             "vad_threshold": vad_threshold,
+            "vad_energy_gate": vad_energy_gate,
             "locale": config.get("locale", "en"),
+            "refine_options": {
+                key: refine_options[key]
+                for key in ("beam_size", "best_of", "temperature", "compression_ratio_threshold",
+                            "log_prob_threshold", "no_speech_threshold")
+                if key in refine_options
+            },
+            "refine_thresholds": refine_thresholds,
+            "repetition_limits": repetition_limits,
         }
 
-        # Spawn child process using spawn start method
-        ctx = mp.get_context("spawn")
-        q = ctx.Queue()
         from .whisper_mp_worker import whisper_proc_entrypoint
-        proc = ctx.Process(target=whisper_proc_entrypoint, args=(args, q))
-        proc.start()
+        self._free_cuda_for('whisper')
+        worker = None
+        if whisper_worker_idle_timeout > 0:
+            worker = self._get_warm_worker('whisper', whisper_proc_entrypoint, worker_args,
+                                           whisper_worker_idle_timeout)
+            worker.submit(args)
+            proc = worker.proc
+            q = worker.queue
+        else:
+            # Spawn child process using spawn start method
+            ctx = mp.get_context("spawn")
+            q = ctx.Queue()
+            proc = ctx.Process(target=whisper_proc_entrypoint, args=({**worker_args, **args}, q))
+            proc.start()
         # Expose to allow cancel to terminate the child
         self._mp_proc = proc
         self._mp_queue = q
 
         info = None
+        finished = False
         try:
             while True:
                 try:
@@ -2994,6 +3767,9 @@ class App(ctk.CTk):
                             self.set_progress(3, float(pct), job.speaker_detection)
                     except Exception:
                         pass
+                elif mtype == "vad":
+                    if on_vad is not None:
+                        on_vad(msg)
                 elif mtype == "segment":
                     seg = msg.get("segment") or {}
                     try:
@@ -3008,6 +3784,7 @@ class App(ctk.CTk):
                 elif mtype == "result":
                     if msg.get("ok"):
                         info = msg.get("info", {})
+                        finished = True
                     else:
                         err = msg.get('error', 'Transcription failed')
                         trc = msg.get('trace')
@@ -3018,24 +3795,32 @@ class App(ctk.CTk):
                     break
                 # keep looping until we get a result
         finally:
-            try:
-                proc.join(timeout=0.2)
-            except Exception:
-                pass
-            if proc.is_alive():
+            if worker is not None:
+                if finished:
+                    # keep the model loaded for the next job
+                    worker.done()
+                else:
+                    # canceled or failed, the worker is not reused
+                    self._stop_warm_worker('whisper')
+            else:
                 try:
-                    proc.terminate()
+                    proc.join(timeout=0.2)
+                except Exception:
+                    pass
+                if proc.is_alive():
+                    try:
+                        proc.terminate()
+                    except Exception:
+                        pass
+                try:
+                    proc.close()
+                except Exception:
+                    pass
+                try:
+                    q.close()
+                    q.join_thread()
                 except Exception:
                     pass
-            try:
-                proc.close()
-            except Exception:
-                pass
-            try:
-                q.close()
-                q.join_thread()
-            except Exception:
-                pass
             # Clear exposed handles
             self._mp_proc = None
             self._mp_queue = None
@@ -3047,26 +3832,43 @@ class App(ctk.CTk):
         info_obj = _Info(info or {})
         return info_obj
 
-    def _run_diarize_subprocess(self, tmp_audio_file: str, job):
+    def _run_diarize_subprocess(self, tmp_pcm_file: str, job, pcm_range: tuple = None):
         """Spawn a subprocess to run diarization and return list of segments.
         Streams child logs/progress back to GUI and honors cancel.
+        With pcm_range (start, stop in samples), only this part of the audio
+        is diarized; the timestamps stay relative to the whole audio.
         """
         global force_pyannote_cpu
-        ctx = mp.get_context("spawn")
-        q = ctx.Queue()
         from .pyannote_mp_worker import pyannote_proc_entrypoint
-        args = {
+        # The pipeline configuration. A warm worker with the same
+        # configuration is reused.
+        worker_args = {
             "device": 'cpu' if force_pyannote_cpu else '',
-            "audio_path": tmp_audio_file,
+        }
+        args = {
+            "pcm_path": tmp_pcm_file,
+            "pcm_range": pcm_range,
             "num_speakers": (int(job.speaker_detection) if str(job.speaker_detection).isdigit() else None),
         }
-        proc = ctx.Process(target=pyannote_proc_entrypoint, args=(args, q))
-        proc.start()
+        self._free_cuda_for('pyannote')
+        worker = None
+        if pyannote_worker_idle_timeout > 0:
+            worker = self._get_warm_worker('pyannote', pyannote_proc_entrypoint, worker_args,
+                                           pyannote_worker_idle_timeout)
+            worker.submit(args)
+            proc = worker.proc
+            q = worker.queue
+        else:
+            ctx = mp.get_context("spawn")
+            q = ctx.Queue()
+            proc = ctx.Process(target=pyannote_proc_entrypoint, args=({**worker_args, **args}, q))
+            proc.start()
         # Keep handles for cancel
         self._mp_proc = proc
         self._mp_queue = q
 
         diarization = None
+        finished = False
         try:
             while True:
                 try:
@@ -3099,6 +3901,7 @@ class App(ctk.CTk):
                 elif mtype == "result":
                     if msg.get("ok"):
                         diarization = msg.get("segments", [])
+                        finished = True
                     else:
                         err = msg.get('error', 'Diarization failed')
                         trc = msg.get('trace')
@@ -3109,24 +3912,33 @@ class App(ctk.CTk):
                     break
 
         finally:
-            try:
-                proc.join(timeout=0.2)
-            except Exception:
-                pass
-            if proc.is_alive():
+            if worker is not None:
+                if finished and not (self._uses_cuda('pyannote') and self._uses_cuda('whisper')):
+                    # keep the pipeline loaded for the next job
+                    worker.done()
+                else:
+                    # canceled or failed, the worker is not reused. On the
+                    # GPU, whisper needs the VRAM next (see `_free_cuda_for`).
+                    self._stop_warm_worker('pyannote')
+            else:
                 try:
-                    proc.terminate()
+                    proc.join(timeout=0.2)
+                except Exception:
+                    pass
+                if proc.is_alive():
+                    try:
+                        proc.terminate()
+                    except Exception:
+                        pass
+                try:
+                    proc.close()
+                except Exception:
+                    pass
+                try:
+                    q.close()
+                    q.join_thread()
                 except Exception:
                     pass
-            try:
-                proc.close()
-            except Exception:
-                pass
-            try:
-                q.close()
-                q.join_thread()
-            except Exception:
-                pass
             self._mp_proc = None
             self._mp_queue = None
 
@@ -3175,6 +3987,12 @@ class App(ctk.CTk):
                     self._mp_proc = None
                     self._mp_queue = None
 
+            # Stop the idle workers
+            try:
+                self._stop_warm_workers()
+            except Exception:
+                pass
+
             # Terminate ffmpeg if currently converting
             try:
                 if getattr(self, "_ffmpeg_proc", None):
@@ -3202,6 +4020,7 @@ class App(ctk.CTk):
             config['last_speaker'] = self.option_menu_speaker.get()
             config['last_whisper_model'] = self.option_menu_whisper_model.get()
             config['last_pause'] = self.option_menu_pause.get()
+            config['last_profile'] = self.option_menu_profile.get()
             config['last_overlapping'] = self.check_box_overlapping.get()
             config['last_timestamps'] = self.check_box_timestamps.get()
             config['last_disfluencies'] = self.check_box_disfluencies.get()
@@ -3256,6 +4075,12 @@ def _cleanup_app(app):
             finally:
                 app._mp_queue = None
 
+        # Stop the idle workers
+        try:
+            app._stop_warm_workers()
+        except Exception:
+            pass
+
         # Terminate ffmpeg if currently converting
         if getattr(app, "_ffmpeg_proc", None) is not None:
             try:
@@ -3319,7 +4144,7 @@ def run_cli_mode(args):
         job.whisper_model = app.whisper_models[args.model]
         
         # Validate files
-        if not os.path.exists(job.audio_file):
+        if not (job.live and job.audio_file == '-') and not os.path.exists(job.audio_file):
             print(f"Error: Audio file '{job.audio_file}' not found.")
             return 1
         
@@ -3340,6 +4165,8 @@ def run_cli_mode(args):
         print(f"Language: {job.language_name}")
         print(f"Model: {args.model}")
         print(f"Speaker detection: {job.speaker_detection}")
+        if job.ranges:
+            print(f"Time ranges: {utils.ranges_to_str(job.ranges)}")
         print()
         
         # Start transcription worker with the queue
@@ -3388,6 +4215,102 @@ def show_available_models():
         if app is not None:
             _cleanup_app(app)
 
+def manage_audio_cache(action: str) -> int:
+    """List or purge the cache of converted audio"""
+    try:
+        if action == 'purge':
+            count = audio_cache.purge()
+            print(f"Removed {count} cached recording(s) from {audio_cache.cache_dir}")
+            return 0
+
+        entries = audio_cache.entries()
+        total_mb = sum(entry['size'] for entry in entries) / (1024 * 1024)
+        print(f"Audio cache: {audio_cache.cache_dir}")
+        print(f"Size: {total_mb:.1f} MB of {audio_cache.max_bytes / (1024 * 1024):.0f} MB")
+        for entry in entries:
+            last_used = datetime.datetime.fromtimestamp(entry['last_used']).strftime('%Y-%m-%d %H:%M')
+            time_range = ''
+            if entry.get('start') or entry.get('stop'):
+                time_range = f" [{utils.ms_to_str(entry.get('start', 0))} - {utils.ms_to_str(entry['stop']) if entry.get('stop') else 'end'}]"
+            print(f"  {last_used}  {entry['size'] / (1024 * 1024):8.1f} MB  {entry.get('source', entry['key'])}{time_range}")
+        return 0
+    except Exception as e:
+        print(f"Error accessing the audio cache: {str(e)}")
+        return 1
+
+def run_autotune(args) -> int:
+    """Find the fastest CPU settings of the installed models (see `autotune`)
+    and save them in the config (`whisper_tuning`)"""
+    app = None
+    try:
+        app = HeadlessApp()
+        models = dict(app.whisper_models)
+        if args.model:
+            if args.model not in models:
+                print(f"Error: Model '{args.model}' not found")
+                return 1
+            models = {args.model: models[args.model]}
+        if not models:
+            print("No models found. Please check your installation.")
+            return 1
+
+        if args.audio_file:
+            from faster_whisper.audio import decode_audio
+            clip = decode_audio(args.audio_file)[:autotune.CLIP_SEC * autotune.SAMPLING_RATE]
+        else:
+            clip = autotune.synthetic_clip()
+
+        cpu_count = os.cpu_count() or int(number_threads)
+        tuning = config.get('whisper_tuning') or {}
+        for name, model in models.items():
+            print(f"Benchmarking model '{name}' ({len(clip) / autotune.SAMPLING_RATE:.0f} seconds of audio):")
+            result = autotune.autotune(
+                partial(autotune.measure, str(model.path), clip),
+                cpu_count,
+                int(number_threads),
+            )
+            print(f"Fastest: {result['compute_type']}, {result['threads']} threads, "
+                  f"{result['parallel_parts']} worker(s)")
+            tuning[name] = result
+            config['whisper_tuning'] = tuning
+            save_config()
+        return 0
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+    finally:
+        if app is not None:
+            _cleanup_app(app)
+
+def run_vad_benchmark(args) -> int:
+    """Compare the voice activity detection with and without the energy gate
+    (see `vad.benchmark`) on the audio file"""
+    if not args.audio_file:
+        print("Error: --benchmark-vad needs an audio file")
+        return 1
+    try:
+        from faster_whisper.audio import decode_audio
+        audio_array = decode_audio(args.audio_file, sampling_rate=audio.pcm.SAMPLE_RATE)
+        try:
+            threshold = float(config['voice_activity_detection_threshold'])
+        except Exception:
+            threshold = 0.5
+        # the settings of the pause detection
+        vad_parameters = VadOptions(min_silence_duration_ms=500, threshold=threshold, speech_pad_ms=0)
+        result = vad.benchmark(audio_array, vad_parameters, vad_energy_gate or {})
+
+        print(f"Audio: {audio_array.shape[0] / audio.pcm.SAMPLE_RATE:.0f} seconds, "
+              f"energy gate: {(vad_energy_gate or vad.ENERGY_GATE)['threshold_db']} dBFS")
+        print(f"Without the gate: {result['plain_sec']:.2f} s, {result['plain_chunks']} speech chunks")
+        print(f"With the gate:    {result['gated_sec']:.2f} s, {result['gated_chunks']} speech chunks, "
+              f"{result['skipped']:.0%} of the audio skipped")
+        print(f"Agreement: {result['agreement']:.2%} of the audio, "
+              f"{result['speech_overlap']:.2%} of the speech")
+        return 0
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+
 def noScribeMain():
     """
     Main entry point for the noScribe app.
@@ -3471,13 +4394,26 @@ def noScribeMain():
         show_available_models()
         sys.exit(0)
 
-    # If explicit headless requested, run pure CLI mode
-    if getattr(args, 'no_gui', False):
+    # Handle special case: inspect or purge the audio cache
+    if args.audio_cache:
+        sys.exit(manage_audio_cache(args.audio_cache))
+
+    # Handle special case: benchmark the models
+    if args.autotune:
+        sys.exit(run_autotune(args))
+
+    # Handle special case: benchmark the energy gate of the VAD
+    if args.benchmark_vad:
+        sys.exit(run_vad_benchmark(args))
+
+    # If explicit headless requested, run pure CLI mode (live transcription
+    # is only available on the command line)
+    if getattr(args, 'no_gui', False) or args.live:
         if args.audio_file and args.output_file:
             exit_code = run_cli_mode(args)
             sys.exit(exit_code)
         else:
-            print("Error: --no-gui requires both audio_file and output_file.")
+            print("Error: --no-gui and --live require both audio_file and output_file.")
             print("Usage: python -m noScribe <audio_file> <output_file> [options] --no-gui")
             sys.exit(1)
 
@@ -3530,6 +4466,8 @@ def noScribeMain():
             app.option_menu_language.set(args.language)
         if getattr(args, 'pause', None):
             app.option_menu_pause.set(args.pause)
+        if getattr(args, 'profile', None):
+            app.option_menu_profile.set(args.profile)
         if getattr(args, 'speaker_detection', None):
             app.option_menu_speaker.set(args.speaker_detection)
         if getattr(args, 'overlapping', None) is not None:
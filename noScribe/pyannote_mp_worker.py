@@ -1,6 +1,7 @@
 import importlib.resources as impres
 import os
 import platform
+import queue as pyqueue
 import traceback
 
 import torchaudio
@@ -11,13 +12,20 @@ if platform.system() == "Darwin" and platform.machine() == "x86_64":
     os.environ.setdefault("MKL_THREADING_LAYER", "GNU")
     os.environ.setdefault("KMP_DUPLICATE_LIB_OK", "TRUE")  # temp workaround for iomp5 dup
 
-def pyannote_proc_entrypoint(args: dict, q):
+def pyannote_proc_entrypoint(args: dict, q, requests=None):
     """Runs diarization in a child process and streams progress/logs.
     Messages:
       {"type":"log","level":"info|warn|error|debug","msg":str}
       {"type":"progress","step":str,"pct":int}
       {"type":"result","ok":True,"segments":[{"start":ms,"end":ms,"label":str}]}
       {"type":"result","ok":False,"error":str,"trace":str}
+
+    The pipeline is loaded once for `args["device"]`. Without `requests`,
+    `args` also holds the diarization job. Otherwise the process stays alive
+    (warm worker, see `WarmWorker`) and diarizes the jobs it gets from
+    `requests` one after the other, until it gets None or no job arrives
+    within `args["idle_timeout"]` seconds. Every job ends with a "result"
+    message. After an error, the process exits.
     """
     device = ''
     try:
@@ -32,32 +40,6 @@ def pyannote_proc_entrypoint(args: dict, q):
             except Exception:
                 pass
 
-        class SimpleProgressHook:
-            def __init__(self):
-                self.step_name = None
-
-            def __enter__(self):
-                return self
-
-            def __exit__(self, *exc):
-                return False
-
-            def __call__(self, step_name, step_artifact, file=None, total=None, completed=None):
-                if completed is None:
-                    completed = total = 1
-                pct = int(completed / total * 100) if total else 100
-                if pct > 100:
-                    pct = 100
-                try:
-                    q.put({"type": "progress", "step": str(step_name), "pct": pct})
-                except Exception:
-                    pass
-
-        audio_file = args.get("audio_path")
-        num_speakers = args.get("num_speakers")
-        if not os.path.exists(audio_file):
-            raise FileNotFoundError(audio_file)
-
         plog("debug", "Subprocess (diarize) started. Initializing PyAnnote pipeline...")
         
         # determine xpu
@@ -75,27 +57,31 @@ def pyannote_proc_entrypoint(args: dict, q):
 
         with impres.as_file(impres.files("pyannote")) as mypath:
             pipeline = Pipeline.from_pretrained(mypath)
-        waveform, sample_rate = torchaudio.load(audio_file)        
         pipeline.to(torch.device(device))
 
-        seg_list = []
-        with SimpleProgressHook() as hook:
-            if num_speakers is not None:
-                diarization = pipeline({"waveform": waveform, "sample_rate": sample_rate}, hook=hook, num_speakers=num_speakers)
+        while True:
+            if requests is None:
+                job_args = args
             else:
-                diarization = pipeline({"waveform": waveform, "sample_rate": sample_rate}, hook=hook)
+                try:
+                    job = requests.get(timeout=args.get("idle_timeout") or None)
+                except pyqueue.Empty:
+                    # idle for too long, the parent does not use this worker
+                    # anymore (see `WarmWorker.is_usable`)
+                    break
+                if job is None:
+                    break
+                job_args = {**args, **job}
 
-        for turn, speaker in diarization.speaker_diarization:
-            seg_list.append({
-                'start': int(turn.start * 1000),
-                'end': int(turn.end * 1000),
-                'label': speaker,
-            })
+            seg_list = _diarize_job(pipeline, job_args, q)
 
-        try:
-            q.put({"type": "result", "ok": True, "segments": seg_list})
-        except Exception:
-            pass
+            try:
+                q.put({"type": "result", "ok": True, "segments": seg_list})
+            except Exception:
+                pass
+
+            if requests is None:
+                break
 
     except Exception as e:
         try:
@@ -110,3 +96,72 @@ def pyannote_proc_entrypoint(args: dict, q):
         except Exception:
             pass
 
+
+def _diarize_job(pipeline, args: dict, q) -> list:
+    """Diarizes the audio of one job with the loaded pipeline and returns the
+    segments.
+    """
+    import torch
+
+    from .audio import pcm
+
+    class SimpleProgressHook:
+        def __init__(self):
+            self.step_name = None
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def __call__(self, step_name, step_artifact, file=None, total=None, completed=None):
+            if completed is None:
+                completed = total = 1
+            pct = int(completed / total * 100) if total else 100
+            if pct > 100:
+                pct = 100
+            try:
+                q.put({"type": "progress", "step": str(step_name), "pct": pct})
+            except Exception:
+                pass
+
+    audio_file = args.get("audio_path")
+    pcm_file = args.get("pcm_path")
+    num_speakers = args.get("num_speakers")
+    if not (pcm_file and os.path.exists(pcm_file)) and not (audio_file and os.path.exists(audio_file)):
+        raise FileNotFoundError(audio_file)
+
+    if pcm_file and os.path.exists(pcm_file):
+        # Map the PCM buffer published by the parent instead of loading the
+        # wave file again. Copy-on-write, as torch refuses read-only arrays.
+        waveform = torch.from_numpy(pcm.open_pcm(pcm_file, writable=True)).unsqueeze(0)
+        sample_rate = pcm.SAMPLE_RATE
+    else:
+        waveform, sample_rate = torchaudio.load(audio_file)
+
+    # Diarize only this range (in samples at 16 kHz) of the audio, e.g.
+    # without the silence at the start and end. Timestamps stay relative
+    # to the whole audio.
+    offset_ms = 0
+    pcm_range = args.get("pcm_range")
+    if pcm_range is not None:
+        start, stop = (int(pos * sample_rate / pcm.SAMPLE_RATE) for pos in pcm_range)
+        waveform = waveform[:, start:stop]
+        offset_ms = int(pcm_range[0] * 1000 / pcm.SAMPLE_RATE)
+
+    seg_list = []
+    with SimpleProgressHook() as hook:
+        if num_speakers is not None:
+            diarization = pipeline({"waveform": waveform, "sample_rate": sample_rate}, hook=hook, num_speakers=num_speakers)
+        else:
+            diarization = pipeline({"waveform": waveform, "sample_rate": sample_rate}, hook=hook)
+
+    for turn, speaker in diarization.speaker_diarization:
+        seg_list.append({
+            'start': int(turn.start * 1000) + offset_ms,
+            'end': int(turn.end * 1000) + offset_ms,
+            'label': speaker,
+        })
+
+    return seg_list
@@ -1,12 +1,86 @@
 import dataclasses
 import importlib.resources as impres
 import logging
+import platform
+import re
+import threading
+import zlib
+from collections import deque
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 DIR_PACKAGE_MODELS = "models"
 
+# Long recordings can be transcribed in several parts in parallel (see
+# `parallel_parts`). Each part gets at least this much audio...
+PARALLEL_MIN_PART_SEC = 600
+# ...and, by default, this many threads (CTranslate2 does not scale well
+# beyond).
+PARALLEL_THREADS_PER_PART = 8
+
+# Speed/quality profiles: the decoder settings of a transcription (see
+# `get_profile`). `compute_type` None means the configured compute type.
+# "precise" are the settings noScribe has always used.
+PROFILES = {
+    "draft": {
+        "beam_size": 1,
+        "best_of": 1,
+        "temperature": [0.0],
+        "compression_ratio_threshold": 2.4,
+        "log_prob_threshold": -1.0,
+        "no_speech_threshold": 0.6,
+        "word_timestamps": False,
+        "compute_type": "int8",
+        "vad_min_silence_ms": 1000,
+        "vad_speech_pad_ms": 50,
+    },
+    "balanced": {
+        "beam_size": 3,
+        "best_of": 3,
+        "temperature": [0.0, 0.4, 0.8],
+        "compression_ratio_threshold": 2.4,
+        "log_prob_threshold": -1.0,
+        "no_speech_threshold": 0.6,
+        "word_timestamps": True,
+        "compute_type": None,
+        "vad_min_silence_ms": 500,
+        "vad_speech_pad_ms": 50,
+    },
+    "precise": {
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+        "compression_ratio_threshold": 2.4,
+        "log_prob_threshold": -1.0,
+        "no_speech_threshold": 0.6,
+        "word_timestamps": True,
+        "compute_type": None,
+        "vad_min_silence_ms": 500,
+        "vad_speech_pad_ms": 50,
+    },
+}
+DEFAULT_PROFILE = "precise"
+
+# Two-pass transcription: a segment of the draft (fast model) is transcribed
+# again with the refine model if it is not confident enough (see
+# `needs_refinement`).
+REFINE_THRESHOLDS = {
+    "log_prob": -0.7,  # average log probability below this
+    "no_speech": 0.5,  # probability of no speech above this
+    "compression_ratio": 2.2,  # repetitive text (compression ratio above this)
+}
+
+# Repetition loops: on music, noise or long silence, whisper sometimes repeats
+# the same phrase for minutes (see `is_repetition_loop`).
+REPETITION_LIMITS = {
+    "segments": 4,  # consecutive segments that are checked together
+    "ngram": 3,  # length of the word n-grams
+    "ngram_repeats": 0.6,  # share of repeated n-grams above this
+    "compression_ratio": 2.4,  # compression ratio of their text above this
+    "min_words": 8,  # fewer words are never a loop
+}
+
 
 @dataclasses.dataclass
 class WhisperModel:
@@ -70,3 +144,233 @@ class WhisperModelManager:
             self.models[entry.name] = WhisperModel(
                 name=entry.name, path=entry.absolute()
             )
+
+
+class SegmentMerger:
+    """
+    Merges the segments of several sources (e.g. the tracks of a recording
+    that are transcribed in parallel) into a single stream ordered by start
+    time.
+
+    The segments of each source must arrive in order. A segment is passed to
+    `emit` as soon as no source can deliver an earlier one, i.e. every other
+    source has either delivered a later segment or is finished. Sources may
+    add segments from different threads; `emit` is never called
+    concurrently.
+    """
+
+    def __init__(self, sources: int, emit, key=lambda segment: segment["start"]):
+        self._buffers = [deque() for _ in range(sources)]
+        self._finished = [False] * sources
+        self._emit = emit
+        self._key = key
+        self._lock = threading.Lock()
+
+    def add(self, source: int, segment):
+        """
+        Add the next segment of a source.
+        """
+
+        with self._lock:
+            self._buffers[source].append(segment)
+            self._flush()
+
+    def finish(self, source: int):
+        """
+        Mark a source as finished: it will not add any more segments.
+        """
+
+        with self._lock:
+            self._finished[source] = True
+            self._flush()
+
+    def _flush(self):
+        while True:
+            # A source without buffered segments might still deliver an
+            # earlier segment, unless it is finished.
+            if any(not buffer and not finished for buffer, finished in zip(self._buffers, self._finished)):
+                return
+
+            candidates = [buffer for buffer in self._buffers if buffer]
+            if not candidates:
+                return
+
+            buffer = min(candidates, key=lambda buffer: self._key(buffer[0]))
+            self._emit(buffer.popleft())
+
+
+def speech_range(speech_chunks: list, num_samples: int, min_silence: int, padding: int):
+    """
+    Return the range of the audio (start and stop in samples) that contains
+    speech, without long silence at the start and end.
+
+    `speech_chunks` are the chunks found by the VAD (dicts with `start` and
+    `end` in samples). Silence at the start or end is only trimmed if it is
+    at least `min_silence` samples long; `padding` samples are kept around the
+    speech.
+
+    Returns:
+        None if there is no speech at all.
+    """
+
+    if not speech_chunks:
+        return None
+
+    start = min(chunk["start"] for chunk in speech_chunks)
+    stop = max(chunk["end"] for chunk in speech_chunks)
+
+    start = max(start - padding, 0) if start >= min_silence else 0
+    stop = min(stop + padding, num_samples) if num_samples - stop >= min_silence else num_samples
+
+    return start, stop
+
+
+def get_profile(name: str, overrides: dict = None) -> dict:
+    """
+    Return the decoder settings of the profile `name` (see `PROFILES`).
+
+    `overrides` maps profile names to settings that replace the defaults
+    (from the config). It may also define new profiles.
+
+    Raises:
+        ValueError: The profile does not exist.
+    """
+
+    overrides = overrides or {}
+    if name not in PROFILES and name not in overrides:
+        raise ValueError(f"Unknown profile: {name}")
+
+    profile = dict(PROFILES.get(name, PROFILES[DEFAULT_PROFILE]))
+    profile.update(overrides.get(name) or {})
+    if not isinstance(profile["temperature"], (list, tuple)):
+        profile["temperature"] = [profile["temperature"]]
+
+    return profile
+
+
+def needs_refinement(segment: dict, thresholds: dict) -> bool:
+    """
+    Whether a segment of the draft transcription (a dict with `avg_logprob`,
+    `no_speech_prob` and `compression_ratio`) should be transcribed again with
+    the refine model: the model was not sure about the text, the segment is
+    probably not speech at all or the text repeats itself (see
+    `REFINE_THRESHOLDS`). Missing values count as confident.
+    """
+
+    avg_logprob = segment.get("avg_logprob")
+    no_speech_prob = segment.get("no_speech_prob")
+    compression_ratio = segment.get("compression_ratio")
+
+    return (
+        (avg_logprob is not None and avg_logprob < thresholds["log_prob"])
+        or (no_speech_prob is not None and no_speech_prob > thresholds["no_speech"])
+        or (compression_ratio is not None and compression_ratio > thresholds["compression_ratio"])
+    )
+
+
+def is_repetition_loop(texts: list, limits: dict) -> bool:
+    """
+    Whether the last segments (their `texts`) are a repetition loop: the
+    text of the last `segments` consecutive segments consists mostly of the
+    same word n-grams, or compresses too well (see `REPETITION_LIMITS`).
+    Unlike `needs_refinement`, this also catches a short phrase that is
+    repeated once per segment.
+    """
+
+    if len(texts) < limits["segments"]:
+        return False
+
+    text = " ".join(text.strip() for text in texts[-limits["segments"]:])
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < limits["min_words"]:
+        return False
+
+    n = limits["ngram"]
+    ngrams = [tuple(words[i:i + n]) for i in range(len(words) - n + 1)]
+    if ngrams and 1 - len(set(ngrams)) / len(ngrams) > limits["ngram_repeats"]:
+        return True
+
+    # as computed by whisper for a single segment
+    text_bytes = text.encode("utf-8")
+    return len(text_bytes) / len(zlib.compress(text_bytes)) > limits["compression_ratio"]
+
+
+def whisper_device(device: str = "auto") -> str:
+    """
+    Return the device a whisper model asked to run on `device` ("cpu" or
+    "auto") ends up on: "cuda" on Windows and Linux if CTranslate2 finds a
+    CUDA device, "cpu" otherwise. On macOS, "auto" is kept (CTranslate2 runs
+    on the CPU there).
+    """
+
+    if device == "cpu":
+        return "cpu"
+    if platform.system() == "Darwin":
+        return "auto"
+    if platform.system() not in ("Windows", "Linux"):
+        raise Exception("Platform not supported yet.")
+
+    try:
+        import ctranslate2
+
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
+
+def max_parallel_parts(cpu_threads: int, max_parts: int = 0) -> int:
+    """
+    Return the largest number of parts that a recording is transcribed in
+    with `cpu_threads` threads (see `parallel_parts`), which is also the
+    number of model workers. `max_parts` = 0 means one part per
+    `PARALLEL_THREADS_PER_PART` threads.
+    """
+
+    if max_parts <= 0:
+        max_parts = cpu_threads // PARALLEL_THREADS_PER_PART
+
+    return max(min(max_parts, cpu_threads), 1)
+
+
+def parallel_parts(duration: float, cpu_threads: int, max_parts: int = 0) -> int:
+    """
+    Return the number of parts that a recording of `duration` seconds is
+    split into to be transcribed in parallel, each with its share of the
+    `cpu_threads`, at most `max_parallel_parts`.
+    """
+
+    return max(min(max_parallel_parts(cpu_threads, max_parts), int(duration // PARALLEL_MIN_PART_SEC)), 1)
+
+
+def split_speech(speech_chunks: list, num_parts: int) -> list:
+    """
+    Split the chunks found by the VAD into (at most) `num_parts` consecutive
+    parts with about the same amount of speech. The parts are split in the
+    pauses between the chunks, never within a chunk.
+
+    Returns:
+        A list of lists of chunks.
+    """
+
+    num_parts = max(min(num_parts, len(speech_chunks)), 1)
+    total = sum(chunk["end"] - chunk["start"] for chunk in speech_chunks)
+
+    parts = []
+    current = []
+    done = 0
+    for index, chunk in enumerate(speech_chunks):
+        current.append(chunk)
+        done += chunk["end"] - chunk["start"]
+
+        # Every remaining part needs at least one chunk.
+        remaining_chunks = len(speech_chunks) - index - 1
+        remaining_parts = num_parts - len(parts) - 1
+        if 0 < remaining_parts and (
+            remaining_chunks == remaining_parts
+            or done >= total * (len(parts) + 1) / num_parts
+        ):
+            parts.append(current)
+            current = []
+    parts.append(current)
+
+    return parts
@@ -59,6 +59,88 @@ def str_to_ms(time_str: str) -> int:
     return ret
 
 
+def str_to_ranges(range_strs: [str]) -> list:
+    """
+    Convert "hh:mm:ss-hh:mm:ss" time range strings to a sorted list of
+    non-overlapping ranges in milliseconds. The stop of a range can be left
+    out ("hh:mm:ss-"), meaning until the end of the audio. Overlapping or
+    adjacent ranges are merged.
+
+    Args:
+        range_strs ([str]): The time range strings.
+
+    Returns:
+        list: (start, stop) tuples in milliseconds, a stop of 0 meaning until
+        the end.
+
+    Raises:
+        ValueError: If a range string is invalid or a range is empty.
+    """
+
+    ranges = []
+    for range_str in range_strs:
+        start_str, sep, stop_str = range_str.partition("-")
+        if not sep:
+            raise ValueError(
+                "time range is invalid", i18n.t("err_invalid_time_string"), range_str
+            )
+        start = str_to_ms(start_str.strip())
+        stop = str_to_ms(stop_str.strip()) if stop_str.strip() else 0
+        if 0 < stop <= start:
+            raise ValueError(
+                "time range is empty", i18n.t("err_invalid_time_string"), range_str
+            )
+        ranges.append((start, stop))
+
+    merged = []
+    for start, stop in sorted(ranges):
+        if merged and (merged[-1][1] == 0 or start <= merged[-1][1]):
+            last_start, last_stop = merged[-1]
+            if last_stop != 0:
+                last_stop = 0 if stop == 0 else max(last_stop, stop)
+            merged[-1] = (last_start, last_stop)
+        else:
+            merged.append((start, stop))
+
+    return merged
+
+
+def ranges_to_str(ranges: list) -> str:
+    """
+    Convert time ranges in milliseconds to a "hh:mm:ss-hh:mm:ss, ..." string
+    (the reverse of `str_to_ranges`).
+    """
+
+    return ", ".join(
+        f"{ms_to_str(start)}-{ms_to_str(stop) if stop > 0 else ''}" for start, stop in ranges
+    )
+
+
+def map_to_ranges(milliseconds: int, ranges: list, end: bool = False) -> int:
+    """
+    Map a time in the joined audio of several time ranges (see
+    `str_to_ranges`) to the time in the original audio.
+
+    Args:
+        milliseconds (int): The time in the joined audio.
+        ranges (list): (start, stop) tuples in milliseconds.
+        end (bool, optional): Whether the time is the end of a segment. A time
+        at the boundary of two ranges then belongs to the earlier range.
+
+    Returns:
+        int: The time in the original audio.
+    """
+
+    offset = 0
+    for start, stop in ranges[:-1]:
+        length = stop - start
+        if milliseconds < offset + length or (end and milliseconds == offset + length):
+            return start + milliseconds - offset
+        offset += length
+
+    return ranges[-1][0] + milliseconds - offset
+
+
 def create_unique_filenames(path_inputs: [Path]) -> Path:
     """
     Creates a list of unique filenames from a list of input paths.
@@ -0,0 +1,300 @@
+"""
+Voice activity detection (Silero VAD, as used by faster-whisper), in two
+steps.
+
+Running the VAD model over a long recording takes minutes on the CPU. Its
+result, the speech probability of every window of 512 samples, does not
+depend on the settings, though. So it is computed only once per recording
+(`speech_probabilities`) and saved next to the PCM file. The speech chunks
+are then derived from the probabilities with different settings
+(`speech_chunks`): without padding for the pause detection in the parent,
+with padding for whisper in the worker.
+
+Many recordings (e.g. of hearings) are mostly silence. An energy gate in
+front of the model (see `energy_gate`) marks windows that are obviously
+silent by their loudness alone; the model runs only on the regions around
+the louder windows. `benchmark` compares the speech found with and without
+the gate.
+"""
+
+from pathlib import Path
+from typing import Optional
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# The VAD model rates windows of this many samples (at 16 kHz).
+WINDOW_SAMPLES = 512
+
+# Energy gate (see `energy_gate`).
+ENERGY_GATE = {
+    "threshold_db": -60.0,  # windows quieter than this (RMS in dBFS) are silence
+    "margin_ms": 500,  # the model also rates this much audio around louder windows
+    "min_silence_ms": 1000,  # shorter silences between louder windows are rated, too
+}
+
+
+def window_energy_db(audio: np.ndarray) -> np.ndarray:
+    """
+    Return the loudness (RMS in dBFS) of each window of `WINDOW_SAMPLES`
+    samples of the audio, the last window padded with silence.
+    """
+
+    windows = np.pad(audio, (0, WINDOW_SAMPLES - audio.shape[0] % WINDOW_SAMPLES)).reshape(-1, WINDOW_SAMPLES)
+    mean_square = np.einsum("ij,ij->i", windows, windows, dtype=np.float64) / WINDOW_SAMPLES
+
+    return 10 * np.log10(np.maximum(mean_square, 1e-20))
+
+
+def energy_gate(audio: np.ndarray, gate: dict = None, sampling_rate: int = 16000) -> list:
+    """
+    Return the regions of the audio the VAD model has to rate, as (start,
+    end) in windows of `WINDOW_SAMPLES` samples: the windows louder than the
+    threshold, with a margin around them. The rest is silence. `gate`
+    overrides the settings in `ENERGY_GATE`.
+    """
+
+    gate = {**ENERGY_GATE, **(gate or {})}
+    window_ms = WINDOW_SAMPLES * 1000 / sampling_rate
+    margin = int(np.ceil(gate["margin_ms"] / window_ms))
+    min_silence = int(np.ceil(gate["min_silence_ms"] / window_ms))
+
+    loud = window_energy_db(audio) >= gate["threshold_db"]
+    if margin > 0:
+        loud = np.convolve(loud, np.ones(2 * margin + 1), mode="same") > 0
+
+    # start and end of each run of loud windows
+    edges = np.diff(np.concatenate(([0], loud.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if starts.shape[0] == 0:
+        return []
+
+    # join regions separated by short silences
+    gaps = starts[1:] - ends[:-1] >= min_silence
+    starts = starts[np.concatenate(([True], gaps))]
+    ends = ends[np.concatenate((gaps, [True]))]
+
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def speech_probabilities(audio: np.ndarray, gate: dict = None) -> np.ndarray:
+    """
+    Return the speech probability of each window of `WINDOW_SAMPLES` samples
+    of the audio (16 kHz mono float32), the last window padded with silence.
+
+    With a `gate` (settings for `energy_gate`, {} for the defaults), the model
+    rates only the regions the energy gate lets through, the probability of
+    the other windows is 0.
+    """
+
+    from faster_whisper.vad import get_vad_model
+
+    padded_audio = np.pad(audio, (0, WINDOW_SAMPLES - audio.shape[0] % WINDOW_SAMPLES))
+    if gate is None:
+        return np.asarray(get_vad_model()(padded_audio), dtype=np.float32).reshape(-1)
+
+    probs = np.zeros(padded_audio.shape[0] // WINDOW_SAMPLES, dtype=np.float32)
+    for start, end in energy_gate(audio, gate):
+        probs[start:end] = np.asarray(
+            get_vad_model()(padded_audio[start * WINDOW_SAMPLES:end * WINDOW_SAMPLES]), dtype=np.float32
+        ).reshape(-1)
+
+    return probs
+
+
+def speech_chunks(probs: np.ndarray, num_samples: int, vad_options, sampling_rate: int = 16000) -> list:
+    """
+    Return the speech chunks (dicts with `start` and `end` in samples) of
+    audio with `num_samples` samples from its speech probabilities, with the
+    given `faster_whisper.vad.VadOptions`.
+
+    The result is the same as that of `faster_whisper.vad.get_speech_timestamps`
+    (the code below is adapted from it), without running the model again.
+    """
+
+    threshold = vad_options.threshold
+    neg_threshold = vad_options.neg_threshold
+    min_speech_duration_ms = vad_options.min_speech_duration_ms
+    max_speech_duration_s = vad_options.max_speech_duration_s
+    min_silence_duration_ms = vad_options.min_silence_duration_ms
+    window_size_samples = WINDOW_SAMPLES
+    speech_pad_ms = vad_options.speech_pad_ms
+    min_speech_samples = sampling_rate * min_speech_duration_ms / 1000
+    speech_pad_samples = sampling_rate * speech_pad_ms / 1000
+    max_speech_samples = (
+        sampling_rate * max_speech_duration_s
+        - window_size_samples
+        - 2 * speech_pad_samples
+    )
+    min_silence_samples = sampling_rate * min_silence_duration_ms / 1000
+    min_silence_samples_at_max_speech = sampling_rate * 98 / 1000
+
+    triggered = False
+    speeches = []
+    current_speech = {}
+    if neg_threshold is None:
+        neg_threshold = max(threshold - 0.15, 0.01)
+
+    # to save potential segment end (and tolerate some silence)
+    temp_end = 0
+    # to save potential segment limits in case of maximum segment size reached
+    prev_end = next_start = 0
+
+    for i, speech_prob in enumerate(probs.tolist()):
+        if (speech_prob >= threshold) and temp_end:
+            temp_end = 0
+            if next_start < prev_end:
+                next_start = window_size_samples * i
+
+        if (speech_prob >= threshold) and not triggered:
+            triggered = True
+            current_speech["start"] = window_size_samples * i
+            continue
+
+        if triggered and (window_size_samples * i) - current_speech["start"] > max_speech_samples:
+            if prev_end:
+                current_speech["end"] = prev_end
+                speeches.append(current_speech)
+                current_speech = {}
+                # previously reached silence (< neg_thres) and is still not speech (< thres)
+                if next_start < prev_end:
+                    triggered = False
+                else:
+                    current_speech["start"] = next_start
+                prev_end = next_start = temp_end = 0
+            else:
+                current_speech["end"] = window_size_samples * i
+                speeches.append(current_speech)
+                current_speech = {}
+                prev_end = next_start = temp_end = 0
+                triggered = False
+                continue
+
+        if (speech_prob < neg_threshold) and triggered:
+            if not temp_end:
+                temp_end = window_size_samples * i
+            # condition to avoid cutting in very short silence
+            if (window_size_samples * i) - temp_end > min_silence_samples_at_max_speech:
+                prev_end = temp_end
+            if (window_size_samples * i) - temp_end < min_silence_samples:
+                continue
+            else:
+                current_speech["end"] = temp_end
+                if (current_speech["end"] - current_speech["start"]) > min_speech_samples:
+                    speeches.append(current_speech)
+                current_speech = {}
+                prev_end = next_start = temp_end = 0
+                triggered = False
+                continue
+
+    if current_speech and (num_samples - current_speech["start"]) > min_speech_samples:
+        current_speech["end"] = num_samples
+        speeches.append(current_speech)
+
+    for i, speech in enumerate(speeches):
+        if i == 0:
+            speech["start"] = int(max(0, speech["start"] - speech_pad_samples))
+        if i != len(speeches) - 1:
+            silence_duration = speeches[i + 1]["start"] - speech["end"]
+            if silence_duration < 2 * speech_pad_samples:
+                speech["end"] += int(silence_duration // 2)
+                speeches[i + 1]["start"] = int(max(0, speeches[i + 1]["start"] - silence_duration // 2))
+            else:
+                speech["end"] = int(min(num_samples, speech["end"] + speech_pad_samples))
+                speeches[i + 1]["start"] = int(max(0, speeches[i + 1]["start"] - speech_pad_samples))
+        else:
+            speech["end"] = int(min(num_samples, speech["end"] + speech_pad_samples))
+
+    return speeches
+
+
+def clip_chunks(chunks: list, start: int, stop: int) -> list:
+    """
+    Return the speech chunks within the range from `start` to `stop` (in
+    samples), relative to `start`.
+    """
+
+    return [
+        {"start": max(chunk["start"], start) - start, "end": min(chunk["end"], stop) - start}
+        for chunk in chunks
+        if chunk["end"] > start and chunk["start"] < stop
+    ]
+
+
+def benchmark(audio: np.ndarray, vad_options, gate: dict = None, sampling_rate: int = 16000) -> dict:
+    """
+    Compare the speech found with the energy gate (see `energy_gate`) with
+    that found by `faster_whisper.vad.get_speech_timestamps` (the model rates
+    all of the audio).
+
+    Returns:
+        A dict with the runtime (in seconds) without and with the gate
+        (`plain_sec`, `gated_sec`), the share of the audio the gate skipped
+        (`skipped`), the share of the samples both agree on, speech or not
+        (`agreement`), and the speech found by both relative to the speech
+        found by either (`speech_overlap`).
+    """
+
+    from faster_whisper.vad import get_speech_timestamps, get_vad_model
+
+    get_vad_model()  # load the model before the timing
+
+    start = time.perf_counter()
+    plain = get_speech_timestamps(audio, vad_options, sampling_rate)
+    plain_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    gated = speech_chunks(speech_probabilities(audio, gate), audio.shape[0], vad_options, sampling_rate)
+    gated_sec = time.perf_counter() - start
+
+    def speech_mask(chunks):
+        mask = np.zeros(audio.shape[0], dtype=bool)
+        for chunk in chunks:
+            mask[chunk["start"]:chunk["end"]] = True
+        return mask
+
+    plain_mask, gated_mask = speech_mask(plain), speech_mask(gated)
+    num_windows = audio.shape[0] // WINDOW_SAMPLES + 1
+    rated = sum(end - start for start, end in energy_gate(audio, gate, sampling_rate))
+    either = np.count_nonzero(plain_mask | gated_mask)
+
+    return {
+        "plain_sec": plain_sec,
+        "gated_sec": gated_sec,
+        "skipped": 1.0 - rated / num_windows,
+        "agreement": float(np.mean(plain_mask == gated_mask)) if audio.shape[0] else 1.0,
+        "speech_overlap": np.count_nonzero(plain_mask & gated_mask) / either if either else 1.0,
+        "plain_chunks": len(plain),
+        "gated_chunks": len(gated),
+    }
+
+
+def probabilities_file(file_pcm: Path) -> Path:
+    """
+    Return the file the speech probabilities of a PCM file are saved in.
+    """
+
+    return Path(str(file_pcm) + ".vad.npy")
+
+
+def save_probabilities(file_pcm: Path, probs: np.ndarray):
+    np.save(probabilities_file(file_pcm), probs)
+
+
+def load_probabilities(file_pcm: Path) -> Optional[np.ndarray]:
+    """
+    Return the saved speech probabilities of a PCM file, None if there are
+    none.
+    """
+
+    try:
+        return np.load(probabilities_file(file_pcm))
+    except OSError:
+        return None
+    except Exception as e:
+        logger.warning("Cannot read the speech probabilities of %s: %s", file_pcm, e)
+        return None
@@ -0,0 +1,105 @@
+"""
+Worker processes that stay alive between transcription jobs.
+
+Starting a worker process (spawn) means importing torch etc. and loading the
+model from disk again. For short recordings, this takes longer than the
+actual work. A warm worker keeps its model loaded and receives the jobs over
+a queue instead.
+
+The worker process runs `target(args, queue, requests)`: it builds its model
+from `args`, then handles the jobs from `requests` one after the other and
+sends its messages (ending each job with a "result" message) to `queue`. It
+exits when it gets None, after an error, or when no job arrives within
+`args["idle_timeout"]` seconds (see `whisper_mp_worker`).
+"""
+
+import logging
+import multiprocessing as mp
+import time
+
+logger = logging.getLogger(__name__)
+
+# A worker is not used anymore shortly before its idle timeout, so that it
+# cannot exit while a new job is on its way.
+IDLE_MARGIN_SEC = 5.0
+
+
+class WarmWorker:
+    """
+    A worker process with a loaded model, reused as long as the model
+    configuration (`args`) does not change.
+    """
+
+    def __init__(self, target, args: dict, idle_timeout: float):
+        ctx = mp.get_context("spawn")
+        self.args: dict = args
+        self.idle_timeout: float = idle_timeout
+        self.requests = ctx.Queue()
+        self.queue = ctx.Queue()
+        self.proc = ctx.Process(
+            target=target, args=({**args, "idle_timeout": idle_timeout}, self.queue, self.requests)
+        )
+        self.proc.start()
+        self.last_used: float = time.monotonic()
+
+        logger.debug("Started warm worker (pid %s)", self.proc.pid)
+
+    def is_usable(self, args: dict) -> bool:
+        """
+        Whether the worker can take a job with the given model configuration:
+        the configuration is the same, the process is alive and not about to
+        exit because it has been idle for too long.
+        """
+
+        try:
+            alive = self.proc.is_alive()
+        except ValueError:  # process closed
+            return False
+
+        return (
+            args == self.args
+            and alive
+            and time.monotonic() - self.last_used < self.idle_timeout - IDLE_MARGIN_SEC
+        )
+
+    def submit(self, job: dict):
+        """
+        Send a job to the worker. Its messages arrive on `queue`.
+        """
+
+        self.requests.put(job)
+
+    def done(self):
+        """
+        Mark the current job as finished. The idle timeout starts now.
+        """
+
+        self.last_used = time.monotonic()
+
+    def stop(self, timeout: float = 1.0):
+        """
+        Ask the worker to exit and terminate it if it does not.
+        """
+
+        try:
+            if self.proc.is_alive():
+                try:
+                    self.requests.put(None)
+                except Exception:
+                    pass
+                self.proc.join(timeout)
+            if self.proc.is_alive():
+                self.proc.terminate()
+                self.proc.join(timeout)
+            self.proc.close()
+        except Exception as exc:
+            logger.debug("Failed to stop warm worker: %s", exc)
+
+        for q in (self.requests, self.queue):
+            try:
+                q.close()
+                q.join_thread()
+            except Exception:
+                pass
+
+        logger.debug("Stopped warm worker")
@@ -2,32 +2,58 @@ import importlib.resources as impres
 import logging
 import gc
 import os
-import platform
+import queue as pyqueue
+import threading
 import traceback
+from collections import deque
 from dataclasses import asdict, is_dataclass
+from functools import partial
 from i18n import t
 
 logger = logging.getLogger(__name__)
 
+# A PCM file that is still being written by the parent (pipelined ingest) is
+# transcribed in windows of this length. Windows end in a pause, if possible.
+GROWING_WINDOW_SEC = 300
+# Length of the audio used to detect the language of a growing PCM file.
+GROWING_LANGUAGE_DETECTION_SEC = 120
+# Two-pass transcription: consecutive draft segments with low confidence are
+# transcribed again together, up to this length (seconds).
+REFINE_MAX_SPAN_SEC = 30
 
-def whisper_proc_entrypoint(args: dict, q):
+
+def whisper_proc_entrypoint(args: dict, q, requests=None):
     """
     Runs in a child process. Streams progress/logs to parent via `q`.
     Messages put on `q` are dicts with one of the following shapes:
       {"type": "log", "level": "info"|"warn"|"error"|"debug", "msg": "..."}
       {"type": "progress", "pct": float, "detail": "..."}   # optional
+      {"type": "segment", "segment": {...}}   # with "track" (index) if
+          # several tracks are transcribed
+      {"type": "vad", "chunks": [{"start": int, "end": int}], "end": float}
+          # pipelined ingest only: speech (in samples) before the segments
+          # of each window and the end of the window (in seconds)
       {"type": "result", "ok": True, "segments": [...], "info": {...}}
       {"type": "result", "ok": False, "error": str, "trace": str}
+
+    The model is built once from `args` (whisper_model, device,
+    compute_type, cpu_threads, num_workers), as well as the optional refine
+    model for the two-pass transcription (refine_model,
+    refine_compute_type, see `_Refiner`). Without `requests`, `args` also
+    holds the transcription job. Otherwise the process stays alive (warm
+    worker, see `WarmWorker`) and transcribes the jobs it gets from
+    `requests` one after the other, until it gets None or no job arrives
+    within `args["idle_timeout"]` seconds. Every job ends with a "result"
+    message. After an error, the process exits.
     """
     try:
         # Import heavy libs only in the child
         from faster_whisper import WhisperModel
-        from faster_whisper.audio import decode_audio
-        from faster_whisper.vad import VadOptions, get_speech_timestamps
         import torch
-        import yaml
         import i18n
 
+        from .transcription import whisper_device
+
         def plog(level, msg):
             try:
                 q.put({"type": "log", "level": level, "msg": str(msg)})
@@ -54,163 +80,1010 @@ def whisper_proc_entrypoint(args: dict, q):
             # As there is no `print`, nothing happens really.
             t("app_header")
         
-        # determine device
-        device = args.get("device", "")
-        if device != 'cpu':
-            if platform.system() == "Darwin":  # MAC
-                device = 'auto'
-            elif platform.system() in ('Windows', 'Linux'):
-                try:
-                    device = 'cuda' if torch.cuda.is_available() and torch.cuda.device_count() > 0 else 'cpu'
-                except:
-                    device = 'cpu'
-            else:
-                raise Exception('Platform not supported yet.')
-            
+        # determine device (the parent resolves it the same way, see
+        # `_run_whisper_subprocess_stream`)
+        device = whisper_device(args.get("device", "auto"))
+
+        # Several tracks (or parts of a long recording) are transcribed in
+        # parallel threads, which share the model workers. Their number is
+        # the same for all jobs of a warm worker (the parts of a job never
+        # outnumber them). The CPU threads are split between them.
+        num_workers = max(args.get("num_workers", 1), 1)
+
         # Build model in child using provided options
         model = WhisperModel(
             str(args["whisper_model"].path),
             device=device,
-            compute_type=args.get("compute_type", "float16"),
-            cpu_threads=args.get("cpu_threads", 4),
+            compute_type=_supported_compute_type(device, args.get("compute_type", "float16"), plog),
+            cpu_threads=max(args.get("cpu_threads", 4) // num_workers, 1),
+            num_workers=num_workers,
             local_files_only=args.get("local_files_only", True),
         )
 
-        # Define callbacks that forward to parent via queue (not used by faster-whisper directly, but kept for parity)
-        def log_cb(level, msg):
-            plog(level, msg)
+        # The refine model transcribes the segments one after the other, in
+        # between the segments of the draft.
+        refine_model = None
+        if args.get("refine_model") is not None:
+            refine_model = WhisperModel(
+                str(args["refine_model"].path),
+                device=device,
+                compute_type=_supported_compute_type(device, args.get("refine_compute_type", "default"), plog),
+                cpu_threads=max(args.get("cpu_threads", 4), 1),
+                local_files_only=args.get("local_files_only", True),
+            )
 
-        # Prepare audio and VAD
-        audio_path = args.get("audio_path")
-        if not audio_path or not os.path.exists(audio_path):
-            raise FileNotFoundError(f"Audio path does not exist: {audio_path}")
+        while True:
+            if requests is None:
+                job_args = args
+            else:
+                try:
+                    job = requests.get(timeout=args.get("idle_timeout") or None)
+                except pyqueue.Empty:
+                    # idle for too long, the parent does not use this worker
+                    # anymore (see `WarmWorker.is_usable`)
+                    break
+                if job is None:
+                    break
+                job_args = {**args, **job}
+                i18n.set("locale", job_args.get("locale", "en"))
 
-        sampling_rate = model.feature_extractor.sampling_rate
-        audio = decode_audio(audio_path, sampling_rate=sampling_rate)
-        duration = audio.shape[0] / sampling_rate
-        log_cb("info", t('vad'))
+            _transcribe_job(model, job_args, q, plog, refine_model)
 
-        # VAD options
-        vad_threshold = float(args.get("vad_threshold", 0.5))
+            if requests is None:
+                break
+
+        # Cleanup VRAM (harmless on CPU)
         try:
-            vad_parameters = VadOptions(min_silence_duration_ms=500, threshold=vad_threshold, speech_pad_ms=50)
-        except TypeError:
-            vad_parameters = VadOptions(min_silence_duration_ms=500, onset=vad_threshold, speech_pad_ms=50)
+            del model, refine_model
+        except Exception:
+            pass
+        try:
+            torch.cuda.empty_cache()
+        except Exception:
+            pass
+        gc.collect()
+        plog("debug", "Subprocess finished cleanly.")
 
-        # Language handling
-        language_name = args.get("language_name")
-        language_code = args.get("language_code")
-        multilingual = False
-        whisper_lang = None
-        
-        if not model.model.is_multilingual and language_code != 'en':
-            language_name = 'English'
-            language_code = 'en'
-            log_cb("info", t('language_en_only'))
-        
-        if language_name == "Multilingual":
-            multilingual = True
-            whisper_lang = None
-        elif language_name == "Auto":
-            whisper_lang = None
+    except Exception as e:
+        try:
+            q.put({
+                "type": "result",
+                "ok": False,
+                "error": f"{type(e).__name__}: {e}",
+                "trace": traceback.format_exc(),
+            })
+        except Exception:
+            pass
+
+
+def _supported_compute_type(device: str, compute_type: str, plog) -> str:
+    """
+    Return `compute_type`, or "default" if the device does not support it.
+    Profiles may ask for a compute type the device does not support (e.g.
+    int8 on older GPUs).
+    """
+
+    try:
+        import ctranslate2
+
+        ct2_device = device
+        if ct2_device == 'auto':
+            ct2_device = 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+        if (compute_type not in ('default', 'auto')
+                and compute_type not in ctranslate2.get_supported_compute_types(ct2_device)):
+            plog('info', f'Compute type "{compute_type}" is not supported on {ct2_device}, using the default.')
+            compute_type = 'default'
+    except Exception as e:
+        logger.debug(e)
+
+    return compute_type
+
+
+def _transcribe_job(model, args: dict, q, plog, refine_model=None):
+    """
+    Transcribe the job described by `args` with a loaded model and send the
+    segments and the result to the parent (see `whisper_proc_entrypoint`).
+    With a `refine_model`, segments with low confidence are transcribed again
+    with it (see `_Refiner`).
+    """
+
+    from faster_whisper.audio import decode_audio
+    from faster_whisper.vad import SpeechTimestampsMap, VadOptions, get_speech_timestamps
+    import numpy as np
+    import yaml
+
+    from . import vad
+    from .audio import pcm
+    from .transcription import REFINE_THRESHOLDS, split_speech
+    from .utils import ms_to_str
+
+    pcm_tracks = args.get("pcm_tracks") or []
+
+    # Define callbacks that forward to parent via queue (not used by faster-whisper directly, but kept for parity)
+    def log_cb(level, msg):
+        plog(level, msg)
+
+    # Prepare audio and VAD
+    audio_path = args.get("audio_path")
+    pcm_path = args.get("pcm_path")
+    growing_pcm = None
+    audio = None
+    tracks = []
+    if pcm_tracks:
+        # One participant per track (see `audio.convert.MediaInfo.tracks`).
+        tracks = [pcm.open_pcm(path) for path in pcm_tracks]
+    elif isinstance(args.get("audio"), np.ndarray):
+        # Audio decoded by the caller (float32 samples at 16 kHz).
+        audio = args["audio"]
+    elif pcm_path and args.get("pcm_growing", False):
+        # The parent is still converting the audio. Transcribe it in
+        # windows as soon as they are available.
+        growing_pcm = pcm.GrowingPcm(pcm_path)
+    elif pcm_path and os.path.exists(pcm_path):
+        # Map the PCM buffer published by the parent (no decoding).
+        audio = pcm.open_pcm(pcm_path)
+    elif audio_path and os.path.exists(audio_path):
+        audio = decode_audio(audio_path, sampling_rate=model.feature_extractor.sampling_rate)
+    else:
+        raise FileNotFoundError(f"Audio path does not exist: {audio_path}")
+
+    sampling_rate = model.feature_extractor.sampling_rate
+    if tracks:
+        duration = max(track.shape[0] for track in tracks) / sampling_rate
+    elif audio is not None:
+        duration = audio.shape[0] / sampling_rate
+    else:
+        duration = 0.0
+
+    # The speech probabilities of the whole audio, computed by the parent
+    # for its pause detection (see `vad`). The VAD model does not need to
+    # run again.
+    def saved_probabilities(path, num_samples):
+        probs = vad.load_probabilities(path) if path else None
+        if probs is not None and probs.shape[0] != num_samples // vad.WINDOW_SAMPLES + 1:
+            return None  # not of this audio
+        return probs
+
+    if tracks:
+        vad_probs = [
+            (saved_probabilities(path, track.shape[0]), track.shape[0])
+            for path, track in zip(pcm_tracks, tracks)
+        ]
+    elif audio is not None:
+        vad_probs = (saved_probabilities(pcm_path, audio.shape[0]), audio.shape[0])
+
+    # Transcribe only this range (in samples) of the audio, e.g. without
+    # the silence at the start and end. Timestamps stay relative to the
+    # whole audio.
+    offset = 0.0
+    pcm_range = args.get("pcm_range")
+    if pcm_range is not None and growing_pcm is None:
+        start, stop = pcm_range
+        offset = start / sampling_rate
+        if tracks:
+            tracks = [track[start:stop] for track in tracks]
         else:
-            whisper_lang = language_code
+            audio = audio[start:stop]
+    log_cb("info", t('vad'))
+
+    # VAD options
+    vad_threshold = float(args.get("vad_threshold", 0.5))
+    min_silence_ms = int(args.get("vad_min_silence_ms", 500))
+    speech_pad_ms = int(args.get("vad_speech_pad_ms", 50))
+    try:
+        vad_parameters = VadOptions(min_silence_duration_ms=min_silence_ms, threshold=vad_threshold, speech_pad_ms=speech_pad_ms)
+    except TypeError:
+        vad_parameters = VadOptions(min_silence_duration_ms=min_silence_ms, onset=vad_threshold, speech_pad_ms=speech_pad_ms)
+
+    # Batched inference (see `_transcribe_batched`) transcribes clips of at
+    # most 30 seconds, the speech chunks must not be longer.
+    batch_size = int(args.get("batch_size") or 0)
+    if batch_size > 0 and not tracks:
+        vad_parameters.max_speech_duration_s = model.feature_extractor.chunk_length
+
+    energy_gate = args.get("vad_energy_gate")  # see `vad.energy_gate`
+
+    # Find the speech only once for the language detection and the
+    # transcription (both would run the VAD over the whole audio otherwise),
+    # see `_collect_speech`.
+    speech_chunks = None
+    track_speech_chunks = None
+    if audio is not None and args.get("vad_filter", True):
+        speech_chunks = _find_speech(audio, vad_parameters, *vad_probs, pcm_range, energy_gate)
+        speech_audio = _collect_speech(audio, speech_chunks)
+    elif tracks and args.get("vad_filter", True):
+        track_speech_chunks = [
+            _find_speech(track, vad_parameters, *track_probs, pcm_range, energy_gate)
+            for track, track_probs in zip(tracks, vad_probs)
+        ]
+
+    # Language handling
+    language_name = args.get("language_name")
+    language_code = args.get("language_code")
+    multilingual = False
+    whisper_lang = None
+
+    if not model.model.is_multilingual and language_code != 'en':
+        language_name = 'English'
+        language_code = 'en'
+        log_cb("info", t('language_en_only'))
+
+    if language_name == "Multilingual":
+        multilingual = True
+        whisper_lang = None
+    elif language_name == "Auto":
+        whisper_lang = None
+    else:
+        whisper_lang = language_code
 
-        # Detect language if requested (Auto)
-        if language_name == "Auto":
-            whisper_lang, language_probability, _ = model.detect_language(
-                audio, vad_filter=True, vad_parameters=vad_parameters
+    # Detect language if requested (Auto)
+    if language_name == "Auto":
+        if speech_chunks is not None:
+            # the speech found above
+            detect_chunks, detect_speech = speech_chunks, speech_audio
+        else:
+            if growing_pcm is not None:
+                num_samples = GROWING_LANGUAGE_DETECTION_SEC * sampling_rate
+                detect_audio = growing_pcm.read(0, min(growing_pcm.wait(num_samples), num_samples))
+            elif tracks:
+                detect_audio = _mix_tracks(tracks, GROWING_LANGUAGE_DETECTION_SEC * sampling_rate)
+            else:
+                detect_audio = audio
+            detect_chunks = get_speech_timestamps(detect_audio, vad_parameters)
+            detect_speech = _collect_speech(detect_audio, detect_chunks)
+        if detect_chunks:
+            whisper_lang, language_probability, windows = _detect_language_sampled(
+                model,
+                detect_speech,
+                int(args.get("language_detection_windows", 5)),
+                float(args.get("language_detection_threshold", 0.8)),
             )
             log_cb("info", t('language_detect', lang=whisper_lang, prob=f'{language_probability:.2f}'))
+            # Where the windows are in the audio
+            ts_map = SpeechTimestampsMap(detect_chunks, sampling_rate)
+            log_cb("info", t(
+                'language_detect_windows',
+                count=len(windows),
+                times=', '.join(
+                    ms_to_str(round((ts_map.get_original_time(start / sampling_rate) + offset) * 1000))
+                    for start in windows
+                ),
+            ))
 
-        # Build prompt/hotwords if disfluencies suppression is requested
-        prompt = ""
-        if args.get("disfluencies", False):
-            prompt_file = impres.files("prompts") / "prompt.yml"
-        else:
-            prompt_file = impres.files("prompts") / "prompt_nd.yml"
-        try:
-            with prompt_file.open("r", encoding="utf-8") as f:
-                prompt = yaml.safe_load(f).get(whisper_lang, "")
-        except Exception as e:
-            logger.exception(e)
-            log_cb('error', t('err_loading_prompt') + '\n')
-
-        # Perform transcription (streaming)
-        segments, info = model.transcribe(
-            audio_path,
-            language=whisper_lang,
-            multilingual=multilingual,
-            beam_size=args.get("beam_size", 5),
-            # temperature=args.get("temperature"),
-            word_timestamps=args.get("word_timestamps", True),
-            # initial_prompt=prompt,
-            hotwords=prompt,
-            vad_filter=args.get("vad_filter", True),
-            vad_parameters=vad_parameters,
+    # Build prompt/hotwords if disfluencies suppression is requested
+    prompt = ""
+    if args.get("disfluencies", False):
+        prompt_file = impres.files("prompts") / "prompt.yml"
+    else:
+        prompt_file = impres.files("prompts") / "prompt_nd.yml"
+    try:
+        with prompt_file.open("r", encoding="utf-8") as f:
+            prompt = yaml.safe_load(f).get(whisper_lang, "")
+    except Exception as e:
+        logger.exception(e)
+        log_cb('error', t('err_loading_prompt') + '\n')
+
+    # Perform transcription (streaming)
+    transcribe_options = dict(
+        language=whisper_lang,
+        multilingual=multilingual,
+        beam_size=args.get("beam_size", 5),
+        best_of=args.get("best_of", 5),
+        temperature=args.get("temperature", [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]),
+        compression_ratio_threshold=args.get("compression_ratio_threshold", 2.4),
+        log_prob_threshold=args.get("log_prob_threshold", -1.0),
+        no_speech_threshold=args.get("no_speech_threshold", 0.6),
+        word_timestamps=args.get("word_timestamps", True),
+        # initial_prompt=prompt,
+        hotwords=prompt,
+        vad_filter=args.get("vad_filter", True),
+        vad_parameters=vad_parameters,
+    )
+
+    # Skip repetition loops (see `_transcribe_speech`), None = off
+    repetition_limits = args.get("repetition_limits")
+
+    # Two-pass transcription: the segments pass through the refiner on
+    # their way to the parent.
+    result_q = q
+    refiner = None
+    if refine_model is not None:
+        def read_span(start, end, track=None):
+            # `start` and `end` in seconds, relative to the whole audio
+            first = max(round((start - offset) * sampling_rate), 0)
+            last = max(round((end - offset) * sampling_rate), first)
+            if growing_pcm is not None:
+                return growing_pcm.read(first, last)
+            return (tracks[track or 0] if tracks else audio)[first:last]
+
+        refiner = _Refiner(
+            q,
+            refine_model,
+            read_span,
+            {**transcribe_options, **(args.get("refine_options") or {}), "vad_filter": False},
+            args.get("refine_thresholds") or REFINE_THRESHOLDS,
+            log_cb,
         )
-        
+        q = refiner
+
+    if tracks:
         log_cb('info', t('start_transcription') + '\n')
-        
+        info = _transcribe_tracks(
+            model, tracks, transcribe_options, q, offset, track_speech_chunks, repetition_limits, log_cb
+        )
+    elif speech_chunks is not None:
+        log_cb('info', t('start_transcription') + '\n')
+
+        info = None
+        parts = split_speech(speech_chunks, args.get("parallel_parts", 1))
+        if batch_size > 0 and speech_chunks:
+            info = _transcribe_batched(
+                model, audio, speech_chunks, transcribe_options, batch_size, q, offset
+            )
+        elif len(parts) > 1:
+            log_cb('info', t('parallel_parts', count=len(parts)))
+            info = _transcribe_parts(
+                model, audio, parts, transcribe_options, q, offset, repetition_limits, log_cb
+            )
+        elif speech_chunks:
+            # The speech was already found, the VAD does not need to run
+            # again. Stream segments to parent as they arrive.
+            info = _transcribe_speech(
+                model, audio, speech_chunks, transcribe_options,
+                lambda s: _put_segment(q, s, offset), repetition_limits, log_cb, offset,
+            )
+    elif growing_pcm is None:
+        segments, info = model.transcribe(audio, **transcribe_options)
+
+        log_cb('info', t('start_transcription') + '\n')
+
         # Stream segments to parent as they arrive
         for s in segments:
-            try:
-                seg_d = {
-                    "start": getattr(s, "start", None),
-                    "end": getattr(s, "end", None),
-                    "text": getattr(s, "text", None),
-                }
-                words = getattr(s, "words", None)
-                if words:
-                    seg_d["words"] = [
-                        {
-                            "word": getattr(w, "word", None),
-                            "start": getattr(w, "start", None),
-                            "end": getattr(w, "end", None),
-                            "prob": getattr(w, "probability", None),
-                        }
-                        for w in words
-                    ]
-                q.put({"type": "segment", "segment": seg_d})
-            except Exception:
-                # Best-effort; continue on serialization issues
-                pass
+            _put_segment(q, s, offset)
+    else:
+        log_cb('info', t('start_transcription') + '\n')
+
+        # Unpadded speech chunks for the pause adjustment in the parent.
+        try:
+            pause_vad_parameters = VadOptions(min_silence_duration_ms=500, threshold=vad_threshold, speech_pad_ms=0)
+        except TypeError:
+            pause_vad_parameters = VadOptions(min_silence_duration_ms=500, onset=vad_threshold, speech_pad_ms=0)
+
+        info, duration = _transcribe_growing(
+            model, growing_pcm, transcribe_options, pause_vad_parameters, q, batch_size,
+            window_sec=args.get("growing_window_sec"), energy_gate=energy_gate,
+            repetition_limits=repetition_limits, log=log_cb,
+        )
+
+    # info into dict
+    if is_dataclass(info):
+        info_dict = asdict(info)
+    else:
+        info_dict = {}
+        for k in ("language", "language_probability", "duration", "sample_rate"):
+            if hasattr(info, k):
+                info_dict[k] = getattr(info, k)
+    # Ensure duration is available
+    info_dict.setdefault("duration", duration)
+    if growing_pcm is not None:
+        info_dict["duration"] = duration
+    if speech_chunks is not None:
+        # `info` describes the speech audio only.
+        info_dict["duration"] = audio.shape[0] / sampling_rate
+        info_dict["duration_after_vad"] = speech_audio.shape[0] / sampling_rate
+
+    if refiner is not None:
+        refiner.close()
+        log_cb('info', t(
+            'refine_summary',
+            count=refiner.refined,
+            total=refiner.segments,
+            percent=round(100 * refiner.refined_sec / refiner.total_sec) if refiner.total_sec else 0,
+        ))
+
+    try:
+        result_q.put({"type": "result", "ok": True, "info": info_dict})
+    except Exception:
+        pass
+
+
+def _segment_to_dict(segment, offset: float = 0.0) -> dict:
+    """
+    Convert a transcribed segment to a dict that can be sent to the parent.
+    `offset` (in seconds) is added to all timestamps. The words are left out,
+    the parent does not use them (word timestamps only make the segment
+    timestamps more precise). The confidence of the model is kept (see
+    `transcription.needs_refinement`).
+    """
+
+    def shift(value):
+        return value + offset if value is not None else None
+
+    return {
+        "start": shift(getattr(segment, "start", None)),
+        "end": shift(getattr(segment, "end", None)),
+        "text": getattr(segment, "text", None),
+        "avg_logprob": getattr(segment, "avg_logprob", None),
+        "no_speech_prob": getattr(segment, "no_speech_prob", None),
+        "compression_ratio": getattr(segment, "compression_ratio", None),
+    }
+
+
+def _put_segment(q, segment, offset: float = 0.0):
+    """
+    Send a transcribed segment to the parent. `offset` (in seconds) is added
+    to all timestamps.
+    """
+
+    try:
+        q.put({"type": "segment", "segment": _segment_to_dict(segment, offset)})
+    except Exception:
+        # Best-effort; continue on serialization issues
+        pass
+
+
+class _Refiner:
+    """
+    Two-pass transcription: passes the messages of the draft transcription
+    on to the parent (it is used in place of the queue), but transcribes the
+    segments with low confidence (see `transcription.needs_refinement`) again
+    with the refine model first and sends its segments instead. Clean audio
+    is thus only transcribed by the fast draft model.
+
+    Consecutive low-confidence segments (of the same track) are transcribed
+    together, up to `REFINE_MAX_SPAN_SEC`. `read_span(start, end, track)`
+    returns their audio. If the refine model fails, the draft segments are
+    kept.
+
+    The refine model runs in the thread that sent the segments, outside of
+    the lock, so that the other threads (parallel parts or tracks) are not
+    held up by it. The messages are still sent in the order they arrived:
+    each one takes a slot in `_out`, which is sent once all slots before it
+    are ready.
+    """
+
+    def __init__(self, q, model, read_span, transcribe_options: dict, thresholds: dict, log):
+        self._q = q
+        self._model = model
+        self._read_span = read_span
+        self._options = transcribe_options
+        self._thresholds = thresholds
+        self._log = log
+        self._pending = []
+        self._out = deque()  # slots: {"messages": list, None while being refined}
+        self._lock = threading.Lock()
+
+        # statistics
+        self.segments = 0
+        self.refined = 0
+        self.total_sec = 0.0
+        self.refined_sec = 0.0
+
+    def put(self, msg: dict):
+        from .transcription import needs_refinement
+
+        spans = []  # spans to refine (see `_take_pending`)
+        with self._lock:
+            if msg.get("type") != "segment":
+                # keep the order of the messages
+                spans.append(self._take_pending())
+                self._out.append({"messages": [msg]})
+            else:
+                segment = msg["segment"]
+                self.segments += 1
+                self.total_sec += segment["end"] - segment["start"]
+
+                refine = needs_refinement(segment, self._thresholds)
+                if self._pending and (not refine or segment.get("track") != self._pending[0].get("track")):
+                    spans.append(self._take_pending())
+                if not refine:
+                    self._out.append({"messages": [msg]})
+                else:
+                    self._pending.append(segment)
+                    if segment["end"] - self._pending[0]["start"] >= REFINE_MAX_SPAN_SEC:
+                        spans.append(self._take_pending())
+            self._send_ready()
+
+        self._refine(spans)
+
+    def close(self):
+        """
+        Send the segments that are still waiting to be refined.
+        """
+
+        with self._lock:
+            spans = [self._take_pending()]
+        self._refine(spans)
+
+    def _take_pending(self):
+        """
+        Return the pending segments and their slot in `_out` (None if there
+        are none). Call with the lock held.
+        """
+
+        if not self._pending:
+            return None
+
+        pending, self._pending = self._pending, []
+        slot = {"messages": None}
+        self._out.append(slot)
+        return pending, slot
+
+    def _send_ready(self):
+        # Call with the lock held.
+        while self._out and self._out[0]["messages"] is not None:
+            for msg in self._out.popleft()["messages"]:
+                self._q.put(msg)
 
-        # info into dict
-        if is_dataclass(info):
-            info_dict = asdict(info)
+    def _refine(self, spans: list):
+        for span in spans:
+            if span is None:
+                continue
+            pending, slot = span
+            refined = self._transcribe(pending)
+            with self._lock:
+                if refined is not pending:
+                    self.refined += len(pending)
+                    self.refined_sec += sum(segment["end"] - segment["start"] for segment in pending)
+                # Nothing left means the draft was not speech at all.
+                slot["messages"] = [{"type": "segment", "segment": seg_d} for seg_d in refined]
+                self._send_ready()
+
+    def _transcribe(self, pending: list) -> list:
+        """
+        Transcribe the span of the pending segments with the refine model.
+        Returns the draft segments if it fails.
+        """
+
+        start, end = pending[0]["start"], pending[-1]["end"]
+        track = pending[0].get("track")
+        try:
+            segments, _ = self._model.transcribe(self._read_span(start, end, track), **self._options)
+            refined = []
+            for segment in segments:
+                seg_d = _segment_to_dict(segment, start)
+                seg_d["end"] = min(seg_d["end"], end)
+                if track is not None:
+                    seg_d["track"] = track
+                refined.append(seg_d)
+        except Exception as e:
+            logger.exception(e)
+            self._log('debug', f'Refining {start:.1f}-{end:.1f} s failed, keeping the draft: {e}')
+            return pending
+
+        return refined
+
+
+def _detect_language_sampled(model, speech, num_windows: int, threshold: float):
+    """
+    Detect the language of the speech (the speech chunks of the audio, joined
+    together) in up to `num_windows` windows of 30 seconds, spread evenly
+    over the speech. A recording with a long intro (e.g. music or small talk
+    in another language) is thus not judged by its first 30 seconds only.
+
+    The probabilities of the windows are averaged. The detection stops as
+    soon as the probability of the most likely language reaches `threshold`
+    (usually after the first window).
+
+    Returns:
+        The language, its probability and the start of the windows used (in
+        samples of `speech`).
+    """
+
+    window = model.feature_extractor.n_samples
+    last_start = max(speech.shape[0] - window, 0)
+    # no overlapping windows
+    num_windows = max(min(num_windows, -(-speech.shape[0] // window)), 1)
+    if num_windows > 1:
+        starts = [round(i * last_start / (num_windows - 1)) for i in range(num_windows)]
+    else:
+        starts = [0]
+
+    totals = {}
+    used = []
+    for start in starts:
+        features = model.feature_extractor(speech[start : start + window])
+        _, _, language_probs = model.detect_language(features=features)
+        for language, probability in language_probs:
+            totals[language] = totals.get(language, 0.0) + probability
+        used.append(start)
+
+        language = max(totals, key=totals.get)
+        probability = totals[language] / len(used)
+        if probability >= threshold:
+            break
+
+    return language, probability, used
+
+
+def _find_speech(audio, vad_parameters, probs=None, num_samples: int = None, pcm_range: tuple = None,
+                 energy_gate: dict = None) -> list:
+    """
+    Return the speech chunks of the audio (which is cut to `pcm_range`, if
+    given). `probs` are the speech probabilities of the whole audio of
+    `num_samples` samples, computed by the parent (see `vad`). Without them,
+    the VAD model runs here (behind the `energy_gate`, if given).
+    """
+
+    from . import vad
+
+    if probs is None:
+        return vad.speech_chunks(vad.speech_probabilities(audio, energy_gate), audio.shape[0], vad_parameters)
+
+    chunks = vad.speech_chunks(probs, num_samples, vad_parameters)
+    if pcm_range is None:
+        return chunks
+
+    return vad.clip_chunks(chunks, *pcm_range)
+
+
+def _transcribe_speech(model, audio, speech_chunks: list, transcribe_options: dict, put,
+                       repetition_limits: dict = None, log=None, offset: float = 0.0):
+    """
+    Transcribe the speech chunks of the audio (see `_collect_speech`) and
+    pass the segments (timestamps relative to the audio) to `put`.
+
+    With `repetition_limits`, the segments are checked for a repetition loop
+    (see `transcription.is_repetition_loop`), in which every repeat costs a
+    full beam search. The loop is dropped and the transcription starts again
+    at the next speech chunk, the skipped span is logged (`offset` in
+    seconds is added to it). For this, the last few segments are held back
+    until they are known not to be part of a loop.
+
+    Returns:
+        The info of the transcription.
+    """
+
+    from faster_whisper.transcribe import restore_speech_timestamps
+
+    from .transcription import is_repetition_loop
+    from .utils import ms_to_str
+
+    sampling_rate = model.feature_extractor.sampling_rate
+    options = {**transcribe_options, "vad_filter": False}
+    info = None
+    first = 0  # first speech chunk to transcribe
+
+    while first < len(speech_chunks):
+        chunks = speech_chunks[first:]
+        segments, chunk_info = model.transcribe(_collect_speech(audio, chunks), **options)
+        info = info or chunk_info
+        segments = restore_speech_timestamps(segments, chunks, sampling_rate)
+        if repetition_limits is None:
+            for s in segments:
+                put(s)
+            break
+
+        held = []
+        for s in segments:
+            held.append(s)
+            if is_repetition_loop([h.text for h in held], repetition_limits):
+                break
+            if len(held) >= repetition_limits["segments"]:
+                put(held.pop(0))
         else:
-            info_dict = {}
-            for k in ("language", "language_probability", "duration", "sample_rate"):
-                if hasattr(info, k):
-                    info_dict[k] = getattr(info, k)
-        # Ensure duration is available
-        info_dict.setdefault("duration", duration)
+            for s in held:
+                put(s)
+            break
+
+        # Skip the loop: start again (without the repeated text as the
+        # previous text) at the first speech chunk after it.
+        loop_end = round(held[-1].end * sampling_rate)
+        first += max(next((i for i, c in enumerate(chunks) if c["start"] >= loop_end), len(chunks)), 1)
+        resume = speech_chunks[first]["start"] if first < len(speech_chunks) else speech_chunks[-1]["end"]
+        if log is not None:
+            log("info", t(
+                'repetition_skipped',
+                start=ms_to_str(round((held[0].start + offset) * 1000)),
+                end=ms_to_str(round((resume / sampling_rate + offset) * 1000)),
+            ))
+
+    return info
+
+
+def _collect_speech(audio, speech_chunks: list):
+    """
+    Return the speech chunks (from `get_speech_timestamps`) of the audio,
+    joined together. This is what `WhisperModel.transcribe` does with
+    `vad_filter=True` (`faster_whisper.vad.collect_chunks`), but in one step
+    instead of joining the chunks one by one.
+    """
+
+    import numpy as np
+
+    return np.concatenate(
+        [audio[c["start"] : c["end"]] for c in speech_chunks] or [np.zeros(0, dtype=np.float32)]
+    )
+
+
+def _mix_tracks(tracks: list, num_samples: int):
+    """
+    Return the mix of the first `num_samples` samples of all tracks.
+    """
+
+    import numpy as np
+
+    mix = np.zeros(min(max(track.shape[0] for track in tracks), num_samples), dtype=np.float32)
+    for track in tracks:
+        part = track[: mix.shape[0]]
+        mix[: part.shape[0]] += part
+
+    return mix / len(tracks)
 
+
+def _transcribe_tracks(model, tracks: list, transcribe_options: dict, q, offset: float = 0.0,
+                       speech_chunks: list = None, repetition_limits: dict = None, log=None):
+    """
+    Transcribe several tracks in parallel threads (with fewer model workers
+    than tracks, some wait for a free worker). The segments are labeled with their track and sent to the
+    parent in order of their start time. `offset` (in seconds) is added to all
+    timestamps. With `speech_chunks` (a list per track), only the speech is
+    transcribed, without running the VAD again, and repetition loops are
+    skipped (see `_transcribe_speech`).
+
+    Returns:
+        The info of the first track.
+    """
+
+    from .transcription import SegmentMerger
+
+    def emit(seg_d):
         try:
-            q.put({"type": "result", "ok": True, "info": info_dict})
+            q.put({"type": "segment", "segment": seg_d})
         except Exception:
+            # Best-effort; continue on serialization issues
             pass
 
-        # Cleanup VRAM (harmless on CPU)
+    merger = SegmentMerger(len(tracks), emit)
+    infos = [None] * len(tracks)
+    errors = []
+
+    def transcribe_track(index):
         try:
-            del model
-        except Exception:
-            pass
+            def put(segment):
+                seg_d = _segment_to_dict(segment, offset)
+                seg_d["track"] = index
+                merger.add(index, seg_d)
+
+            if speech_chunks is not None:
+                infos[index] = _transcribe_speech(
+                    model, tracks[index], speech_chunks[index], transcribe_options, put,
+                    repetition_limits, log, offset,
+                )
+            else:
+                segments, infos[index] = model.transcribe(tracks[index], **transcribe_options)
+                for segment in segments:
+                    put(segment)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            merger.finish(index)
+
+    threads = [threading.Thread(target=transcribe_track, args=(index,)) for index in range(len(tracks))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    return infos[0]
+
+
+def _batch_clips(speech_chunks: list, max_samples: int) -> list:
+    """
+    Join consecutive speech chunks into clips of at most `max_samples`
+    samples (from the start of the first to the end of the last chunk) for
+    batched inference. Returns a list of (start, end) in samples.
+    """
+
+    clips = []
+    for chunk in speech_chunks:
+        if clips and chunk["end"] - clips[-1][0] <= max_samples:
+            clips[-1] = (clips[-1][0], chunk["end"])
+        else:
+            clips.append((chunk["start"], chunk["end"]))
+
+    return clips
+
+
+def _transcribe_batched(model, audio, speech_chunks: list, transcribe_options: dict,
+                        batch_size: int, q, offset: float = 0.0):
+    """
+    Transcribe the speech with faster-whisper's batched inference pipeline,
+    which decodes `batch_size` clips of up to 30 seconds at once. The
+    segments are sent to the parent in order. `offset` (in seconds) is added
+    to all timestamps.
+
+    The pipeline would run the VAD again, so the clips are built from the
+    speech chunks found before (see `_batch_clips`).
+
+    Returns:
+        The info of the pipeline.
+    """
+
+    from faster_whisper import BatchedInferencePipeline
+
+    sampling_rate = model.feature_extractor.sampling_rate
+    clips = _batch_clips(speech_chunks, model.feature_extractor.chunk_length * sampling_rate)
+
+    pipeline = BatchedInferencePipeline(model=model)
+    segments, info = pipeline.transcribe(
+        audio,
+        **{**transcribe_options, "vad_filter": False},
+        clip_timestamps=[
+            {"start": start / sampling_rate, "end": end / sampling_rate} for start, end in clips
+        ],
+        batch_size=batch_size,
+    )
+
+    # The batches are transcribed one after the other, the segments arrive
+    # in order.
+    for s in segments:
+        _put_segment(q, s, offset)
+
+    return info
+
+
+def _transcribe_parts(model, audio, parts: list, transcribe_options: dict, q, offset: float = 0.0,
+                      repetition_limits: dict = None, log=None):
+    """
+    Transcribe the speech of a long recording in several parts (see
+    `transcription.split_speech`) in parallel threads, each with its own
+    model worker. The segments are sent to the parent in order, part by
+    part. `offset` (in seconds) is added to all timestamps. Repetition loops
+    are skipped (see `_transcribe_speech`).
+
+    Returns:
+        The info of the first part.
+    """
+
+    from .transcription import SegmentMerger
+
+    def emit(item):
         try:
-            torch.cuda.empty_cache()
+            q.put({"type": "segment", "segment": item[1]})
         except Exception:
+            # Best-effort; continue on serialization issues
             pass
-        gc.collect()
-        plog("debug", "Subprocess finished cleanly.")
 
-    except Exception as e:
+    # The parts follow each other, so their order is the order of the
+    # segments.
+    merger = SegmentMerger(len(parts), emit, key=lambda item: item[0])
+    infos = [None] * len(parts)
+    errors = []
+
+    def transcribe_part(index):
         try:
-            q.put({
-                "type": "result",
-                "ok": False,
-                "error": f"{type(e).__name__}: {e}",
-                "trace": traceback.format_exc(),
-            })
-        except Exception:
-            pass
+            infos[index] = _transcribe_speech(
+                model, audio, parts[index], transcribe_options,
+                lambda segment: merger.add(index, (index, _segment_to_dict(segment, offset))),
+                repetition_limits, log, offset,
+            )
+        except Exception as e:
+            errors.append(e)
+        finally:
+            merger.finish(index)
+
+    threads = [threading.Thread(target=transcribe_part, args=(index,)) for index in range(len(parts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    return infos[0]
+
+
+def _transcribe_growing(model, growing_pcm, transcribe_options: dict, pause_vad_parameters, q,
+                        batch_size: int = 0, window_sec: float = None, energy_gate: dict = None,
+                        repetition_limits: dict = None, log=None):
+    """
+    Transcribe a PCM file that is still being written, window by window
+    (`window_sec`, `GROWING_WINDOW_SEC` by default). With `batch_size` > 0,
+    each window is transcribed with the batched inference pipeline.
+
+    Each window is transcribed as soon as it is available. Before its
+    segments, the speech chunks of the window (without padding) are sent to
+    the parent, which uses them for the pause adjustment. With `vad_filter`,
+    the speech chunks for whisper are derived from the same speech
+    probabilities (see `vad`), the VAD model runs only once per window
+    (behind the `energy_gate`, if given), and without batches, repetition
+    loops are skipped (see `_transcribe_speech`).
+
+    Returns:
+        The info of the last window and the total duration in seconds.
+    """
+
+    from . import vad
+
+    sampling_rate = model.feature_extractor.sampling_rate
+    window = round((window_sec or GROWING_WINDOW_SEC) * sampling_rate)
+    if batch_size > 0:
+        from faster_whisper import BatchedInferencePipeline
+
+        transcribe = partial(BatchedInferencePipeline(model=model).transcribe, batch_size=batch_size)
+    else:
+        transcribe = model.transcribe
+    pos = 0
+    info = None
+
+    while True:
+        available = growing_pcm.wait(pos + window)
+        final = growing_pcm.finished() and available <= pos + window
+
+        chunk = growing_pcm.read(pos, min(available, pos + window))
+        if chunk.shape[0] == 0:
+            break
+
+        probs = vad.speech_probabilities(chunk, energy_gate)
+        speech_chunks = vad.speech_chunks(probs, chunk.shape[0], pause_vad_parameters)
+        cut = chunk.shape[0] if final else _find_cut(speech_chunks, chunk.shape[0])
+
+        q.put({
+            "type": "vad",
+            "chunks": [
+                {"start": pos + c["start"], "end": pos + min(c["end"], cut)}
+                for c in speech_chunks
+                if c["start"] < cut
+            ],
+            "end": (pos + cut) / sampling_rate,
+        })
+
+        if transcribe_options.get("vad_filter"):
+            whisper_chunks = vad.clip_chunks(
+                vad.speech_chunks(probs, chunk.shape[0], transcribe_options["vad_parameters"]), 0, cut
+            )
+            chunk = chunk[:cut]
+            options = {**transcribe_options, "vad_filter": False}
+            if not whisper_chunks:
+                segments = []
+            elif batch_size > 0:
+                segments, info = transcribe(
+                    chunk,
+                    **options,
+                    clip_timestamps=[
+                        {"start": start / sampling_rate, "end": end / sampling_rate}
+                        for start, end in _batch_clips(
+                            whisper_chunks, model.feature_extractor.chunk_length * sampling_rate
+                        )
+                    ],
+                )
+            else:
+                info = _transcribe_speech(
+                    model, chunk, whisper_chunks, transcribe_options,
+                    lambda s: _put_segment(q, s, offset=pos / sampling_rate),
+                    repetition_limits, log, pos / sampling_rate,
+                )
+                segments = []
+        else:
+            chunk = chunk[:cut]
+            segments, info = transcribe(chunk, **transcribe_options)
+        for s in segments:
+            _put_segment(q, s, offset=pos / sampling_rate)
+
+        pos += cut
+        if final:
+            break
+
+    return info, pos / sampling_rate
+
+
+def _find_cut(speech_chunks: list, length: int) -> int:
+    """
+    Return the position (in samples) at which a window of `length` samples
+    should end: the middle of the last pause in the second half of the
+    window, or the end of the window if there is none.
+    """
+
+    starts = [c["start"] for c in speech_chunks[1:]] + [length]
+    for chunk, next_start in reversed(list(zip(speech_chunks, starts))):
+        if chunk["end"] < length // 2:
+            break
+        if next_start > chunk["end"]:
+            return (chunk["end"] + next_start) // 2
+
+    return length
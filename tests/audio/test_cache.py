@@ -0,0 +1,117 @@
+import os
+import shutil
+
+import numpy as np
+
+from noScribe import audio
+
+
+def _write_pcm(path, num_samples, value=0.0):
+    np.full(num_samples, value, dtype=np.float32).tofile(path)
+    return path
+
+
+def test_fingerprint(tmp_path):
+    """
+    Test that the fingerprint depends on the content only, for small files as
+    well as for files that are only read partially.
+    """
+
+    for size in [1000, 5 * 1024 * 1024]:
+        content = bytearray(np.random.default_rng(size).bytes(size))
+        path = tmp_path / f"audio_{size}.mp3"
+        path.write_bytes(content)
+
+        # Copies share the fingerprint.
+        path_copy = tmp_path / f"copy_{size}.mp3"
+        shutil.copyfile(path, path_copy)
+        assert audio.cache.fingerprint(path) == audio.cache.fingerprint(path_copy)
+
+        # Changes to the first bytes or the size change the fingerprint.
+        content[0] ^= 0xFF
+        path_copy.write_bytes(content)
+        assert audio.cache.fingerprint(path) != audio.cache.fingerprint(path_copy)
+
+        path_copy.write_bytes(content + b"\0")
+        assert audio.cache.fingerprint(path) != audio.cache.fingerprint(path_copy)
+
+
+def test_audio_cache_key(tmp_path):
+    """
+    Test that the time range and the track are part of the cache key.
+    """
+
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(b"audio")
+
+    cache = audio.cache.AudioCache(tmp_path / "cache", 1024)
+
+    assert cache.key(path) == cache.key(path, 0, 0)
+    assert cache.key(path) != cache.key(path, 1000, 0)
+    assert cache.key(path, 1000, 0) != cache.key(path, 0, 1000)
+
+    assert cache.key(path, 1000, 2000) == cache.key(path, ranges=[(1000, 2000)])
+    assert cache.key(path, 1000, 2000) != cache.key(path, ranges=[(1000, 2000), (3000, 0)])
+
+    # Single tracks are cached separately.
+    assert cache.key(path) != cache.key(path, track=(0, None))
+    assert cache.key(path, track=(0, 0)) != cache.key(path, track=(0, 1))
+    assert cache.key(path, track=(1, None)) != cache.key(path, track=(0, 1))
+
+
+def test_audio_cache_get_put(tmp_path):
+    """
+    Test that cached files are provided as independent files: removing the
+    entry or the provided file does not affect the other.
+    """
+
+    cache = audio.cache.AudioCache(tmp_path / "cache", 1024 * 1024)
+    path_job = _write_pcm(tmp_path / "job.f32", 100, 0.5)
+    path_other = tmp_path / "other.f32"
+
+    assert not cache.get("a", path_other)
+    assert not path_other.exists()
+
+    cache.put("a", path_job, {"source": "interview.mp3", "start": 0, "stop": 0})
+    assert path_job.exists()
+
+    assert cache.get("a", path_other)
+    np.testing.assert_array_equal(audio.pcm.open_pcm(path_other), np.full(100, 0.5))
+
+    (entry,) = cache.entries()
+    assert entry["key"] == "a"
+    assert entry["source"] == "interview.mp3"
+    assert entry["size"] == 400
+    assert cache.size() == 400
+
+    path_job.unlink()
+    assert cache.purge() == 1
+    assert cache.entries() == []
+    assert path_other.exists()
+
+
+def test_audio_cache_evicts_least_recently_used(tmp_path):
+    """
+    Test that the least recently used entries are evicted once the cache
+    exceeds its size budget.
+    """
+
+    cache = audio.cache.AudioCache(tmp_path / "cache", 1000)
+
+    for i, key in enumerate(["a", "b"]):
+        cache.put(key, _write_pcm(tmp_path / f"{key}.f32", 100))
+        # Make the order of use explicit, independent of the file system's
+        # timestamp resolution.
+        os.utime(cache.cache_dir / f"{key}.f32", (1000 + i, 1000 + i))
+
+    # Using "a" makes "b" the least recently used entry.
+    assert cache.get("a", tmp_path / "used.f32")
+
+    cache.put("c", _write_pcm(tmp_path / "c.f32", 100))
+
+    assert sorted(entry["key"] for entry in cache.entries()) == ["a", "c"]
+
+    # The new entry is kept, even if it exceeds the budget on its own.
+    cache.put("d", _write_pcm(tmp_path / "d.f32", 1000))
+
+    assert [entry["key"] for entry in cache.entries()] == ["d"]
@@ -1,8 +1,9 @@
 import importlib.resources as impres
 from types import SimpleNamespace
 
-import pytest
 import av
+import numpy as np
+import pytest
 
 from noScribe import audio
 
@@ -215,3 +216,322 @@ def test_to_wav_skips_invalid_packets(tmp_path, monkeypatch):
     assert output_container.muxed_packets == ["packet-0.0", "packet-0.5", "flush-packet"]
     assert input_container.closed is True
     assert output_container.closed is True
+
+
+def test_to_wav_convert_all(tmp_path, make_audio_file):
+    """
+    Test that the bulk conversion produces the same audio as the frame by
+    frame conversion and reports its progress.
+    """
+
+    path_input = make_audio_file(seconds=20)
+
+    path_single = tmp_path / "single.wav"
+    with audio.convert.ToWav(path_input, path_single) as towav:
+        while towav.convert():
+            pass
+
+    progress = []
+    path_bulk = tmp_path / "bulk.wav"
+    with audio.convert.ToWav(path_input, path_bulk) as towav:
+        assert towav.convert_all(
+            progress_cb=lambda seconds, speed: progress.append((seconds, speed)),
+            chunk_frames=16,
+        )
+
+    single = audio.pcm.open_pcm(_to_pcm(path_single))
+    bulk = audio.pcm.open_pcm(_to_pcm(path_bulk))
+
+    assert bulk.shape[0] == pytest.approx(20 * 16000, abs=16)
+    assert bulk.shape[0] == pytest.approx(single.shape[0], abs=16)
+    length = min(bulk.shape[0], single.shape[0])
+    assert np.abs(bulk[:length] - single[:length]).max() < 1e-3
+
+    # Progress is reported after each batch and at the end.
+    assert len(progress) > 2
+    assert [p[0] for p in progress] == sorted(p[0] for p in progress)
+    assert progress[-1][0] == pytest.approx(bulk.shape[0] / 16000)
+    assert progress[-1][1] > 0
+
+
+def test_to_wav_convert_all_cancel(tmp_path, make_audio_file):
+    """
+    Test that the bulk conversion stops as soon as `cancel_cb` returns True.
+    """
+
+    path_input = make_audio_file(seconds=20)
+    path_output = tmp_path / "audio.wav"
+
+    calls = []
+
+    def cancel_cb():
+        calls.append(True)
+        return True
+
+    with audio.convert.ToWav(path_input, path_output) as towav:
+        assert not towav.convert_all(cancel_cb=cancel_cb, chunk_frames=16)
+
+    assert len(calls) == 1
+    assert towav.samples_written < 20 * 16000
+
+
+def test_to_wav_convert_all_start_stop(tmp_path, make_audio_file):
+    """
+    Test that the bulk conversion trims its output sample-accurately to the
+    range given by `seek()` and `stop_after()`.
+    """
+
+    path_input = make_audio_file(seconds=10)
+
+    whole = audio.pcm.open_pcm(_convert(path_input, tmp_path / "whole.wav"))
+
+    for start_ms, stop_ms in [(1000, 4000), (2345, 7891), (5000, 0)]:
+        path_part = tmp_path / f"part_{start_ms}_{stop_ms}.wav"
+        part = audio.pcm.open_pcm(_convert(path_input, path_part, start_ms, stop_ms))
+
+        expected = whole[start_ms * 16 : stop_ms * 16 if stop_ms else None]
+        assert part.shape == expected.shape
+        np.testing.assert_array_equal(part, expected)
+
+
+def test_to_wav_convert_all_ranges(tmp_path, make_audio_file):
+    """
+    Test that several time ranges can be converted one after the other by
+    seeking again, yielding the same samples as separate conversions.
+    """
+
+    path_input = make_audio_file(seconds=8)
+    ranges = [(500, 2000), (3250, 4000), (6000, 0)]
+
+    path_pcm = tmp_path / "ranges.f32"
+    writer = audio.pcm.PcmWriter(path_pcm)
+    with audio.convert.ToWav(path_input, None) as towav:
+        for start_ms, stop_ms in ranges:
+            towav.seek(start_ms)
+            towav.stop_after(stop_ms)
+            assert towav.convert_all(chunk_frames=4, pcm_writer=writer)
+    writer.close()
+
+    expected = [
+        audio.pcm.open_pcm(_convert(path_input, tmp_path / f"part{i}.wav", *r))
+        for i, r in enumerate(ranges)
+    ]
+    assert [part.shape[0] for part in expected] == [24000, 12000, 32000]
+    np.testing.assert_array_equal(audio.pcm.open_pcm(path_pcm), np.concatenate(expected))
+
+
+def test_parallel_to_wav(tmp_path, make_audio_file):
+    """
+    Test that the parallel conversion produces exactly the same audio as the
+    sequential conversion.
+    """
+
+    path_input = make_audio_file(seconds=12)
+
+    for start_ms, stop_ms in [(0, 0), (1500, 10250)]:
+        expected = audio.pcm.open_pcm(
+            _convert(path_input, tmp_path / "sequential.wav", start_ms, stop_ms)
+        )
+
+        progress = []
+        path_output = tmp_path / "parallel.wav"
+        with audio.convert.ParallelToWav(
+            path_input, path_output, processes=3, force=True, min_range_sec=2
+        ) as towav:
+            towav.seek(start_ms)
+            towav.stop_after(stop_ms)
+            assert len(towav._split()) == 3
+            assert towav.convert_all(
+                progress_cb=lambda seconds, speed: progress.append(seconds)
+            )
+
+        assert towav.samples_written == expected.shape[0]
+        assert len(progress) == 3
+        assert progress[-1] == pytest.approx(expected.shape[0] / 16000)
+
+        result = audio.pcm.open_pcm(_to_pcm(path_output))
+        np.testing.assert_array_equal(result, expected)
+
+    # Inputs that are too short to be split are converted in-process.
+    with audio.convert.ParallelToWav(
+        path_input, path_output, processes=3, force=True, min_range_sec=60
+    ) as towav:
+        assert towav._split() == [(0, 0)]
+        assert towav.convert_all()
+    assert towav.samples_written == pytest.approx(12 * 16000, abs=16)
+
+
+def test_to_wav_convert_all_pcm_writer(tmp_path, make_audio_file):
+    """
+    Test that the bulk conversion passes the converted samples to a PCM
+    writer while writing the wave file.
+    """
+
+    path_input = make_audio_file(seconds=5)
+    path_output = tmp_path / "audio.wav"
+    path_pcm = tmp_path / "live.f32"
+
+    writer = audio.pcm.PcmWriter(path_pcm)
+    with audio.convert.ToWav(path_input, path_output) as towav:
+        assert towav.convert_all(chunk_frames=16, pcm_writer=writer)
+    writer.close()
+
+    assert writer.num_samples == towav.samples_written
+    np.testing.assert_array_equal(
+        audio.pcm.open_pcm(path_pcm), audio.pcm.open_pcm(_to_pcm(path_output))
+    )
+
+
+def test_parallel_to_wav_pcm_writer_in_order(tmp_path, make_audio_file):
+    """
+    Test that the parallel conversion passes the samples of each part to the
+    PCM writer as soon as the part is finished, not after all parts.
+    """
+
+    path_input = make_audio_file(seconds=6)
+    progress = []
+    parts_done = []  # number of finished parts at each write
+
+    class Writer:
+        samples = 0
+
+        def write(self, samples):
+            parts_done.append(len(progress))
+            self.samples += samples.shape[0]
+
+    writer = Writer()
+    with audio.convert.ParallelToWav(
+        path_input, tmp_path / "audio.wav", processes=3, force=True, min_range_sec=2
+    ) as towav:
+        assert towav.convert_all(
+            progress_cb=lambda seconds, speed: progress.append(seconds), pcm_writer=writer
+        )
+
+    assert sorted(set(parts_done)) == [0, 1, 2]
+    assert writer.samples == towav.samples_written
+
+
+def test_to_wav_without_output_file(tmp_path, make_audio_file):
+    """
+    Test that the conversion can pass the samples to a PCM writer only,
+    without writing a wave file.
+    """
+
+    path_input = make_audio_file(seconds=3)
+    path_output = tmp_path / "audio.wav"
+
+    with audio.convert.ToWav(path_input, path_output) as towav:
+        assert towav.convert_all()
+
+    for towav in [
+        audio.convert.ToWav(path_input, None),
+        audio.convert.ParallelToWav(
+            path_input, None, processes=2, min_range_sec=1, scratch_dir=tmp_path
+        ),
+    ]:
+        path_pcm = tmp_path / f"{type(towav).__name__}.f32"
+        writer = audio.pcm.PcmWriter(path_pcm)
+        with towav:
+            assert towav.convert_all(pcm_writer=writer)
+        writer.close()
+
+        np.testing.assert_array_equal(
+            audio.pcm.open_pcm(path_pcm), audio.pcm.open_pcm(_to_pcm(path_output))
+        )
+
+    assert sorted(path.name for path in tmp_path.iterdir() if path.suffix == ".wav") == [
+        "audio.wav"
+    ]
+
+
+def test_probe(make_audio_file):
+    """
+    Test that `probe` reads the stream information and duration.
+    """
+
+    path_input = make_audio_file(seconds=5, rate=22050, layout="mono")
+
+    info = audio.convert.probe(path_input)
+
+    assert info.format == "flac"
+    assert info.codec == "flac"
+    assert info.sample_rate == 22050
+    assert info.channels == 1
+    assert info.audio_streams == 1
+    assert info.duration == pytest.approx(5.0, abs=0.05)
+
+    assert info.converted_duration() == info.duration
+    assert info.converted_duration(1000, 3000) == pytest.approx(2.0)
+    assert info.converted_duration(1000, 0) == pytest.approx(4.0, abs=0.05)
+    assert info.converted_duration(6000, 0) == 0.0
+    assert audio.convert.MediaInfo("wav", "pcm_s16le", 16000, 1, 1).converted_duration() is None
+
+
+def test_to_wav_channel(tmp_path, make_audio_file):
+    """
+    Test that a single channel can be converted instead of the mix of all
+    channels.
+    """
+
+    path_input = make_audio_file(seconds=2)
+
+    channels = []
+    for channel in [None, 0, 1]:
+        path_output = tmp_path / f"channel_{channel}.wav"
+        with audio.convert.ToWav(path_input, path_output, channel=channel) as towav:
+            assert towav.convert_all()
+        channels.append(audio.pcm.open_pcm(_to_pcm(path_output)).astype(np.float64))
+    mix, left, right = channels
+
+    # The channels carry different signals, the default mixes both.
+    assert np.abs(left - right).max() > 0.1
+    np.testing.assert_allclose(mix, (left + right) / 2, atol=2 / 32768)
+
+
+def test_media_info_tracks():
+    """
+    Test that the tracks are the streams if there are several, otherwise the
+    channels of the only stream.
+    """
+
+    assert audio.convert.MediaInfo("wav", "pcm_s16le", 16000, 1, 1).tracks() == [(0, None)]
+    assert audio.convert.MediaInfo("wav", "pcm_s16le", 16000, 2, 1).tracks() == [(0, 0), (0, 1)]
+    assert audio.convert.MediaInfo("mkv", "aac", 48000, 2, 3).tracks() == [
+        (0, None),
+        (1, None),
+        (2, None),
+    ]
+
+
+def test_probe_rejects_invalid_files(tmp_path):
+    """
+    Test that `probe` raises an error for files without readable audio.
+    """
+
+    path_input = tmp_path / "broken.mp3"
+    path_input.write_bytes(np.random.default_rng(0).bytes(100_000))
+
+    with pytest.raises((av.error.FFmpegError, ValueError)):
+        audio.convert.probe(path_input)
+
+    path_input = tmp_path / "empty.wav"
+    path_input.write_bytes(b"")
+
+    with pytest.raises((av.error.FFmpegError, ValueError)):
+        audio.convert.probe(path_input)
+
+
+def _convert(path_input, path_output, start_ms=0, stop_ms=0):
+    with audio.convert.ToWav(path_input, path_output, force=True) as towav:
+        if start_ms:
+            towav.seek(start_ms)
+        if stop_ms:
+            towav.stop_after(stop_ms)
+        towav.convert_all()
+    return _to_pcm(path_output)
+
+
+def _to_pcm(path_wav):
+    path_pcm = path_wav.with_suffix(".f32")
+    audio.pcm.wav_to_pcm(path_wav, path_pcm)
+    return path_pcm
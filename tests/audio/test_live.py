@@ -0,0 +1,79 @@
+import io
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from noScribe import audio
+
+
+def test_growing_file(tmp_path):
+    """
+    Test that a growing file is read until it stops growing.
+    """
+
+    path = tmp_path / "recording.wav"
+    data = bytes(range(256)) * 100
+    path.write_bytes(b"")
+
+    def record():
+        with open(path, "ab") as f:
+            for start in range(0, len(data), 1000):
+                f.write(data[start : start + 1000])
+                f.flush()
+                time.sleep(0.02)
+
+    thread = threading.Thread(target=record)
+    thread.start()
+    with audio.live.GrowingFile(path, idle_timeout=0.5, poll_interval=0.01) as f:
+        assert f.read() == data
+    thread.join()
+
+
+def test_growing_file_stop(tmp_path):
+    """
+    Test that reading a growing file stops when asked to (cancel).
+    """
+
+    path = tmp_path / "recording.wav"
+    path.write_bytes(b"abc")
+
+    stop = threading.Event()
+    with audio.live.GrowingFile(path, idle_timeout=60, poll_interval=0.01, stop_cb=stop.is_set) as f:
+        assert f.read(3) == b"abc"
+        threading.Timer(0.1, stop.set).start()
+        assert f.read(3) == b""
+
+
+def test_parse_format():
+    assert audio.live.parse_format(None) == (None, None)
+    assert audio.live.parse_format("wav") == ("wav", None)
+    assert audio.live.parse_format("s16le") == ("s16le", {"sample_rate": "16000", "ch_layout": "1c"})
+    assert audio.live.parse_format("s16le:48000:2") == ("s16le", {"sample_rate": "48000", "ch_layout": "2c"})
+
+    with pytest.raises(ValueError):
+        audio.live.parse_format("s16le:fast")
+    with pytest.raises(ValueError):
+        audio.live.parse_format("wav:48000")
+
+
+def test_convert_stream(tmp_path):
+    """
+    Test that raw PCM from a stream (e.g. stdin) is converted.
+    """
+
+    samples = (np.sin(np.arange(8000 * 2) / 10) * 8000).astype("<i2")
+    stereo = np.repeat(samples, 2)
+    input_format, input_options = audio.live.parse_format("s16le:8000:2")
+
+    path_pcm = tmp_path / "audio.f32"
+    writer = audio.pcm.PcmWriter(path_pcm)
+    with audio.convert.ToWav(
+        io.BytesIO(stereo.tobytes()), None, input_format=input_format, input_options=input_options
+    ) as converter:
+        assert converter.convert_all(pcm_writer=writer)
+    writer.close()
+
+    # resampled to 16 kHz mono
+    assert abs(writer.num_samples - 2 * samples.shape[0]) <= 32
@@ -0,0 +1,119 @@
+import threading
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from noScribe import audio
+
+
+def _write_wav(path, samples, rate=16000, channels=1):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+
+
+def test_wav_to_pcm(tmp_path):
+    """
+    Test that `wav_to_pcm` writes the scaled float32 samples of a wave file.
+    """
+
+    samples = np.array([0, 16384, -16384, 32767, -32768] * 1000, dtype=np.int16)
+    path_wav = tmp_path / "audio.wav"
+    path_pcm = tmp_path / "audio.f32"
+    _write_wav(path_wav, samples)
+
+    # Use a small chunk size to make sure chunks are joined correctly.
+    num_samples = audio.pcm.wav_to_pcm(path_wav, path_pcm, chunk_samples=333)
+
+    assert num_samples == samples.shape[0]
+    assert path_pcm.stat().st_size == samples.shape[0] * 4
+
+    buffer = audio.pcm.open_pcm(path_pcm)
+    assert buffer.dtype == np.float32
+    assert buffer.shape == samples.shape
+    np.testing.assert_array_equal(buffer, samples.astype(np.float32) / 32768.0)
+
+
+def test_wav_to_pcm_rejects_unexpected_format(tmp_path):
+    """
+    Test that only 16 kHz mono wave files are accepted.
+    """
+
+    path_wav = tmp_path / "audio.wav"
+    _write_wav(path_wav, np.zeros(200, dtype=np.int16), rate=44100, channels=2)
+
+    with pytest.raises(ValueError):
+        audio.pcm.wav_to_pcm(path_wav, tmp_path / "audio.f32")
+
+
+def test_open_pcm(tmp_path):
+    """
+    Test mapping of PCM files: empty files, read-only and copy-on-write
+    mappings.
+    """
+
+    path_pcm = tmp_path / "audio.f32"
+
+    path_pcm.write_bytes(b"")
+    assert audio.pcm.open_pcm(path_pcm).shape == (0,)
+
+    np.arange(10, dtype=np.float32).tofile(path_pcm)
+
+    buffer = audio.pcm.open_pcm(path_pcm)
+    with pytest.raises(ValueError):
+        buffer[0] = 42.0
+
+    # Writes to a writable mapping must never reach the file.
+    buffer = audio.pcm.open_pcm(path_pcm, writable=True)
+    buffer[0] = 42.0
+    del buffer
+    assert np.fromfile(path_pcm, dtype=np.float32)[0] == 0.0
+
+
+def test_growing_pcm(tmp_path):
+    """
+    Test reading a PCM file while `PcmWriter` is still writing it.
+    """
+
+    path_pcm = tmp_path / "audio.f32"
+    writer = audio.pcm.PcmWriter(path_pcm)
+    reader = audio.pcm.GrowingPcm(path_pcm, poll_interval=0.01)
+
+    writer.write(np.array([0, 16384], dtype=np.int16))
+    assert reader.available() == 2
+    assert not reader.finished()
+    np.testing.assert_array_equal(reader.read(1, 2), [0.5])
+
+    def write_more():
+        time.sleep(0.05)
+        writer.write(np.array([-16384, 0, 0], dtype=np.int16))
+        writer.close()
+
+    thread = threading.Thread(target=write_more)
+    thread.start()
+    # Blocks until the samples are written.
+    assert reader.wait(4) == 5
+    thread.join()
+
+    # Returns early once writing is finished.
+    assert reader.wait(100) == 5
+    assert reader.finished()
+    np.testing.assert_array_equal(reader.read(1, 3), [0.5, -0.5])
+
+
+def test_growing_pcm_incomplete(tmp_path):
+    """
+    Test that readers are told when writing stopped before completion.
+    """
+
+    path_pcm = tmp_path / "audio.f32"
+    writer = audio.pcm.PcmWriter(path_pcm)
+    writer.write(np.zeros(10, dtype=np.int16))
+    writer.close(complete=False)
+
+    with pytest.raises(RuntimeError):
+        audio.pcm.GrowingPcm(path_pcm).wait(100)
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from noScribe import audio
+
+
+def test_select_dir(tmp_path, monkeypatch):
+    """
+    Test that short recordings are kept in RAM if possible, otherwise the
+    configured directory is used.
+    """
+
+    memory = tmp_path / "shm"
+    memory.mkdir()
+    monkeypatch.setattr(audio.scratch, "_MEMORY_DIRS", [str(memory)])
+    monkeypatch.setattr(
+        audio.scratch.shutil,
+        "disk_usage",
+        lambda path: SimpleNamespace(total=4 << 30, used=1 << 30, free=3 << 30),
+    )
+
+    assert audio.scratch.select_dir("", 600, 60) == (memory, True)
+    assert audio.scratch.select_dir(str(tmp_path), 600, 60) == (memory, True)
+
+    # Too long, unknown duration or turned off.
+    assert audio.scratch.select_dir(str(tmp_path), 600, 601) == (tmp_path, False)
+    assert audio.scratch.select_dir(str(tmp_path), 600, None) == (tmp_path, False)
+    assert audio.scratch.select_dir("", 0, 60) == (None, False)
+
+    # Not enough room, half of it is reserved.
+    assert audio.scratch.select_dir("", 600, 60, required_bytes=1 << 30) == (memory, True)
+    assert audio.scratch.select_dir("", 600, 60, required_bytes=2 << 30) == (None, False)
+
+    monkeypatch.setattr(audio.scratch, "_MEMORY_DIRS", [str(tmp_path / "missing")])
+    assert audio.scratch.select_dir("", 600, 60) == (None, False)
+
+
+def test_scratch_cleanup(tmp_path):
+    """
+    Test that the scratch directory is created in the base directory and
+    removed with all its files.
+    """
+
+    base_dir = tmp_path / "scratch"
+
+    with audio.scratch.Scratch(base_dir) as scratch:
+        assert scratch.path.parent == base_dir
+        with open(scratch.file("audio.f32"), "wb") as f:
+            f.write(b"\0" * 16)
+
+    assert not scratch.path.exists()
+    assert list(base_dir.iterdir()) == []
+
+    # Removing it again is fine.
+    assert scratch.cleanup()
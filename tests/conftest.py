@@ -0,0 +1,56 @@
+import av
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def make_audio_file(tmp_path):
+    """
+    Returns a function that creates a short test recording.
+
+    The signal is a sine sweep per channel, so converted output can be
+    compared sample by sample. FLAC is used by default as it is lossless and
+    decodes deterministically.
+    """
+
+    def _make(
+        name: str = "audio.flac",
+        seconds: float = 5.0,
+        rate: int = 44100,
+        layout: str = "stereo",
+        codec: str = "flac",
+        silent: bool = False,
+    ):
+        path = tmp_path / name
+        channels = 2 if layout == "stereo" else 1
+        num_samples = int(seconds * rate)
+
+        t = np.arange(num_samples) / rate
+        signal = np.stack(
+            [0.3 * np.sin(2 * np.pi * (220 * (c + 1) + 40 * t) * t) for c in range(channels)]
+        )
+        if silent:
+            signal[:] = 0.0
+        signal = (signal * 32767).astype(np.int16)
+
+        with av.open(str(path), mode="w") as container:
+            stream = container.add_stream(codec, rate=rate, layout=layout)
+            frame_size = 1024
+            for start in range(0, num_samples, frame_size):
+                chunk = signal[:, start : start + frame_size]
+                # Packed s16: interleave the channels.
+                frame = av.AudioFrame.from_ndarray(
+                    np.ascontiguousarray(chunk.T).reshape(1, -1),
+                    format="s16",
+                    layout=layout,
+                )
+                frame.sample_rate = rate
+                frame.pts = start
+                for packet in stream.encode(frame):
+                    container.mux(packet)
+            for packet in stream.encode(None):
+                container.mux(packet)
+
+        return path
+
+    return _make
@@ -0,0 +1,77 @@
+"""
+Tests for the `autotune.py` file / module.
+"""
+
+import numpy as np
+
+from noScribe import autotune
+
+
+def test_thread_candidates():
+    assert autotune.thread_candidates(1) == [1]
+    assert autotune.thread_candidates(8) == [1, 2, 4, 8]
+    assert autotune.thread_candidates(12) == [1, 2, 4, 8, 12]
+
+
+def test_worker_candidates():
+    assert autotune.worker_candidates(2) == [1]
+    assert autotune.worker_candidates(8) == [1, 2, 4]
+    assert autotune.worker_candidates(12) == [1, 2, 4]
+
+
+def test_autotune():
+    runs = []
+
+    def measure(compute_type, threads, workers):
+        runs.append((compute_type, threads, workers))
+        if compute_type == "int8":
+            raise ValueError("not supported")
+        # float32 is slow, 4 threads are best, workers don't help
+        base = 20.0 if compute_type == "float32" else 10.0
+        return base + abs(threads - 4) + workers
+
+    result = autotune.autotune(measure, cpu_count=8, default_threads=4, log=lambda msg: None)
+
+    assert result == {"compute_type": "int8_float32", "threads": 4, "parallel_parts": 1}
+    # Every setting is measured only once.
+    assert len(runs) == len(set(runs))
+
+
+def test_autotune_workers():
+    def measure(compute_type, threads, workers):
+        return 10.0 / workers
+
+    result = autotune.autotune(measure, cpu_count=16, default_threads=4, log=lambda msg: None)
+
+    assert result == {"compute_type": "int8", "threads": 16, "parallel_parts": 8}
+
+
+def test_synthetic_clip():
+    clip = autotune.synthetic_clip(2)
+    assert clip.dtype == np.float32
+    assert clip.shape == (2 * autotune.SAMPLING_RATE,)
+    assert np.abs(clip).max() <= 1.0
+
+
+def test_tuned_settings_cuda(monkeypatch):
+    """
+    The settings are measured on the CPU, they are not used if the model
+    runs on the GPU.
+    """
+
+    import ctranslate2
+
+    from noScribe import transcription
+
+    tuning = {"precise": {"compute_type": "int8", "threads": 4, "parallel_parts": 2}}
+    monkeypatch.setattr(transcription.platform, "system", lambda: "Linux")
+
+    monkeypatch.setattr(ctranslate2, "get_cuda_device_count", lambda: 1)
+    assert transcription.whisper_device("auto") == "cuda"
+    assert autotune.tuned_settings(tuning, "precise", transcription.whisper_device("auto")) == {}
+    assert autotune.tuned_settings(tuning, "precise", transcription.whisper_device("cpu")) == tuning["precise"]
+
+    monkeypatch.setattr(ctranslate2, "get_cuda_device_count", lambda: 0)
+    assert transcription.whisper_device("auto") == "cpu"
+    assert autotune.tuned_settings(tuning, "precise", "cpu") == tuning["precise"]
+    assert autotune.tuned_settings(tuning, "fast", "cpu") == {}
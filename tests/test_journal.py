@@ -0,0 +1,76 @@
+"""
+Tests for the `journal.py` file / module.
+"""
+
+from noScribe import journal
+
+
+def test_journal(tmp_path):
+    path = tmp_path / "job.journal.jsonl"
+    key = {"audio_file": "interview.mp3", "ranges": [(0, 1000)]}
+    diarization = [{"start": 0, "end": 1500, "label": "SPEAKER_00"}]
+    segments = [
+        {"start": 0.0, "end": 1.0, "text": " Hello"},
+        {"start": 1.0, "end": 2.5, "text": " world", "track": 1},
+    ]
+
+    writer = journal.SegmentJournal(path, key)
+    writer.write_diarization(diarization)
+    for segment in segments:
+        writer.write_segment(segment)
+    writer.close()
+
+    resumed = journal.load(path, key)
+    assert resumed == {"diarization": diarization, "segments": segments}
+
+    # Not for a job with other settings
+    assert journal.load(path, {**key, "audio_file": "other.mp3"}) is None
+    assert journal.load(tmp_path / "missing.jsonl", key) is None
+
+    # Resuming rewrites the journal
+    writer = journal.SegmentJournal(path, key, resumed)
+    assert writer.segments == segments
+    writer.write_segment({"start": 2.5, "end": 3.0, "text": " again"})
+    writer.remove()
+    assert not path.exists()
+
+
+def test_journal_incomplete_line(tmp_path):
+    # The job crashed while writing the last segment.
+    path = tmp_path / "job.journal.jsonl"
+    writer = journal.SegmentJournal(path, {})
+    writer.write_segment({"start": 0.0, "end": 1.0, "text": " Hello"})
+    writer.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "segment", "segment": {"start": 1.0, "en')
+
+    resumed = journal.load(path, {})
+    assert resumed == {"diarization": None, "segments": [{"start": 0.0, "end": 1.0, "text": " Hello"}]}
+
+
+def test_resume_point():
+    assert journal.resume_point([]) == 0.0
+
+    # one track: where the last segment ended
+    segments = [
+        {"start": 0.0, "end": 1.0, "text": " Hello"},
+        {"start": 1.0, "end": 2.5, "text": " world"},
+    ]
+    assert journal.resume_point(segments) == 2.5
+
+    # several tracks: a long segment must not skip the later segments of
+    # the other track that have not arrived yet
+    segments = [
+        {"start": 0.0, "end": 1.0, "text": " Hello", "track": 0},
+        {"start": 1.5, "end": 20.0, "text": " A long answer", "track": 1},
+    ]
+    assert journal.resume_point(segments) == 1.5
+
+
+def test_is_duplicate():
+    segments = [{"start": 1.5, "end": 20.0, "text": " A long answer", "track": 1}]
+
+    assert journal.is_duplicate({"start": 1.52, "end": 19.9, "text": "A long answer", "track": 1}, segments)
+    assert not journal.is_duplicate({"start": 1.5, "end": 20.0, "text": " A long answer", "track": 0}, segments)
+    assert not journal.is_duplicate({"start": 1.5, "end": 3.0, "text": " Yes", "track": 1}, segments)
+    assert not journal.is_duplicate({"start": 9.0, "end": 20.0, "text": " A long answer", "track": 1}, segments)
@@ -0,0 +1,139 @@
+"""
+Tests for the `transcription.py` file / module.
+"""
+
+import pytest
+
+from noScribe import transcription
+
+
+def test_speech_range():
+    """
+    Tests for the `speech_range` function.
+    """
+
+    chunks = [{"start": 5000, "end": 6000}, {"start": 8000, "end": 9000}]
+
+    # Long silence at the start and end is trimmed, keeping the padding...
+    assert transcription.speech_range(chunks, 20000, 2000, 500) == (4500, 9500)
+
+    # ...but short silence is kept...
+    assert transcription.speech_range(chunks, 10000, 2000, 500) == (4500, 10000)
+    assert transcription.speech_range(chunks, 20000, 6000, 500) == (0, 9500)
+
+    # ...as is everything if trimming is off.
+    assert transcription.speech_range(chunks, 20000, 20001, 500) == (0, 20000)
+
+    # The padding does not exceed the audio.
+    assert transcription.speech_range([{"start": 100, "end": 200}], 300, 100, 500) == (0, 300)
+
+    # No speech at all.
+    assert transcription.speech_range([], 20000, 2000, 500) is None
+
+
+def test_parallel_parts():
+    """
+    Tests for the `parallel_parts` function.
+    """
+
+    minute = 60
+    # One part per 8 threads, but only for long recordings...
+    assert transcription.parallel_parts(120 * minute, 64) == 8
+    assert transcription.parallel_parts(120 * minute, 8) == 1
+    assert transcription.parallel_parts(25 * minute, 64) == 2
+    assert transcription.parallel_parts(5 * minute, 64) == 1
+    # ...unless configured otherwise.
+    assert transcription.parallel_parts(120 * minute, 8, max_parts=4) == 4
+    assert transcription.parallel_parts(120 * minute, 2, max_parts=4) == 2
+
+
+def test_max_parallel_parts():
+    """
+    Tests for the `max_parallel_parts` function.
+    """
+
+    assert transcription.max_parallel_parts(64) == 8
+    assert transcription.max_parallel_parts(4) == 1
+    assert transcription.max_parallel_parts(8, max_parts=4) == 4
+    assert transcription.max_parallel_parts(2, max_parts=4) == 2
+    # never more parts than that, whatever the length of the recording
+    assert transcription.parallel_parts(600 * 60, 64) == transcription.max_parallel_parts(64)
+
+
+def test_split_speech():
+    """
+    Tests for the `split_speech` function.
+    """
+
+    chunks = [{"start": i * 1000, "end": i * 1000 + 500} for i in range(6)]
+
+    # Equal amounts of speech, split between the chunks...
+    parts = transcription.split_speech(chunks, 3)
+    assert parts == [chunks[0:2], chunks[2:4], chunks[4:6]]
+
+    # ...never leaving a part empty.
+    assert transcription.split_speech(chunks, 10) == [[chunk] for chunk in chunks]
+    assert transcription.split_speech(chunks, 1) == [chunks]
+    assert transcription.split_speech([], 3) == [[]]
+
+    chunks = [{"start": 0, "end": 10000}, {"start": 11000, "end": 11100}, {"start": 12000, "end": 12100}]
+    assert transcription.split_speech(chunks, 2) == [chunks[0:1], chunks[1:3]]
+
+
+def test_get_profile():
+    """
+    Tests for the `get_profile` function.
+    """
+
+    assert transcription.get_profile("precise")["beam_size"] == 5
+    assert transcription.get_profile("draft")["temperature"] == [0.0]
+
+    # Settings from the config replace the defaults...
+    profile = transcription.get_profile("draft", {"draft": {"beam_size": 2, "temperature": 0.2}})
+    assert profile["beam_size"] == 2
+    assert profile["temperature"] == [0.2]
+    assert profile["word_timestamps"] is False
+
+    # ...or define new profiles, based on the default profile.
+    profile = transcription.get_profile("custom", {"custom": {"beam_size": 8}})
+    assert profile["beam_size"] == 8
+    assert profile["best_of"] == transcription.PROFILES[transcription.DEFAULT_PROFILE]["best_of"]
+
+    with pytest.raises(ValueError):
+        transcription.get_profile("unknown")
+
+
+def test_needs_refinement():
+    """
+    Tests for the `needs_refinement` function.
+    """
+
+    thresholds = transcription.REFINE_THRESHOLDS
+    confident = {"avg_logprob": -0.2, "no_speech_prob": 0.1, "compression_ratio": 1.5}
+    assert not transcription.needs_refinement(confident, thresholds)
+    assert transcription.needs_refinement({**confident, "avg_logprob": -1.0}, thresholds)
+    assert transcription.needs_refinement({**confident, "no_speech_prob": 0.9}, thresholds)
+    assert transcription.needs_refinement({**confident, "compression_ratio": 3.0}, thresholds)
+
+    # Unknown confidence
+    assert not transcription.needs_refinement({"start": 0.0, "end": 1.0}, thresholds)
+
+
+def test_is_repetition_loop():
+    """
+    Tests for the `is_repetition_loop` function.
+    """
+
+    limits = transcription.REPETITION_LIMITS
+    assert transcription.is_repetition_loop([" Thank you."] * 4, limits)
+    assert transcription.is_repetition_loop([" la la la la la la la la"] * 4, limits)
+    # not enough segments or words
+    assert not transcription.is_repetition_loop([" Thank you."] * 3, limits)
+    assert not transcription.is_repetition_loop([" Yes."] * 4, limits)
+    # speech
+    assert not transcription.is_repetition_loop([
+        " So we went home, because it was late already.",
+        " That was in the summer, I think.",
+        " And my mother said we should stay.",
+        " But we did not want to.",
+    ], limits)
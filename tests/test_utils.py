@@ -26,6 +26,48 @@ def test_str_to_ms():
         tmp = utils.str_to_ms(12)
 
 
+def test_str_to_ranges():
+    """
+    Tests for the `str_to_ranges` function.
+    """
+
+    assert utils.str_to_ranges(["01:00:00-01:30:00", "00:10:00-00:20:00"]) == [
+        (600_000, 1_200_000),
+        (3600_000, 5400_000),
+    ]
+
+    # Overlapping ranges are merged, an open stop means until the end.
+    assert utils.str_to_ranges(["00:00:00-00:20:00", "00:10:00-00:30:00", "01:00:00-"]) == [
+        (0, 1_800_000),
+        (3600_000, 0),
+    ]
+    assert utils.str_to_ranges(["00:10:00-", "00:20:00-00:30:00"]) == [(600_000, 0)]
+
+    assert utils.ranges_to_str([(0, 1_800_000), (3600_000, 0)]) == "00:00:00-00:30:00, 01:00:00-"
+
+    with pytest.raises(ValueError):
+        utils.str_to_ranges(["00:10:00"])
+
+    with pytest.raises(ValueError):
+        utils.str_to_ranges(["00:20:00-00:10:00"])
+
+
+def test_map_to_ranges():
+    """
+    Tests for the `map_to_ranges` function.
+    """
+
+    ranges = [(10_000, 20_000), (60_000, 65_000), (100_000, 0)]
+
+    assert utils.map_to_ranges(0, ranges) == 10_000
+    assert utils.map_to_ranges(9_999, ranges) == 19_999
+    assert utils.map_to_ranges(10_000, ranges) == 60_000
+    assert utils.map_to_ranges(10_000, ranges, end=True) == 20_000
+    assert utils.map_to_ranges(15_500, ranges) == 100_500
+
+    assert utils.map_to_ranges(1_000, [(5_000, 0)]) == 6_000
+
+
 def test_create_unique_filenames(tmp_path):
     """
     Tests for the `create_unique_filenames()` function.
@@ -0,0 +1,88 @@
+"""
+Tests for the `vad.py` file / module.
+"""
+
+import numpy as np
+import pytest
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from noScribe import autotune, vad
+
+
+@pytest.fixture(scope="module")
+def clip():
+    # speech-like "syllables" with pauses (see `autotune.synthetic_clip`)
+    return autotune.synthetic_clip(seconds=20)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        VadOptions(min_silence_duration_ms=500, speech_pad_ms=0),
+        VadOptions(min_silence_duration_ms=100, speech_pad_ms=400),
+        VadOptions(min_silence_duration_ms=200, speech_pad_ms=50, max_speech_duration_s=1),
+    ],
+)
+def test_speech_chunks(clip, options):
+    probs = vad.speech_probabilities(clip)
+
+    assert probs.shape == (clip.shape[0] // vad.WINDOW_SAMPLES + 1,)
+    assert vad.speech_chunks(probs, clip.shape[0], options) == get_speech_timestamps(clip, options)
+
+
+def test_clip_chunks():
+    chunks = [{"start": 0, "end": 100}, {"start": 200, "end": 300}, {"start": 400, "end": 500}]
+
+    assert vad.clip_chunks(chunks, 250, 450) == [{"start": 0, "end": 50}, {"start": 150, "end": 200}]
+    assert vad.clip_chunks(chunks, 100, 200) == []
+
+
+def test_save_probabilities(tmp_path):
+    pcm_file = tmp_path / "audio.f32"
+    probs = np.linspace(0, 1, 10, dtype=np.float32)
+
+    assert vad.load_probabilities(pcm_file) is None
+    vad.save_probabilities(pcm_file, probs)
+    np.testing.assert_array_equal(vad.load_probabilities(pcm_file), probs)
+
+
+def test_energy_gate():
+    silence = np.zeros(16000 * 10, dtype=np.float32)
+    tone = 0.1 * np.sin(np.arange(16000) * 2 * np.pi * 200 / 16000).astype(np.float32)
+    audio = np.concatenate([silence, tone, silence[:32000], tone, silence])
+    window_sec = vad.WINDOW_SAMPLES / 16000
+
+    regions = vad.energy_gate(audio, {"margin_ms": 0, "min_silence_ms": 3000})
+    # both tones in one region (the pause between them is too short)
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert start * window_sec == pytest.approx(10, abs=window_sec)
+    assert end * window_sec == pytest.approx(14, abs=window_sec)
+
+    # two regions with a margin of 0.5 seconds
+    regions = vad.energy_gate(audio, {"margin_ms": 500, "min_silence_ms": 0})
+    assert [round(start * window_sec, 1) for start, _ in regions] == [9.5, 12.5]
+    assert vad.energy_gate(silence) == []
+
+
+def test_speech_probabilities_gated(clip):
+    silence = np.zeros(16000 * 30, dtype=np.float32)
+    audio = np.concatenate([silence, clip, silence])
+
+    probs = vad.speech_probabilities(audio, {})
+
+    assert probs.shape == (audio.shape[0] // vad.WINDOW_SAMPLES + 1,)
+    # the model did not rate the silence
+    assert not probs[: 20 * 16000 // vad.WINDOW_SAMPLES].any()
+    assert probs.max() > 0.5
+
+
+def test_benchmark(clip):
+    silence = np.zeros(16000 * 30, dtype=np.float32)
+    audio = np.concatenate([silence, clip, silence])
+
+    result = vad.benchmark(audio, VadOptions(min_silence_duration_ms=500, speech_pad_ms=0), {})
+
+    assert result["skipped"] > 0.5
+    assert 0.0 <= result["agreement"] <= 1.0
+    assert 0.0 <= result["speech_overlap"] <= 1.0
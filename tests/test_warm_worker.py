@@ -0,0 +1,55 @@
+"""
+Tests for the `warm_worker.py` file / module.
+"""
+
+import queue
+
+from noScribe.warm_worker import WarmWorker
+
+
+def echo_entrypoint(args, q, requests=None):
+    """
+    Answers every job with a result holding the job and the worker args,
+    following the protocol of `whisper_mp_worker.whisper_proc_entrypoint`.
+    """
+
+    while True:
+        try:
+            job = requests.get(timeout=args.get("idle_timeout") or None)
+        except queue.Empty:
+            break
+        if job is None:
+            break
+        q.put({"type": "result", "ok": True, "info": {**args, **job}})
+
+
+def test_warm_worker():
+    worker = WarmWorker(echo_entrypoint, {"model": "a"}, idle_timeout=60)
+    try:
+        pid = worker.proc.pid
+        for i in range(3):
+            assert worker.is_usable({"model": "a"})
+            worker.submit({"job": i})
+            msg = worker.queue.get(timeout=30)
+            worker.done()
+            assert msg["info"] == {"model": "a", "job": i, "idle_timeout": 60}
+            # Same process for all jobs.
+            assert worker.proc.pid == pid
+
+        assert not worker.is_usable({"model": "b"})
+    finally:
+        worker.stop()
+
+    assert not worker.is_usable({"model": "a"})
+
+
+def test_warm_worker_idle_timeout():
+    # The worker exits by itself when idle. It is not usable close to the
+    # timeout (see `IDLE_MARGIN_SEC`).
+    worker = WarmWorker(echo_entrypoint, {}, idle_timeout=0.5)
+    try:
+        assert not worker.is_usable({})
+        worker.proc.join(timeout=30)
+        assert worker.proc.exitcode == 0
+    finally:
+        worker.stop()
@@ -0,0 +1,411 @@
+"""
+Tests for the `whisper_mp_worker.py` file / module (without loading a model).
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from faster_whisper.vad import VadOptions
+
+from noScribe import audio, whisper_mp_worker
+
+
+class FakeQueue:
+    def __init__(self):
+        self.messages = []
+
+    def put(self, msg):
+        self.messages.append(msg)
+
+
+class FakeModel:
+    """
+    Returns one segment per transcribed window, covering the whole window.
+    """
+
+    def __init__(self):
+        self.feature_extractor = SimpleNamespace(sampling_rate=16000)
+        self.windows = []
+
+    def transcribe(self, audio, **kwargs):
+        self.windows.append(np.array(audio))
+        seconds = audio.shape[0] / 16000
+        segment = SimpleNamespace(start=0.0, end=seconds, text=" window", words=None)
+        return iter([segment]), SimpleNamespace(duration=seconds)
+
+
+def test_find_cut():
+    """
+    Tests for the `_find_cut` function.
+    """
+
+    # Cut in the middle of the last pause...
+    chunks = [{"start": 0, "end": 400}, {"start": 600, "end": 700}, {"start": 800, "end": 1000}]
+    assert whisper_mp_worker._find_cut(chunks, 1000) == 750
+
+    # ...or of the silence at the end of the window...
+    chunks = [{"start": 0, "end": 900}]
+    assert whisper_mp_worker._find_cut(chunks, 1000) == 950
+
+    # ...but never in the first half of the window.
+    chunks = [{"start": 0, "end": 100}, {"start": 300, "end": 1000}]
+    assert whisper_mp_worker._find_cut(chunks, 1000) == 1000
+    assert whisper_mp_worker._find_cut([], 1000) == 1000
+
+
+def test_collect_speech():
+    """
+    Test that `_collect_speech` joins the speech chunks like faster-whisper.
+    """
+
+    from faster_whisper.vad import collect_chunks
+
+    samples = np.arange(16000, dtype=np.float32)
+    chunks = [{"start": 100, "end": 900}, {"start": 2000, "end": 2500}, {"start": 8000, "end": 16000}]
+    np.testing.assert_array_equal(
+        whisper_mp_worker._collect_speech(samples, chunks),
+        np.concatenate(collect_chunks(samples, chunks)[0]),
+    )
+    assert whisper_mp_worker._collect_speech(samples, []).shape == (0,)
+
+
+def test_transcribe_growing(tmp_path, monkeypatch):
+    """
+    Test that a growing PCM file is transcribed window by window while it is
+    written, covering every sample exactly once.
+    """
+
+    monkeypatch.setattr(whisper_mp_worker, "GROWING_WINDOW_SEC", 2)
+
+    samples = (np.sin(np.arange(16000 * 5) / 10) * 8000).astype(np.int16)
+    path_pcm = tmp_path / "audio.f32"
+    writer = audio.pcm.PcmWriter(path_pcm)
+
+    def write():
+        for start in range(0, samples.shape[0], 8000):
+            writer.write(samples[start : start + 8000])
+            time.sleep(0.01)
+        writer.close()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+
+    model = FakeModel()
+    q = FakeQueue()
+    info, duration = whisper_mp_worker._transcribe_growing(
+        model,
+        audio.pcm.GrowingPcm(path_pcm, poll_interval=0.01),
+        {},
+        VadOptions(min_silence_duration_ms=500, speech_pad_ms=0),
+        q,
+    )
+    thread.join()
+
+    assert duration == 5.0
+    assert len(model.windows) == 3
+    np.testing.assert_array_equal(
+        np.concatenate(model.windows), samples.astype(np.float32) / 32768.0
+    )
+
+    # Each window reports its VAD result before its segments, with timestamps
+    # relative to the start of the audio.
+    types = [msg["type"] for msg in q.messages]
+    assert types == ["vad", "segment"] * 3
+    ends = [msg["end"] for msg in q.messages if msg["type"] == "vad"]
+    segments = [msg["segment"] for msg in q.messages if msg["type"] == "segment"]
+    assert [segment["end"] for segment in segments] == ends
+    assert [segment["start"] for segment in segments] == [0.0] + ends[:-1]
+
+
+def test_transcribe_tracks():
+    """
+    Test that several tracks are transcribed in parallel and their segments
+    are sent in order of their start time, labeled with their track.
+    """
+
+    class TrackModel(FakeModel):
+        """
+        Returns a segment per second of audio, starting at the value of the
+        first sample (the offset of the track).
+        """
+
+        def transcribe(self, audio, **kwargs):
+            offset = float(audio[0])
+            segments = [
+                SimpleNamespace(start=offset + i, end=offset + i + 0.5, text=" s", words=None)
+                for i in range(audio.shape[0] // 16000)
+            ]
+            # Delay the first segments, the merge must not depend on timing.
+            time.sleep(offset / 10)
+            return iter(segments), SimpleNamespace(duration=audio.shape[0] / 16000)
+
+    tracks = [np.full(16000 * 3, offset, dtype=np.float32) for offset in (0.7, 0.2, 0.4)]
+    q = FakeQueue()
+
+    info = whisper_mp_worker._transcribe_tracks(TrackModel(), tracks, {}, q)
+
+    assert info.duration == 3.0
+    segments = [msg["segment"] for msg in q.messages]
+    np.testing.assert_allclose(
+        [segment["start"] for segment in segments],
+        sorted(offset + i for offset in (0.7, 0.2, 0.4) for i in range(3)),
+        rtol=1e-6,
+    )
+    assert [segment["track"] for segment in segments] == [1, 2, 0] * 3
+
+
+def test_transcribe_parts():
+    """
+    Test that the parts of a recording are transcribed in parallel and their
+    segments are sent in order, with timestamps relative to the whole audio.
+    """
+
+    class PartModel(FakeModel):
+        """
+        Returns a segment per second of audio. The later parts are faster.
+        """
+
+        def transcribe(self, audio, **kwargs):
+            assert not kwargs["vad_filter"]
+            segments = [
+                SimpleNamespace(start=float(i), end=i + 0.5, text=" s", words=None)
+                for i in range(audio.shape[0] // 16000)
+            ]
+            time.sleep(0.1 if audio[0] == 0 else 0)
+            return iter(segments), SimpleNamespace(duration=audio.shape[0] / 16000)
+
+    samples = np.repeat(np.arange(10, dtype=np.float32), 16000)
+    parts = [
+        [{"start": 0, "end": 32000}, {"start": 48000, "end": 64000}],
+        [{"start": 80000, "end": 112000}],
+    ]
+    q = FakeQueue()
+
+    whisper_mp_worker._transcribe_parts(PartModel(), samples, parts, {"vad_filter": True}, q, offset=100.0)
+
+    segments = [msg["segment"] for msg in q.messages]
+    assert [segment["start"] for segment in segments] == [100.0, 101.0, 103.0, 105.0, 106.0]
+
+
+def test_transcribe_speech_repetition():
+    """
+    Test that a repetition loop is dropped and the transcription starts
+    again at the next speech chunk.
+    """
+
+    class LoopModel(FakeModel):
+        """
+        Returns a segment per second of audio. Where the samples are below
+        5, the model is stuck in a loop.
+        """
+
+        def transcribe(self, audio, **kwargs):
+            self.windows.append(np.array(audio))
+            segments = [
+                SimpleNamespace(
+                    start=float(i), end=i + 0.5, words=None,
+                    text=" Thank you." if value < 5 else f" This is second {value:.0f} of the audio.",
+                )
+                for i, value in enumerate(audio[::16000])
+            ]
+            return iter(segments), SimpleNamespace(duration=audio.shape[0] / 16000)
+
+    samples = np.repeat(np.arange(10, dtype=np.float32), 16000)
+    chunks = [{"start": 0, "end": 80000}, {"start": 96000, "end": 128000}, {"start": 144000, "end": 160000}]
+    model = LoopModel()
+    segments = []
+    logs = []
+
+    whisper_mp_worker._transcribe_speech(
+        model, samples, chunks, {"vad_filter": True}, segments.append,
+        {"segments": 4, "ngram": 3, "ngram_repeats": 0.6, "compression_ratio": 2.4, "min_words": 8},
+        lambda level, msg: logs.append(msg), offset=100.0,
+    )
+
+    assert [segment.start for segment in segments] == [6.0, 7.0, 9.0]
+    assert len(model.windows) == 2
+    assert len(logs) == 1
+
+    # Without the limits, the loop is kept.
+    segments = []
+    whisper_mp_worker._transcribe_speech(LoopModel(), samples, chunks, {}, segments.append)
+    assert len(segments) == 8
+
+
+def test_batch_clips():
+    """
+    Tests for the `_batch_clips` function.
+    """
+
+    chunks = [
+        {"start": 0, "end": 100},
+        {"start": 200, "end": 300},
+        {"start": 400, "end": 900},
+        {"start": 1000, "end": 1100},
+    ]
+    assert whisper_mp_worker._batch_clips(chunks, 500) == [(0, 300), (400, 900), (1000, 1100)]
+    assert whisper_mp_worker._batch_clips(chunks, 10000) == [(0, 1100)]
+    assert whisper_mp_worker._batch_clips([], 500) == []
+
+
+def test_segment_to_dict():
+    """
+    Test that segments are sent with shifted timestamps and their confidence,
+    but without words.
+    """
+
+    word = SimpleNamespace(word=" a", start=1.0, end=1.5, probability=0.9)
+    segment = SimpleNamespace(
+        start=1.0, end=2.0, text=" a b", words=[word],
+        avg_logprob=-0.2, no_speech_prob=0.1, compression_ratio=1.5,
+    )
+    assert whisper_mp_worker._segment_to_dict(segment, offset=10.0) == {
+        "start": 11.0,
+        "end": 12.0,
+        "text": " a b",
+        "avg_logprob": -0.2,
+        "no_speech_prob": 0.1,
+        "compression_ratio": 1.5,
+    }
+
+
+def test_refiner():
+    """
+    Test that only segments with low confidence are transcribed again, with
+    consecutive ones together, and that the order of the messages is kept.
+    """
+
+    def segment(start, end, avg_logprob=-0.1):
+        return {"type": "segment", "segment": {
+            "start": start, "end": end, "text": " draft",
+            "avg_logprob": avg_logprob, "no_speech_prob": 0.0, "compression_ratio": 1.0,
+        }}
+
+    model = FakeModel()
+    q = FakeQueue()
+    spans = []
+
+    def read_span(start, end, track=None):
+        spans.append((start, end))
+        return np.zeros(round((end - start) * 16000), dtype=np.float32)
+
+    refiner = whisper_mp_worker._Refiner(
+        q, model, read_span, {}, {"log_prob": -0.7, "no_speech": 0.5, "compression_ratio": 2.2},
+        lambda level, msg: None,
+    )
+    refiner.put(segment(0.0, 1.0))
+    refiner.put(segment(1.0, 2.0, avg_logprob=-1.0))
+    refiner.put(segment(2.0, 3.0, avg_logprob=-1.0))
+    refiner.put(segment(3.0, 4.0))
+    refiner.put(segment(4.0, 5.0, avg_logprob=-1.0))
+    refiner.put({"type": "vad", "chunks": [], "end": 5.0})
+    refiner.close()
+
+    assert spans == [(1.0, 3.0), (4.0, 5.0)]
+    assert [(msg["type"], msg.get("segment", {}).get("text")) for msg in q.messages] == [
+        ("segment", " draft"),
+        ("segment", " window"),
+        ("segment", " draft"),
+        ("segment", " window"),
+        ("vad", None),
+    ]
+    # The refined segments are in place of the draft.
+    assert [msg["segment"]["start"] for msg in q.messages[:4]] == [0.0, 1.0, 3.0, 4.0]
+    assert q.messages[1]["segment"]["end"] == 3.0
+    assert (refiner.segments, refiner.refined) == (5, 3)
+
+
+def test_refiner_does_not_block():
+    """
+    Test that the refine model does not hold up the other threads (e.g.
+    parallel parts) and that the messages still arrive in order.
+    """
+
+    def segment(start, end, avg_logprob=-0.1):
+        return {"type": "segment", "segment": {
+            "start": start, "end": end, "text": " draft",
+            "avg_logprob": avg_logprob, "no_speech_prob": 0.0, "compression_ratio": 1.0,
+        }}
+
+    release = threading.Event()
+
+    class SlowModel(FakeModel):
+        def transcribe(self, audio, **kwargs):
+            release.wait(5)
+            return super().transcribe(audio, **kwargs)
+
+    q = FakeQueue()
+    refiner = whisper_mp_worker._Refiner(
+        q, SlowModel(), lambda start, end, track=None: np.zeros(16000, dtype=np.float32), {},
+        {"log_prob": -0.7, "no_speech": 0.5, "compression_ratio": 2.2}, lambda level, msg: None,
+    )
+
+    def first_part():
+        refiner.put(segment(0.0, 1.0, avg_logprob=-1.0))
+        refiner.put(segment(1.0, 2.0))  # refines the first segment
+
+    thread = threading.Thread(target=first_part)
+    thread.start()
+    time.sleep(0.1)
+
+    # The other thread is not blocked while the refine model runs...
+    start = time.perf_counter()
+    refiner.put(segment(5.0, 6.0))
+    assert time.perf_counter() - start < 1.0
+    assert q.messages == []
+
+    # ...and its segment is sent after the refined one.
+    release.set()
+    thread.join()
+    refiner.close()
+    assert [(msg["segment"]["start"], msg["segment"]["text"]) for msg in q.messages] == [
+        (0.0, " window"), (1.0, " draft"), (5.0, " draft"),
+    ]
+
+
+class LanguageModel:
+    """
+    Detects the language from the value of the samples: "en" if positive,
+    "de" otherwise, with a probability of abs(value). The features are the
+    samples of a window of 100 samples.
+    """
+
+    def __init__(self):
+        def feature_extractor(chunk):
+            return chunk
+
+        feature_extractor.n_samples = 100
+        self.feature_extractor = feature_extractor
+
+    def detect_language(self, features):
+        value = float(features.mean())
+        language = "en" if value > 0 else "de"
+        other = "de" if language == "en" else "en"
+        return language, abs(value), [(language, abs(value)), (other, 1 - abs(value))]
+
+
+def test_detect_language_sampled():
+    """
+    Tests for the `_detect_language_sampled` function.
+    """
+
+    model = LanguageModel()
+
+    # A confident first window is enough...
+    speech = np.full(1000, 0.9, dtype=np.float32)
+    assert whisper_mp_worker._detect_language_sampled(model, speech, 5, 0.8) == ("en", pytest.approx(0.9), [0])
+
+    # ...otherwise windows across the speech are sampled, until the combined
+    # probability is high enough.
+    speech = np.concatenate([np.full(100, -0.6), np.full(900, 0.95)]).astype(np.float32)
+    language, probability, windows = whisper_mp_worker._detect_language_sampled(model, speech, 5, 0.7)
+    assert language == "en"
+    assert windows == [0, 225, 450]
+    assert probability == pytest.approx((0.4 + 0.95 + 0.95) / 3)
+
+    # Short speech: one window only.
+    windows = whisper_mp_worker._detect_language_sampled(model, speech[:150], 5, 1.0)[2]
+    assert windows == [0, 50]